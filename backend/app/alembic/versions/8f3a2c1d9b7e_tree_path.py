@@ -0,0 +1,67 @@
+"""部门/菜单增加物化路径 tree_path 并回填
+
+Revision ID: 8f3a2c1d9b7e
+Revises:
+Create Date: 2026-10-18 18:30:00
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3a2c1d9b7e"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TREE_TABLES = ("sys_dept", "sys_menu")
+
+
+def _compute_paths(nodes: dict[int, int | None]) -> dict[int, str]:
+    """{id: parent_id} → {id: "/根/.../自身/"}，迭代实现；父节点缺失或成环按根处理（与 TreeMixin.compute_paths 一致）。"""
+    paths: dict[int, str] = {}
+    for start in nodes:
+        chain: list[int] = []
+        current: int | None = start
+        while current is not None and current in nodes and current not in paths and current not in chain:
+            chain.append(current)
+            current = nodes[current]
+        base = paths.get(current) if current is not None and current not in chain else None
+        for node_id in reversed(chain):
+            base = paths[node_id] = f"{base or '/'}{node_id}/"
+    return paths
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table_name in TREE_TABLES:
+        if not inspector.has_table(table_name):
+            continue
+        # 新库由 create_all 建表时已带该列，这里只补老库
+        if "tree_path" not in {col["name"] for col in inspector.get_columns(table_name)}:
+            op.add_column(
+                table_name,
+                sa.Column("tree_path", sa.String(length=512), server_default="", nullable=False, comment="物化路径(/祖先ID/.../自身ID/)"),
+            )
+        if f"ix_{table_name}_tree_path" not in {index["name"] for index in inspector.get_indexes(table_name)}:
+            op.create_index(f"ix_{table_name}_tree_path", table_name, ["tree_path"])
+
+        table = sa.table(table_name, sa.column("id", sa.Integer), sa.column("parent_id", sa.Integer), sa.column("tree_path", sa.String))
+        rows = bind.execute(sa.select(table.c.id, table.c.parent_id)).all()
+        paths = _compute_paths({row.id: row.parent_id for row in rows})
+        if paths:
+            bind.execute(
+                table.update().where(table.c.id == sa.bindparam("b_id")).values(tree_path=sa.bindparam("b_path")),
+                [{"b_id": node_id, "b_path": path} for node_id, path in paths.items()],
+            )
+
+
+def downgrade() -> None:
+    for table_name in TREE_TABLES:
+        # batch 模式兼容 sqlite 的 DROP COLUMN
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_index(f"ix_{table_name}_tree_path")
+            batch_op.drop_column("tree_path")
@@ -0,0 +1,41 @@
+"""新增登录日汇总表 sys_login_daily_stat
+
+Revision ID: b4e9d7a15c20
+Revises: 8f3a2c1d9b7e
+Create Date: 2026-10-18 21:00:00
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e9d7a15c20"
+down_revision: str | None = "8f3a2c1d9b7e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE_NAME = "sys_login_daily_stat"
+
+
+def upgrade() -> None:
+    # 新库由 create_all 建表，这里只补老库；数据由调度任务首次执行时回填
+    if sa.inspect(op.get_bind()).has_table(TABLE_NAME):
+        return
+    op.create_table(
+        TABLE_NAME,
+        sa.Column("stat_date", sa.Date(), primary_key=True, comment="统计日期"),
+        sa.Column("login_count", sa.Integer(), nullable=False, server_default="0", comment="登录次数"),
+        sa.Column("success_count", sa.Integer(), nullable=False, server_default="0", comment="成功次数"),
+        sa.Column("fail_count", sa.Integer(), nullable=False, server_default="0", comment="失败次数"),
+        sa.Column("unique_users", sa.Integer(), nullable=False, server_default="0", comment="成功登录的独立用户数"),
+        sa.Column("login_users", sa.Integer(), nullable=False, server_default="0", comment="登录（含失败）的独立用户数"),
+        sa.Column("new_users", sa.Integer(), nullable=False, server_default="0", comment="新增用户数"),
+        sa.Column("updated_time", sa.DateTime(timezone=True), nullable=False, comment="汇总时间"),
+        comment="登录日汇总表",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(TABLE_NAME)
@@ -0,0 +1,63 @@
+"""业务表增加创建人部门 created_dept_id 并按创建人当前部门回填
+
+Revision ID: d6c41e8a2f53
+Revises: b4e9d7a15c20
+Create Date: 2026-10-18 22:00:00
+
+"""
+from collections import defaultdict
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d6c41e8a2f53"
+down_revision: str | None = "b4e9d7a15c20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMN_NAME = "created_dept_id"
+
+
+def _audited_tables(inspector: sa.Inspector) -> list[str]:
+    """带 created_id 的表即 UserMixin 业务表。"""
+    return [name for name in inspector.get_table_names() if "created_id" in {col["name"] for col in inspector.get_columns(name)}]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    table_names = _audited_tables(inspector)
+
+    for table_name in table_names:
+        # 新库由 create_all 建表时已带该列，这里只补老库
+        if COLUMN_NAME not in {col["name"] for col in inspector.get_columns(table_name)}:
+            op.add_column(table_name, sa.Column(COLUMN_NAME, sa.Integer(), nullable=True, comment="创建人部门ID"))
+        if f"ix_{table_name}_{COLUMN_NAME}" not in {index["name"] for index in inspector.get_indexes(table_name)}:
+            op.create_index(f"ix_{table_name}_{COLUMN_NAME}", table_name, [COLUMN_NAME])
+
+    # 回填：与 python main.py backfill-dept 相同，先取创建人 → 部门映射，再按部门分组 UPDATE（MySQL 不允许子查询引用被更新表）
+    if not inspector.has_table("sys_user"):
+        return
+    user = sa.table("sys_user", sa.column("id", sa.Integer), sa.column("dept_id", sa.Integer))
+    users_by_dept: dict[int, list[int]] = defaultdict(list)
+    for user_id, dept_id in bind.execute(sa.select(user.c.id, user.c.dept_id).where(user.c.dept_id.is_not(None))).all():
+        users_by_dept[dept_id].append(user_id)
+
+    for table_name in table_names:
+        table = sa.table(table_name, sa.column("created_id", sa.Integer), sa.column(COLUMN_NAME, sa.Integer))
+        for dept_id, user_ids in users_by_dept.items():
+            bind.execute(
+                table.update()
+                .where(table.c.created_dept_id.is_(None), table.c.created_id.in_(user_ids))
+                .values(created_dept_id=dept_id)
+            )
+
+
+def downgrade() -> None:
+    for table_name in _audited_tables(sa.inspect(op.get_bind())):
+        # batch 模式兼容 sqlite 的 DROP COLUMN
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_index(f"ix_{table_name}_{COLUMN_NAME}")
+            batch_op.drop_column(COLUMN_NAME)
@@ -505,7 +505,7 @@ class GenTableService:
                             # 只更新前端实际修改的字段（利用 Pydantic model_fields_set）
                             update_data = gen_table_column.model_dump(exclude_unset=True, exclude={"id", "super_column"})
                             if update_data:
-                                await GenTableColumnCRUD(self.auth, self.db).update(id=col_id, data=GenTableColumnSchema(**update_data))
+                                await GenTableColumnCRUD(self.auth, self.db).update(id=col_id, data=GenTableColumnSchema(**update_data), load_audit=False)
                         else:
                             # 新增列：前端新增但库中无对应记录
                             column_schema = GenTableColumnSchema(
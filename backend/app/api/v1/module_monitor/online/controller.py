@@ -5,13 +5,12 @@ from fastapi.responses import JSONResponse
 from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.common.request import PaginationService
 from app.common.response import ResponseSchema, SuccessResponse
 from app.core.base_schema import AuthSchema, PaginationQueryParam
 from app.core.dependencies import AuthPermission, db_getter, get_current_user, redis_getter
 from app.core.router_class import OperationLogRoute
 
-from .schema import DashboardStatsSchema, OnlineOutSchema, OnlineQueryParam
+from .schema import ActiveUsersOutSchema, ActiveUsersQueryParam, DashboardStatsSchema, OnlineOutSchema, OnlineQueryParam
 from .service import OnlineService
 
 OnlineRouter = APIRouter(route_class=OperationLogRoute, prefix="/online", tags=["在线用户"])
@@ -23,12 +22,7 @@ async def get_online_list_controller(
     page: Annotated[PaginationQueryParam, Depends()],
     search: Annotated[OnlineQueryParam, Query()],
 ) -> JSONResponse:
-    result_dict_list = await OnlineService.get_online_list(redis=redis, search=search)
-    result_dict = await PaginationService.paginate(
-        data_list=result_dict_list,
-        page_no=page.page_no,
-        page_size=page.page_size,
-    )
+    result_dict = await OnlineService.get_online_page(redis=redis, page_no=page.page_no, page_size=page.page_size, search=search)
     return SuccessResponse(data=result_dict, msg="获取成功")
 
 
@@ -62,7 +56,16 @@ async def clear_online_controller(
 async def get_dashboard_stats_controller(
     db: Annotated[AsyncSession, Depends(db_getter)],
     redis: Annotated[Redis, Depends(redis_getter)],
-    _auth: Annotated[AuthSchema, Security(AuthPermission(["module_monitor:dashboard:query"]))],
+    auth: Annotated[AuthSchema, Security(AuthPermission(["module_monitor:dashboard:query"]))],
 ) -> JSONResponse:
-    data = await OnlineService.get_dashboard_stats(db=db, redis=redis)
+    data = await OnlineService.get_dashboard_stats(auth=auth, db=db, redis=redis)
     return SuccessResponse(data=data, msg="获取仪表盘统计成功")
+
+
+@OnlineRouter.get("/active", summary="获取区间活跃用户数", response_model=ResponseSchema[ActiveUsersOutSchema], dependencies=[Security(AuthPermission(["module_monitor:dashboard:query"]))])
+async def get_active_users_controller(
+    redis: Annotated[Redis, Depends(redis_getter)],
+    search: Annotated[ActiveUsersQueryParam, Query()],
+) -> JSONResponse:
+    data = await OnlineService.get_active_users(redis=redis, search=search)
+    return SuccessResponse(data=data, msg="获取活跃用户数成功")
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel, Field
 
@@ -41,5 +41,22 @@ class DashboardStatsSchema(BaseModel):
     today_login_count: int = 0
     today_unique_users: int = 0
     week_user_created: int = 0
+    dau: int = 0  # 今日活跃用户（HyperLogLog 估算，下同）
+    wau: int = 0  # 近 7 天活跃用户
+    mau: int = 0  # 近 30 天活跃用户
     login_trend: list[LoginTrendItem] = []
     recent_logins: list[RecentLoginItem] = []
+
+
+class ActiveUsersQueryParam(BaseModel):
+    """活跃用户区间查询参数"""
+
+    start_date: date = Field(..., description="开始日期（含）")
+    end_date: date = Field(..., description="结束日期（含）")
+
+
+class ActiveUsersOutSchema(BaseModel):
+    """区间活跃用户数"""
+    start_date: date
+    end_date: date
+    active_users: int = 0  # 区间内去重活跃用户（HyperLogLog 估算）
@@ -1,81 +1,98 @@
-import json
-from datetime import date, datetime, timedelta
+from datetime import timedelta
 
 from redis.asyncio.client import Redis
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.module_system.log.model import LoginLogModel
-from app.api.v1.module_system.user.model import UserModel
+from app.api.v1.module_system.user.crud import UserCRUD
 from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.auth_cache import invalidate_auth_cache
+from app.core.base_schema import AuthSchema, PageResultSchema
+from app.core.exceptions import CustomException
 from app.core.logger import logger
+from app.core.login_stats import STAT_FIELDS, ActiveUsers, get_daily_stats, get_today_counters, stat_today
 from app.core.redis_crud import RedisCURD
-from app.core.security import decode_access_token
+from app.core.session_index import SessionIndex, is_ip_address
 
-from .schema import DashboardStatsSchema, LoginTrendItem, OnlineQueryParam, RecentLoginItem
+from .schema import (
+    ActiveUsersOutSchema,
+    ActiveUsersQueryParam,
+    DashboardStatsSchema,
+    LoginTrendItem,
+    OnlineQueryParam,
+    RecentLoginItem,
+)
 
 
 class OnlineService:
     """在线用户管理模块服务层"""
 
     @staticmethod
-    async def get_online_list(redis: Redis, search: OnlineQueryParam | None = None) -> list[dict]:
-        keys = await RedisCURD(redis).scan_keys(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
-        tokens = await RedisCURD(redis).mget(keys)
-
-        online_users = []
-        for key, token in zip(keys, tokens, strict=True):
-            if not token:
-                continue
-            try:
-                payload = decode_access_token(token=token)
-                session_id = payload.sub
-
-                # 从 Redis 读取完整会话信息
-                raw = await RedisCURD(redis).get(f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}")
-                if not raw:
-                    continue
-                session_info = json.loads(raw)
-
-                # 内联搜索匹配逻辑
-                if search:
-                    if search.name and search.name[1]:
-                        kw = search.name[1].strip("%")
-                        if kw.lower() not in session_info.get("name", "").lower():
-                            continue
-                    if search.ipaddr and search.ipaddr[1]:
-                        kw = search.ipaddr[1].strip("%")
-                        if kw not in session_info.get("ipaddr", ""):
-                            continue
-                    if search.login_location and search.login_location[1]:
-                        kw = search.login_location[1].strip("%")
-                        if kw.lower() not in session_info.get("login_location", "").lower():
-                            continue
-
-                online_users.append(session_info)
-            except Exception:
-                # token 已过期或无效，清理 Redis 中的脏数据
-                key_str = key.decode() if isinstance(key, bytes) else key
-                session_id = key_str.split(":")[-1]
-                await RedisCURD(redis).delete(key_str)
-                await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
-                await RedisCURD(redis).delete(f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}")
-                continue
-
-        online_users.sort(key=lambda x: x.get("login_time", ""), reverse=True)
-        return online_users
+    async def get_online_page(
+        redis: Redis,
+        page_no: int,
+        page_size: int,
+        search: OnlineQueryParam | None = None,
+    ) -> PageResultSchema:
+        """分页获取在线用户（基于在线会话索引，不再 SCAN 全部令牌键）
+
+        - 无条件：有序集合按分值区间取一页，一次 MGET，O(页大小)；
+        - IP 为完整地址：走 IP 索引集合；
+        - 名称/登录地/部分 IP 等文本条件：按批遍历索引过滤（每批一次 MGET），不解码 JWT。
+        """
+        index = SessionIndex(redis)
+        offset = (page_no - 1) * page_size
+        name, ipaddr, location = OnlineService._search_terms(search)
+
+        if not (name or ipaddr or location):
+            total, items = await index.page(offset=offset, limit=page_size)
+        else:
+            if ipaddr and is_ip_address(ipaddr):
+                candidates = await index.by_ip(ipaddr)
+                ipaddr = None
+            else:
+                candidates = [session async for session in index.iter_all()]
+            matched = [s for s in candidates if OnlineService._match(s, name, ipaddr, location)]
+            total, items = len(matched), matched[offset : offset + page_size]
+
+        return PageResultSchema(items=items, total=total, page_no=page_no, page_size=page_size, has_next=offset + len(items) < total)
+
+    @staticmethod
+    def _search_terms(search: OnlineQueryParam | None) -> tuple[str | None, str | None, str | None]:
+        if not search:
+            return None, None, None
+        terms = (search.name, search.ipaddr, search.login_location)
+        return tuple((term.strip().strip("%") or None) if term else None for term in terms)  # type: ignore[return-value]
+
+    @staticmethod
+    def _match(session: dict, name: str | None, ipaddr: str | None, location: str | None) -> bool:
+        if name and name.lower() not in (session.get("name") or "").lower():
+            return False
+        if ipaddr and ipaddr not in (session.get("ipaddr") or ""):
+            return False
+        return not (location and location.lower() not in (session.get("login_location") or "").lower())
 
     @staticmethod
     async def get_current_user_sessions(redis: Redis, user_id: int) -> list[dict]:
-        """获取当前用户的在线会话列表"""
-        all_online = await OnlineService.get_online_list(redis)
-        return [s for s in all_online if s.get("user_id") == user_id]
+        """获取当前用户的在线会话列表（用户会话索引，O(该用户会话数)）"""
+        return await SessionIndex(redis).by_user(user_id)
 
     @staticmethod
     async def delete_online(redis: Redis, session_id: str) -> None:
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}")
+        redis_curd = RedisCURD(redis)
+        async with redis_curd.pipeline(raise_on_error=True) as pipe:
+            await redis_curd.multi_delete(
+                [
+                    f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
+                    f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
+                    f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}",
+                ],
+                pipe=pipe,
+            )
+            SessionIndex.remove(pipe, session_id)
+        await invalidate_auth_cache(session_id=session_id)
         logger.info(f"强制下线用户会话: {session_id}")
 
     @staticmethod
@@ -83,37 +100,45 @@ class OnlineService:
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:*")
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.USER_SESSION.key}:*")
+        await SessionIndex(redis).clear()
+        await invalidate_auth_cache(clear_all=True)
         logger.info("清除所有在线用户会话成功")
 
     @staticmethod
-    async def get_dashboard_stats(db: AsyncSession, redis: Redis) -> DashboardStatsSchema:
-        """获取仪表盘统计数据"""
-        today_start = datetime.combine(date.today(), datetime.min.time())
-        week_start = today_start - timedelta(days=7)
-
-        online_count = len(await OnlineService.get_online_list(redis))
+    async def get_dashboard_stats(auth: AuthSchema, db: AsyncSession, redis: Redis) -> DashboardStatsSchema:
+        """获取仪表盘统计数据
 
-        users_sql = select(func.count()).select_from(UserModel).where(UserModel.is_deleted.is_(False))
-        user_count = (await db.execute(users_sql)).scalar() or 0
-
-        users_week_sql = (
-            select(func.count()).select_from(UserModel)
-            .where(UserModel.is_deleted.is_(False), UserModel.created_time >= week_start)
-        )
-        user_week_count = (await db.execute(users_week_sql)).scalar() or 0
-
-        today_login_sql = (
-            select(func.count()).select_from(LoginLogModel)
-            .where(LoginLogModel.created_time >= today_start)
-        )
-        today_login_count = (await db.execute(today_login_sql)).scalar() or 0
-
-        today_unique_sql = (
-            select(func.count(func.distinct(LoginLogModel.username)))
-            .select_from(LoginLogModel)
-            .where(LoginLogModel.created_time >= today_start)
-        )
-        today_unique_count = (await db.execute(today_unique_sql)).scalar() or 0
+        - 整体结果缓存为短时快照（DASHBOARD_SNAPSHOT_TTL），并发刷新仪表盘只有首个请求重算；
+        - 历史趋势读登录日汇总表（调度任务增量维护），当天读 Redis 计数；
+        - 用户总数读 CRUD 写入维护的计数器，不再 COUNT 全表。
+        """
+        snapshot_key = RedisInitKeyConfig.DASHBOARD_SNAPSHOT.key
+        cached = await RedisCURD(redis).get(snapshot_key)
+        if cached:
+            return DashboardStatsSchema.model_validate_json(cached)
+
+        today = stat_today()
+        week_start = today - timedelta(days=6)
+        daily = await get_daily_stats(db, start=week_start, end=today)
+        # 汇总表中的当天数据滞后一个汇总周期；Redis 计数只在事务提交后累加、不含丢弃的日志，但不扣减当天删除的用户/日志，
+        # 且计数上线/Redis 重启前的部分会缺失。两者各有偏差，逐项取大：正常情况下 Redis 计数更新，汇总追上后以汇总为准
+        counters = await get_today_counters(redis)
+        rolled = daily.get(today, {})
+        daily[today] = {field: max(counters[field], rolled.get(field, 0)) for field in STAT_FIELDS}
+
+        # 近 7 天趋势（含今天，按日期升序，缺口补 0）
+        login_trend: list[LoginTrendItem] = []
+        for offset in range(7):
+            day = week_start + timedelta(days=offset)
+            stats = daily.get(day, {})
+            login_trend.append(
+                LoginTrendItem(
+                    day=day.isoformat(),
+                    logins=stats.get("success_count", 0),  # 仅统计成功登录
+                    unique_users=stats.get("unique_users", 0),
+                    new_users=stats.get("new_users", 0),
+                )
+            )
 
         recent_stmt = (
             select(LoginLogModel.username, LoginLogModel.status, LoginLogModel.created_time,
@@ -129,76 +154,27 @@ class OnlineService:
             for r in recent_rows
         ]
 
-        # 近 7 天登录趋势：按天聚合登录次数 / 独立用户 / 新增用户（含今天，共 7 天）
-        login_trend = await OnlineService._build_login_trend(db, today_start=today_start, week_start=week_start)
-
         result = DashboardStatsSchema(
-            online_users=online_count,
-            total_users=user_count,
-            today_login_count=today_login_count,
-            today_unique_users=today_unique_count,
-            week_user_created=user_week_count,
+            **await ActiveUsers.summary(redis),
+            online_users=await SessionIndex(redis).count(),
+            total_users=await UserCRUD(auth, db).total(),
+            today_login_count=daily[today]["login_count"],
+            today_unique_users=daily[today]["login_users"],  # 与改写前一致，含失败登录
+            week_user_created=sum(item.new_users for item in login_trend),
             login_trend=login_trend,
             recent_logins=recent_logins,
         )
+        await RedisCURD(redis).set(snapshot_key, result.model_dump_json(), expire=settings.DASHBOARD_SNAPSHOT_TTL)
         return result
 
     @staticmethod
-    async def _build_login_trend(db: AsyncSession, *, today_start: datetime, week_start: datetime) -> list[LoginTrendItem]:
-        """构建近 7 天登录趋势（含今天，共 7 天，按日期倒序填充缺口为 0）。
-
-        参数:
-        - db (AsyncSession): 数据库会话
-        - today_start (datetime): 今天零点
-        - week_start (datetime): 7 天前零点
-
-        返回:
-        - list[LoginTrendItem]: 按日期升序的 7 天趋势
-        """
-        # 查询 7 天内每天登录次数与独立用户数
-        login_sql = (
-            select(
-                func.date(LoginLogModel.created_time).label("day"),
-                func.count().label("logins"),
-                func.count(func.distinct(LoginLogModel.username)).label("unique_users"),
-            )
-            .where(
-                LoginLogModel.is_deleted.is_(False),
-                LoginLogModel.status == 1,  # 仅统计成功登录
-                LoginLogModel.created_time >= week_start,
-            )
-            .group_by(func.date(LoginLogModel.created_time))
-        )
-        login_rows = (await db.execute(login_sql)).all()
-        login_map = {str(r.day): (r.logins, r.unique_users) for r in login_rows}
-
-        # 查询 7 天内每天新增用户数
-        new_user_sql = (
-            select(
-                func.date(UserModel.created_time).label("day"),
-                func.count().label("new_users"),
-            )
-            .where(
-                UserModel.is_deleted.is_(False),
-                UserModel.created_time >= week_start,
-            )
-            .group_by(func.date(UserModel.created_time))
-        )
-        new_rows = (await db.execute(new_user_sql)).all()
-        new_map = {str(r.day): r.new_users for r in new_rows}
-
-        # 生成连续 7 天日期序列（升序），缺口补 0
-        trend: list[LoginTrendItem] = []
-        for offset in range(7):
-            d = week_start.date() + timedelta(days=offset)
-            day_str = d.isoformat()
-            logins, unique_users = login_map.get(day_str, (0, 0))
-            trend.append(
-                LoginTrendItem(
-                    day=day_str,
-                    logins=int(logins or 0),
-                    unique_users=int(unique_users or 0),
-                    new_users=int(new_map.get(day_str, 0) or 0),
-                )
-            )
-        return trend
+    async def get_active_users(redis: Redis, search: ActiveUsersQueryParam) -> ActiveUsersOutSchema:
+        """区间去重活跃用户数（每日 HyperLogLog 多键 PFCOUNT），区间不得超出保留天数。"""
+        if search.end_date < search.start_date:
+            raise CustomException(msg="结束日期不能早于开始日期")
+        earliest = stat_today() - timedelta(days=settings.ACTIVE_USERS_RETENTION_DAYS - 1)
+        if search.start_date < earliest:
+            raise CustomException(msg=f"仅保留最近 {settings.ACTIVE_USERS_RETENTION_DAYS} 天的活跃用户数据")
+        end_date = min(search.end_date, stat_today())
+        active_users = await ActiveUsers.count(redis, start=search.start_date, end=end_date) if end_date >= search.start_date else 0
+        return ActiveUsersOutSchema(start_date=search.start_date, end_date=search.end_date, active_users=active_users)
@@ -55,6 +55,15 @@ class DiskInfoSchema(BaseModel):
     usage: float = Field(ge=0, le=100, description="使用率(%)")
 
 
+class PwdHashPoolSchema(BaseModel):
+    """密码哈希进程池信息模型（当前 worker）"""
+
+    workers: int = Field(description="哈希进程数")
+    in_flight: int = Field(description="在途任务数(执行中+排队)")
+    queue_depth: int = Field(description="排队任务数")
+    rejected: int = Field(description="因队列已满被拒绝的次数")
+
+
 class ServerMonitorSchema(BaseModel):
     """服务器监控信息模型"""
 
@@ -63,3 +72,4 @@ class ServerMonitorSchema(BaseModel):
     py: PyInfoSchema = Field(description="Python运行信息")
     sys: SysInfoSchema = Field(description="系统信息")
     disks: list[DiskInfoSchema] = Field(default_factory=list, description="磁盘信息")
+    pwd_hash: PwdHashPoolSchema | None = Field(default=None, description="密码哈希进程池")
@@ -6,11 +6,13 @@ from pathlib import Path
 import psutil
 
 from app.utils.common_util import bytes2human
+from app.utils.password_util import pwd_hash_pool
 
 from .schema import (
     CpuInfoSchema,
     DiskInfoSchema,
     MemoryInfoSchema,
+    PwdHashPoolSchema,
     PyInfoSchema,
     ServerMonitorSchema,
     SysInfoSchema,
@@ -28,6 +30,7 @@ class ServerService:
             sys=ServerService._get_system_info(),
             py=ServerService._get_python_info(),
             disks=ServerService._get_disk_info(),
+            pwd_hash=PwdHashPoolSchema(**pwd_hash_pool.stats()),
         )
 
     @staticmethod
@@ -6,26 +6,28 @@ from typing import Any, NewType
 import ua_parser
 from fastapi import BackgroundTasks, Request
 from redis.asyncio.client import Redis
-from sqlalchemy import update as sa_update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.module_system.log.crud import LoginLogCRUD
-from app.api.v1.module_system.log.model import LoginLogModel
 from app.api.v1.module_system.log.schema import LoginLogCreateSchema
 from app.api.v1.module_system.user.crud import UserCRUD
 from app.api.v1.module_system.user.model import UserModel
 from app.common.enums import RedisInitKeyConfig
 from app.config.setting import settings
+from app.core.auth_cache import invalidate_auth_cache
 from app.core.base_schema import AuthSchema, JWTOutSchema, JWTPayloadSchema
-from app.core.database import async_db_session
 from app.core.exceptions import CustomException
+from app.core.log_writer import log_writer
 from app.core.logger import logger
+from app.core.login_stats import ActiveUsers
+from app.core.permission_set import role_set_hash
 from app.core.redis_crud import RedisCURD
 from app.core.security import (
     CustomOAuth2PasswordRequestForm,
     create_access_token,
     decode_access_token,
 )
+from app.core.session_index import SessionIndex
 from app.utils.common_util import get_random_character
 from app.utils.ip_local_util import IpLocalUtil, get_client_ip
 from app.utils.password_util import PwdUtil
@@ -47,41 +49,35 @@ async def _write_login_log(
     request_os: str | None = None,
     request_browser: str | None = None,
     msg: str | None = None,
-) -> int | None:
-    """写入登录日志；返回日志 ID（用于后台补全归属地）。"""
+) -> None:
+    """登录日志交给批量写入器（与操作日志同一队列）；当日登录计数由 LoginLogCRUD 在日志提交后累加。"""
     try:
-        async with async_db_session() as session, session.begin():
-            _auth = AuthSchema()
-            obj = await LoginLogCRUD(_auth, session).create(
-                data=LoginLogCreateSchema(
-                    username=username,
-                    status=status,
-                    login_ip=login_ip,
-                    login_location=login_location,
-                    request_os=request_os,
-                    request_browser=request_browser,
-                    msg=msg,
-                ),
-            )
-            return obj.id if obj else None
+        await log_writer.write(
+            LoginLogCRUD,
+            LoginLogCreateSchema(
+                username=username,
+                status=status,
+                login_ip=login_ip,
+                login_location=login_location,
+                request_os=request_os,
+                request_browser=request_browser,
+                msg=msg,
+            ),
+        )
     except Exception:
-        return None
+        logger.exception("登录日志写入失败: username={}", username)
 
 
-async def _async_fill_login_location(redis, login_log_id: int, ip: str | None) -> None:
-    """后台异步补全登录日志的归属地。"""
-    if not ip:
-        return
+async def _write_login_log_with_location(redis, ip: str | None, **log_kwargs: Any) -> None:
+    """后台任务：先解析 IP 归属地再写登录日志，省去写入后再回填的 UPDATE；解析失败时保留占位值。"""
     try:
-        location = await IpLocalUtil.resolve_location_async(redis, ip)
-        logger.info(f"异步解析IP归属地结果: ip={ip}, log_id={login_log_id}, location={location}")
-        if location == "归属地查询中" or not location:
-            return
-        async with async_db_session() as session, session.begin():
-            await session.execute(sa_update(LoginLogModel).where(LoginLogModel.id == login_log_id).values(login_location=location))
-            logger.info(f"登录日志归属地已更新: log_id={login_log_id}, location={location}")
+        location = await IpLocalUtil.resolve_location_async(redis, ip) if ip else None
+        logger.info(f"异步解析IP归属地结果: ip={ip}, location={location}")
+        if location and location != "归属地查询中":
+            log_kwargs["login_location"] = location
     except Exception as e:
-        logger.warning(f"异步补全登录归属地失败: {e}")
+        logger.warning(f"异步解析登录归属地失败: {e}")
+    await _write_login_log(**log_kwargs)
 
 
 class LoginService:
@@ -92,29 +88,21 @@ class LoginService:
         self.db = db
 
     @staticmethod
-    def _collect_permissions(
+    async def _collect_role_set(
         user: UserModel,
-    ) -> tuple[list[str], list[int]]:
-        """收集用户角色下的权限和菜单 ID
+    ) -> str:
+        """用户角色组合标识（权限与菜单按角色组合共享存储与编译，见 app.core.permission_set）
 
         参数:
-        - user (UserModel): 用户对象
+        - user (UserModel): 用户对象（未预加载 roles 时在此加载）
 
         返回:
-        - tuple[list[str], list[int]]: (permissions, menu_ids)
+        - str: 角色组合标识，超级管理员或无角色时为空串
         """
-        permissions: list[str] = []
-        menu_ids: list[int] = []
-        if not user.is_superuser and hasattr(user, "roles"):
-            for role in user.roles:
-                if role and role.status == 0:
-                    if hasattr(role, "menus"):
-                        for menu in role.menus:
-                            if menu and menu.status == 0:
-                                menu_ids.append(menu.id)
-                                if menu.permission:
-                                    permissions.append(menu.permission)
-        return permissions, menu_ids
+        if user.is_superuser:
+            return ""
+        roles = await user.awaitable_attrs.roles
+        return role_set_hash(role.id for role in roles if role)
 
     @classmethod
     async def authenticate_user(
@@ -146,7 +134,7 @@ class LoginService:
             )
 
         auth = AuthSchema()
-        user = await UserCRUD(auth, db).get(username=login_form.username, preload=["roles", "roles.menus"])
+        user = await UserCRUD(auth, db).get(username=login_form.username, preload=["roles"])
 
         if not user:
             await _write_login_log(
@@ -160,7 +148,7 @@ class LoginService:
             )
             raise CustomException(msg="用户不存在")
 
-        if not PwdUtil.verify_password(plain_password=login_form.password, password_hash=user.password):
+        if not await PwdUtil.verify_password_async(plain_password=login_form.password, password_hash=user.password):
             await _write_login_log(
                 username=_login_username,
                 status=2,
@@ -183,7 +171,9 @@ class LoginService:
             )
             raise CustomException(msg="用户已被停用")
 
-        await UserCRUD(auth, db).update_last_login(id=user.id)
+        # 迭代次数调整后，老哈希在登录成功时用明文重算，随最后登录时间一并写回
+        rehashed = await PwdUtil.hash_password_async(login_form.password) if PwdUtil.needs_rehash(user.password) else None
+        await UserCRUD(auth, db).update_last_login(id=user.id, password_hash=rehashed)
 
         if not user:
             raise CustomException(msg="用户不存在")
@@ -205,18 +195,20 @@ class LoginService:
             "is_superuser": user.is_superuser,
         }
 
-        log_id = await _write_login_log(
-            username=user.username,
-            status=1,
-            login_ip=request_ip,
-            login_location=login_location,
-            request_os=_login_os,
-            request_browser=_login_browser,
-            msg="登录成功",
-        )
-        # 登录成功后异步补全归属地，不阻塞返回
-        if log_id and login_location == "归属地查询中":
-            background_tasks.add_task(_async_fill_login_location, redis, log_id, request_ip)
+        login_log = {
+            "username": user.username,
+            "status": 1,
+            "login_ip": request_ip,
+            "login_location": login_location,
+            "request_os": _login_os,
+            "request_browser": _login_browser,
+            "msg": "登录成功",
+        }
+        # 归属地未命中缓存时放到响应之后解析，解析完再写日志，不阻塞返回
+        if login_location == "归属地查询中":
+            background_tasks.add_task(_write_login_log_with_location, redis, request_ip, **login_log)
+        else:
+            await _write_login_log(**login_log)
 
         return LoginOutSchema(
             access_token=token.access_token,
@@ -230,8 +222,7 @@ class LoginService:
     def _build_session_dict(
         user: UserModel,
         session_id: str,
-        permissions: list[str],
-        menu_ids: list[int],
+        role_set: str,
         request_ip: str,
         login_location: str | None,
         ua_result: Any,
@@ -242,8 +233,7 @@ class LoginService:
         参数:
         - user (UserModel): 用户对象
         - session_id (str): 会话ID
-        - permissions (list[str]): 权限标识列表
-        - menu_ids (list[int]): 菜单ID列表
+        - role_set (str): 角色组合标识（权限数据按组合共享存储，会话只存引用）
         - request_ip (str): 请求IP
         - login_location (str): 登录地点
         - ua_result: User-Agent 解析结果
@@ -264,8 +254,7 @@ class LoginService:
             "email": user.email,
             "gender": user.gender,
             "avatar": user.avatar,
-            "permissions": permissions,
-            "menu_ids": menu_ids,
+            "role_set": role_set,
             "ipaddr": request_ip,
             "login_location": login_location,
             "os": ua_result.os.family if ua_result.os else "Unknown",
@@ -288,13 +277,10 @@ class LoginService:
 
         now = datetime.now()
 
-        permissions, menu_ids = LoginService._collect_permissions(user)
-
         session_dict = LoginService._build_session_dict(
             user=user,
             session_id=session_id,
-            permissions=permissions,
-            menu_ids=menu_ids,
+            role_set=await LoginService._collect_role_set(user),
             request_ip=request_ip,
             login_location=login_location,
             ua_result=ua_result,
@@ -302,13 +288,6 @@ class LoginService:
         )
         session_info = json.dumps(session_dict, default=str)
 
-        # 会话信息存 Redis（完整 JSON），JWT sub 仅含 session_id
-        await RedisCURD(redis).set(
-            key=f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}",
-            value=session_info,
-            expire=int(refresh_expires.total_seconds()),
-        )
-
         access_token = create_access_token(
             payload=JWTPayloadSchema(
                 sub=session_id,
@@ -324,17 +303,20 @@ class LoginService:
             ),
         )
 
-        await RedisCURD(redis).set(
-            key=f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
-            value=access_token,
-            expire=int(access_expires.total_seconds()),
-        )
-
-        await RedisCURD(redis).set(
-            key=f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
-            value=refresh_token,
-            expire=int(refresh_expires.total_seconds()),
-        )
+        # 会话信息存 Redis（完整 JSON），JWT sub 仅含 session_id；会话、两个令牌与在线索引一次往返写入。
+        # 写入失败直接抛出：会话不在 Redis 里，签发出去的令牌也无法通过认证
+        redis_curd = RedisCURD(redis)
+        async with redis_curd.pipeline(raise_on_error=True) as pipe:
+            await redis_curd.mset_with_ttl(
+                {
+                    f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}": (session_info, int(refresh_expires.total_seconds())),
+                    f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}": (access_token, int(access_expires.total_seconds())),
+                    f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}": (refresh_token, int(refresh_expires.total_seconds())),
+                },
+                pipe=pipe,
+            )
+            SessionIndex.add(pipe, session_id, user.id, request_ip, int(refresh_expires.total_seconds()))
+            ActiveUsers.add(pipe, user.id)
 
         return JWTOutSchema(
             access_token=access_token,
@@ -360,7 +342,8 @@ class LoginService:
         if not session_info:
             raise CustomException(msg="会话已过期，请重新登录")
 
-        user_id = json.loads(session_info).get("user_id")
+        session_dict = json.loads(session_info)
+        user_id = session_dict.get("user_id")
 
         if not session_id or not user_id:
             raise CustomException(msg="非法凭证,无法获取会话编号或用户ID")
@@ -376,12 +359,6 @@ class LoginService:
         refresh_expires = timedelta(seconds=settings.REFRESH_TOKEN_EXPIRE_SECONDS)
         now = datetime.now()
 
-        # 延长会话信息 Redis TTL
-        await RedisCURD(redis).expire(
-            key=f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}",
-            expire=int(refresh_expires.total_seconds()),
-        )
-
         access_token = create_access_token(
             payload=JWTPayloadSchema(
                 sub=session_id,
@@ -398,17 +375,18 @@ class LoginService:
             ),
         )
 
-        await RedisCURD(redis).set(
-            key=f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
-            value=access_token,
-            expire=int(access_expires.total_seconds()),
-        )
-
-        await RedisCURD(redis).set(
-            key=f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
-            value=refresh_token_new,
-            expire=int(refresh_expires.total_seconds()),
-        )
+        # 延长会话信息 Redis TTL 并写入新令牌（同一 pipeline）
+        redis_curd = RedisCURD(redis)
+        async with redis_curd.pipeline(raise_on_error=True) as pipe:
+            pipe.expire(f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}", int(refresh_expires.total_seconds()))
+            await redis_curd.mset_with_ttl(
+                {
+                    f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}": (access_token, int(access_expires.total_seconds())),
+                    f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}": (refresh_token_new, int(refresh_expires.total_seconds())),
+                },
+                pipe=pipe,
+            )
+            SessionIndex.add(pipe, session_id, user_id, session_dict.get("ipaddr"), int(refresh_expires.total_seconds()))
 
         return JWTOutSchema(
             access_token=access_token,
@@ -426,9 +404,19 @@ class LoginService:
         if not session_id:
             raise CustomException(msg="非法凭证,无法获取会话编号")
 
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}")
+        # 删除失败时抛出，不能把仍然有效的会话报告为已退出
+        redis_curd = RedisCURD(redis)
+        async with redis_curd.pipeline(raise_on_error=True) as pipe:
+            await redis_curd.multi_delete(
+                [
+                    f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
+                    f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
+                    f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}",
+                ],
+                pipe=pipe,
+            )
+            SessionIndex.remove(pipe, session_id)
+        await invalidate_auth_cache(session_id=session_id)
 
         logger.info(f"用户退出登录成功,会话编号:{session_id}")
 
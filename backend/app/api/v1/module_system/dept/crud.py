@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.base_crud import CRUDBase
 from app.core.base_schema import AuthSchema
+from app.core.permission import bump_data_scope_version
 
 from .model import DeptModel
 from .schema import DeptCreateSchema, DeptUpdateSchema
@@ -12,3 +13,8 @@ class DeptCRUD(CRUDBase[DeptModel, DeptCreateSchema, DeptUpdateSchema]):
 
     def __init__(self, auth: AuthSchema, db: AsyncSession) -> None:
         super().__init__(model=DeptModel, auth=auth, db=db)
+
+    async def _after_write(self) -> None:
+        """部门树变更影响数据权限解析结果，事务提交后递增数据权限版本号。"""
+        await super()._after_write()
+        self._after_commit(bump_data_scope_version, key="data_scope_version")
@@ -2,14 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.base_schema import AuthSchema, BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_child_id_map,
-    get_child_recursion,
-    get_parent_id_map,
-    get_parent_recursion,
-    search_to_dict,
-    traversal_to_tree,
-)
+from app.utils.common_util import search_to_dict, traversal_to_tree
 
 from .crud import DeptCRUD
 from .schema import (
@@ -68,38 +61,24 @@ class DeptService:
         if exist_code and exist_code.id != id:
             raise CustomException(msg="更新失败，编码已存在")
 
-        await DeptCRUD(self.auth, self.db).update(id=id, data=data)
+        await DeptCRUD(self.auth, self.db).update(id=id, data=data, load_audit=False)
         return await self.detail(id=id)
 
     async def delete(self, ids: list[int]) -> None:
         if not ids:
             raise CustomException(msg="删除失败，删除对象不能为空")
 
-        # 获取所有部门列表，用于构建树形关系
-        all_depts = await DeptCRUD(self.auth, self.db).get_list()
-
-        # 构建子部门ID映射
-        child_id_map = get_child_id_map(model_list=all_depts)
-
-        for pid in ids:
-            if child_id_map.get(pid):
-                raise CustomException(msg="存在子部门，不允许删除父部门")
+        if await DeptCRUD(self.auth, self.db).get(parent_id=("in", ids)):
+            raise CustomException(msg="存在子部门，不允许删除父部门")
 
         await DeptCRUD(self.auth, self.db).delete(ids=ids)
 
     async def batch_set_available(self, data: BatchSetAvailable) -> None:
-        dept_list = await DeptCRUD(self.auth, self.db).get_list()
-        total_ids = []
-
+        crud = DeptCRUD(self.auth, self.db)
         if data.status == 0:
-            id_map = get_parent_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                enable_ids = get_parent_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(enable_ids)
+            # 启用时连带启用全部上级，停用时连带停用全部下级
+            total_ids = await crud.get_ancestor_ids(data.ids)
         else:
-            id_map = get_child_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                disable_ids = get_child_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(disable_ids)
+            total_ids = await crud.get_descendant_ids(data.ids)
 
-        await DeptCRUD(self.auth, self.db).set(ids=total_ids, status=data.status)
+        await crud.set(ids=total_ids, status=data.status)
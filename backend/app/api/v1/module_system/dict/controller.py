@@ -47,6 +47,7 @@ async def get_type_list_controller(
         page_size=page.page_size,
         search=search,
         order_by=page.order_by,
+        cursor=page.cursor,
     )
     return SuccessResponse(data=result_dict, msg="查询字典类型列表成功")
 
@@ -129,6 +130,7 @@ async def get_data_list_controller(
         page_size=page.page_size,
         search=search,
         order_by=order_by,
+        cursor=page.cursor,
     )
     return SuccessResponse(data=result_dict, msg="查询字典数据列表成功")
 
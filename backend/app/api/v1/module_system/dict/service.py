@@ -74,6 +74,7 @@ class DictTypeService:
         page_size: int,
         search: DictTypeQueryParam | None = None,
         order_by: list[dict] | None = None,
+        cursor: str | None = None,
     ) -> PageResultSchema[DictTypeOutSchema]:
         """分页查询字典类型（数据库 OFFSET/LIMIT）。
 
@@ -82,6 +83,7 @@ class DictTypeService:
         - page_size (int): 每页条数
         - search (DictTypeQueryParam | None): 查询条件
         - order_by (list[dict] | None): 排序字段列表
+        - cursor (str | None): 游标分页游标，None 时走 OFFSET/LIMIT
 
         返回:
         - PageResultSchema[DictTypeOutSchema]: 分页结果
@@ -93,6 +95,7 @@ class DictTypeService:
             order_by=order_by or [{"id": "asc"}],
             search=search_to_dict(search),
             out_schema=DictTypeOutSchema,
+            cursor=cursor,
         )
 
     async def create(self, redis: Redis, data: DictTypeCreateSchema) -> DictTypeOutSchema:
@@ -278,6 +281,7 @@ class DictDataService:
         page_size: int,
         search: DictDataQueryParam | None = None,
         order_by: list[dict] | None = None,
+        cursor: str | None = None,
     ) -> PageResultSchema[DictDataOutSchema]:
         """分页查询字典数据（数据库 OFFSET/LIMIT）。
 
@@ -286,6 +290,7 @@ class DictDataService:
         - page_size (int): 每页条数
         - search (DictDataQueryParam | None): 查询条件
         - order_by (list[dict] | None): 排序字段列表
+        - cursor (str | None): 游标分页游标，None 时走 OFFSET/LIMIT
 
         返回:
         - PageResultSchema[DictDataOutSchema]: 分页结果
@@ -297,6 +302,7 @@ class DictDataService:
             order_by=order_by or [{"id": "asc"}],
             search=search_to_dict(search),
             out_schema=DictDataOutSchema,
+            cursor=cursor,
         )
 
     @staticmethod
@@ -45,6 +45,7 @@ async def get_log_list_controller(
         page_size=page.page_size,
         search=search,
         order_by=page.order_by,
+        cursor=page.cursor,
     )
     return SuccessResponse(data=result_dict, msg="查询登录日志列表成功")
 
@@ -83,6 +84,7 @@ async def get_operation_log_list_controller(
         page_size=page.page_size,
         search=search,
         order_by=page.order_by,
+        cursor=page.cursor,
     )
     return SuccessResponse(data=result_dict, msg="查询操作日志列表成功")
 
@@ -103,8 +105,7 @@ async def export_operation_log_list_controller(
     db: Annotated[AsyncSession, Depends(db_getter)],
     search: Annotated[OperationLogQueryParam, Body()],
 ) -> StreamingResponse:
-    operation_log_query_result = await OperationLogService(auth, db).get_list(search=search)
-    operation_log_export_result = OperationLogService.export_list(operation_log_list=[item.model_dump() for item in operation_log_query_result])
+    operation_log_export_result = await OperationLogService(auth, db).export_list(search=search)
 
     return StreamResponse(
         data=bytes2file_response(operation_log_export_result),
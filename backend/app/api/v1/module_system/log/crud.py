@@ -1,7 +1,12 @@
+from collections.abc import Sequence
+from functools import partial
+from typing import Any
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.base_crud import CRUDBase
 from app.core.base_schema import AuthSchema
+from app.core.login_stats import record_logins
 
 from .model import LoginLogModel, OperationLogModel
 from .schema import LoginLogCreateSchema, OperationLogCreateSchema
@@ -10,12 +15,30 @@ from .schema import LoginLogCreateSchema, OperationLogCreateSchema
 class LoginLogCRUD(CRUDBase[LoginLogModel, LoginLogCreateSchema, None]):
     """登录日志数据层"""
 
+    # 日志表持续写入、行数大，COUNT 缓存会被频繁写入冲掉；无筛选时直接用统计信息估算
+    count_mode = "estimated"
+
     def __init__(self, auth: AuthSchema, db: AsyncSession) -> None:
         super().__init__(model=LoginLogModel, auth=auth, db=db)
 
+    # 仪表盘当日数据读 Redis 计数：日志提交后才累加，回滚或未落库的日志不计入
+
+    async def create(self, data: LoginLogCreateSchema | dict[str, Any], load_audit: bool = True) -> LoginLogModel:
+        obj = await super().create(data=data, load_audit=load_audit)
+        self._after_commit(partial(record_logins, [(obj.username, obj.status == 1)]))
+        return obj
+
+    async def create_many(self, rows: Sequence[LoginLogCreateSchema | dict[str, Any]], *args: Any, **kwargs: Any) -> list[int]:
+        ids = await super().create_many(rows, *args, **kwargs)
+        logins = [(row["username"], row.get("status") == 1) for row in (r if isinstance(r, dict) else r.model_dump() for r in rows)]
+        self._after_commit(partial(record_logins, logins))
+        return ids
+
 
 class OperationLogCRUD(CRUDBase[OperationLogModel, OperationLogCreateSchema, None]):
     """操作日志 CRUD"""
 
+    count_mode = "estimated"
+
     def __init__(self, auth: AuthSchema, db: AsyncSession) -> None:
         super().__init__(model=OperationLogModel, auth=auth, db=db)
@@ -1,8 +1,10 @@
-from sqlalchemy import Integer, String, Text
+from datetime import UTC, date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.setting import settings
-from app.core.base_model import ModelMixin
+from app.core.base_model import MappedBase, ModelMixin
 
 
 def get_log_text_column_type():
@@ -53,3 +55,29 @@ class OperationLogModel(ModelMixin):
     response_json: Mapped[str | None] = mapped_column(get_log_text_column_type(), nullable=True, comment="响应体")
     process_time: Mapped[str | None] = mapped_column(String(20), nullable=True, comment="处理时间")
     request_ip: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True, comment="请求IP")
+
+
+class LoginDailyStatModel(MappedBase):
+    """登录日汇总表
+
+    由调度任务按登录日志与用户表增量汇总，仪表盘趋势只读此表，不再对日志表做 GROUP BY。
+    统计日期取 created_time（UTC 存储）的日期部分
+    """
+
+    __tablename__: str = "sys_login_daily_stat"
+    __table_args__: dict[str, str] = {"comment": "登录日汇总表"}
+
+    stat_date: Mapped[date] = mapped_column(Date, primary_key=True, comment="统计日期")
+    login_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="登录次数")
+    success_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="成功次数")
+    fail_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="失败次数")
+    unique_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="成功登录的独立用户数")
+    login_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="登录（含失败）的独立用户数")
+    new_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="新增用户数")
+    updated_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+        comment="汇总时间",
+    )
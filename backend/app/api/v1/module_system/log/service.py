@@ -41,6 +41,7 @@ class LoginLogService:
         page_size: int,
         search: LoginLogQueryParam | None = None,
         order_by: list[dict[str, str]] | None = None,
+        cursor: str | None = None,
     ) -> PageResultSchema[LoginLogOutSchema]:
         return await LoginLogCRUD(self.auth, self.db).page(
             offset=(page_no - 1) * page_size,
@@ -48,20 +49,20 @@ class LoginLogService:
             order_by=order_by or [{"updated_time": "desc"}],
             search=search_to_dict(search),
             out_schema=LoginLogOutSchema,
+            cursor=cursor,
+            projection="schema",
         )
 
     async def delete(self, ids: list[int]) -> None:
         if not ids:
             raise CustomException(msg="删除失败，删除对象不能为空")
 
-        existing = await LoginLogCRUD(self.auth, self.db).get_list(search={"id": ("in", ids)})
-        existing_map = {obj.id for obj in existing}
+        # 按数据权限删除并返回实际删除的主键，缺失（不存在或无权限）的 id 直接报错回滚，不再预查一遍
+        deleted = set(await LoginLogCRUD(self.auth, self.db).delete(ids=ids, scoped=True))
         for nid in ids:
-            if nid not in existing_map:
+            if nid not in deleted:
                 raise CustomException(msg=f"删除失败，ID为{nid}的数据不存在")
 
-        await LoginLogCRUD(self.auth, self.db).delete(ids=ids)
-
 
 class OperationLogService:
     """操作日志管理服务"""
@@ -94,6 +95,7 @@ class OperationLogService:
         page_size: int,
         search: OperationLogQueryParam | None = None,
         order_by: list[dict[str, str]] | None = None,
+        cursor: str | None = None,
     ) -> PageResultSchema[OperationLogOutSchema]:
         crud = OperationLogCRUD(self.auth, self.db)
         return await crud.page(
@@ -102,6 +104,8 @@ class OperationLogService:
             order_by=order_by or [{"id": "desc"}],
             search=search_to_dict(search),
             out_schema=OperationLogOutSchema,
+            cursor=cursor,
+            projection="schema",
         )
 
     async def detail(self, id: int) -> OperationLogDetailOutSchema:
@@ -112,13 +116,9 @@ class OperationLogService:
     async def delete(self, ids: list[int]) -> None:
         if not ids:
             raise CustomException(msg="删除失败，删除对象不能为空")
-        existing = await OperationLogCRUD(self.auth, self.db).get_list(search={"id": ("in", ids)})
-        existing_map = {obj.id for obj in existing}
-        for nid in ids:
-            if nid not in existing_map:
-                raise CustomException(msg="删除失败，该数据不存在")
-        crud = OperationLogCRUD(self.auth, self.db)
-        await crud.delete(ids=ids)
+        deleted = set(await OperationLogCRUD(self.auth, self.db).delete(ids=ids, scoped=True))
+        if any(nid not in deleted for nid in ids):
+            raise CustomException(msg="删除失败，该数据不存在")
 
     async def get_list(
         self,
@@ -132,9 +132,12 @@ class OperationLogService:
         )
         return [OperationLogOutSchema.model_validate(obj) for obj in obj_list]
 
-    @staticmethod
-    def export_list(operation_log_list: list[dict[str, Any]]) -> bytes:
-        """导出操作日志列表"""
+    async def export_list(
+        self,
+        search: OperationLogQueryParam | None = None,
+        order_by: list[dict[str, str]] | None = None,
+    ) -> bytes:
+        """导出操作日志列表：只投影导出列并流式写入，日志表再大内存也不随之增长"""
         mapping_dict = {
             "id": "日志编号",
             "request_path": "请求路径",
@@ -146,4 +149,11 @@ class OperationLogService:
             "created_time": "操作时间",
             "created_id": "操作用户ID",
         }
-        return ExcelUtil.export_list2excel(list_data=operation_log_list, mapping_dict=mapping_dict)
+        rows = OperationLogCRUD(self.auth, self.db).stream(
+            search=search_to_dict(search),
+            order_by=order_by or [{"id": "desc"}],
+            # 与原先按 OperationLogOutSchema 导出的列一致：表头保留全部列，出参模型之外的列（请求参数、created_id）导出为空
+            columns=[key for key in mapping_dict if key in OperationLogOutSchema.model_fields],
+        )
+        content, _ = await ExcelUtil.export_stream2excel(rows, mapping_dict=mapping_dict)
+        return content
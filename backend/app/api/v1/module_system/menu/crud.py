@@ -1,7 +1,11 @@
+from functools import partial
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth_cache import invalidate_auth_cache
 from app.core.base_crud import CRUDBase
 from app.core.base_schema import AuthSchema
+from app.core.permission_set import bump_permission_version
 
 from .model import MenuModel
 from .schema import MenuCreateSchema, MenuUpdateSchema
@@ -12,3 +16,9 @@ class MenuCRUD(CRUDBase[MenuModel, MenuCreateSchema, MenuUpdateSchema]):
 
     def __init__(self, auth: AuthSchema, db: AsyncSession) -> None:
         super().__init__(model=MenuModel, auth=auth, db=db)
+
+    async def _after_write(self) -> None:
+        """菜单（权限标识）变更在事务提交后递增权限版本号并失效全部认证会话缓存。"""
+        await super()._after_write()
+        self._after_commit(bump_permission_version, key="permission_set_version")
+        self._after_commit(partial(invalidate_auth_cache, clear_all=True), key=("auth_cache", "all"))
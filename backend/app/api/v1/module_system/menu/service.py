@@ -4,14 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.base_schema import AuthSchema, BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_child_id_map,
-    get_child_recursion,
-    get_parent_id_map,
-    get_parent_recursion,
-    search_to_dict,
-    traversal_to_tree,
-)
+from app.utils.common_util import search_to_dict, traversal_to_tree
 
 from .crud import MenuCRUD
 from .schema import (
@@ -128,30 +121,14 @@ class MenuService:
         if not ids:
             raise CustomException(msg="删除失败，删除对象不能为空")
 
-        all_menus = await MenuCRUD(self.auth, self.db).get_list()
-        child_id_map = get_child_id_map(model_list=all_menus)
-
-        delete_ids_set = set()
-        for mid in ids:
-            all_descendants = get_child_recursion(id=mid, id_map=child_id_map)
-            delete_ids_set.update(all_descendants)
-
-        delete_ids = list(delete_ids_set)
+        delete_ids = await MenuCRUD(self.auth, self.db).get_descendant_ids(ids)
         await MenuCRUD(self.auth, self.db).delete(ids=delete_ids)
 
     async def set_available(self, data: BatchSetAvailable) -> None:
-        menu_list = await MenuCRUD(self.auth, self.db).get_list()
-        total_ids = []
-
+        crud = MenuCRUD(self.auth, self.db)
         if data.status == 0:
-            id_map = get_parent_id_map(model_list=menu_list)
-            for menu_id in data.ids:
-                enable_ids = get_parent_recursion(id=menu_id, id_map=id_map)
-                total_ids.extend(enable_ids)
+            total_ids = await crud.get_ancestor_ids(data.ids)
         else:
-            id_map = get_child_id_map(model_list=menu_list)
-            for menu_id in data.ids:
-                disable_ids = get_child_recursion(id=menu_id, id_map=id_map)
-                total_ids.extend(disable_ids)
+            total_ids = await crud.get_descendant_ids(data.ids)
 
-        await MenuCRUD(self.auth, self.db).set(ids=total_ids, status=data.status)
+        await crud.set(ids=total_ids, status=data.status)
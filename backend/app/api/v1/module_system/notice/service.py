@@ -114,7 +114,7 @@ class NoticeService:
         exist_notice = await NoticeCRUD(self.auth, self.db).get(notice_title=data.notice_title)
         if exist_notice and exist_notice.id != id:
             raise CustomException(msg="更新失败，标题已存在")
-        await NoticeCRUD(self.auth, self.db).update(id=id, data=data)
+        await NoticeCRUD(self.auth, self.db).update(id=id, data=data, load_audit=False)
         return await self.detail(id=id)
 
     async def delete(self, ids: list[int]) -> None:
@@ -10,6 +10,7 @@ from app.core.database import async_db_session
 from app.core.exceptions import CustomException
 from app.core.logger import logger
 from app.core.redis_crud import RedisCURD
+from app.core.request_guard import publish_config_change
 
 from .crud import ParamsCRUD
 from .schema import ParamsOutSchema, ParamsUpdateSchema
@@ -61,6 +62,8 @@ class ParamsService:
         except Exception as e:
             logger.error(f"更新系统配置失败: {e}")
             raise CustomException(msg="同步配置到缓存失败") from e
+        # 通知各进程刷新请求拦截配置快照
+        await publish_config_change(redis)
 
         return out
 
@@ -93,6 +96,8 @@ class ParamsService:
             if not config_obj:
                 raise CustomException(msg="该数据不存在")
             await ParamsService._sync_configs_to_redis(redis, config_obj)
+            # 重新灌入的配置可能与其他进程已加载的快照不同（如多实例滚动重启），同样递增版本号并广播
+            await publish_config_change(redis)
         except Exception as e:
             logger.error(f"❌️ 初始化系统参数到 Redis 失败: {e}")
             raise CustomException(msg="初始化系统参数到 Redis 失败") from e
@@ -70,7 +70,7 @@ class PositionService:
         exist_position = await PositionCRUD(self.auth, self.db).get(name=data.name)
         if exist_position and exist_position.id != id:
             raise CustomException(msg="更新失败，名称已存在")
-        await PositionCRUD(self.auth, self.db).update(id=id, data=data)
+        await PositionCRUD(self.auth, self.db).update(id=id, data=data, load_audit=False)
         return await self.detail(id=id)
 
     async def delete(self, ids: list[int]) -> None:
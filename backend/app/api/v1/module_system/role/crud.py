@@ -1,12 +1,16 @@
+from functools import partial
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.module_system.dept.crud import DeptCRUD
 from app.api.v1.module_system.menu.crud import MenuCRUD
+from app.core.auth_cache import invalidate_auth_cache
 from app.core.base_crud import CRUDBase
 from app.core.base_schema import AuthSchema
 from app.core.exceptions import CustomException
+from app.core.permission import bump_data_scope_version
+from app.core.permission_set import bump_permission_version
 
 from .model import RoleModel
 from .schema import RoleCreateSchema, RoleUpdateSchema
@@ -18,6 +22,13 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
     def __init__(self, auth: AuthSchema, db: AsyncSession) -> None:
         super().__init__(model=RoleModel, auth=auth, db=db)
 
+    async def _after_write(self) -> None:
+        """角色变更影响数据权限解析结果与已登录用户的权限，事务提交后递增数据权限/权限版本号并失效认证会话缓存。"""
+        await super()._after_write()
+        self._after_commit(bump_data_scope_version, key="data_scope_version")
+        self._after_commit(bump_permission_version, key="permission_set_version")
+        self._after_commit(partial(invalidate_auth_cache, clear_all=True), key=("auth_cache", "all"))
+
     async def set_role_menus_crud(self, role_ids: list[int], menu_ids: list[int]) -> None:
         """设置角色的菜单权限
 
@@ -46,6 +57,7 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
             obj.menus.clear()
             obj.menus.extend(menus)
         await self.db.flush()
+        await self._after_write()
 
     async def set_role_depts_crud(self, role_ids: list[int], dept_ids: list[int]) -> None:
         """设置角色的部门权限（含存在性校验）"""
@@ -127,7 +127,7 @@ class RoleService:
         exist_code = await RoleCRUD(self.auth, self.db).get(code=data.code)
         if exist_code and exist_code.id != id:
             raise CustomException(msg="更新失败，角色编码已存在")
-        await RoleCRUD(self.auth, self.db).update(id=id, data=data)
+        await RoleCRUD(self.auth, self.db).update(id=id, data=data, load_audit=False)
         return await self.detail(id=id)
 
     async def delete(self, ids: list[int]) -> None:
@@ -1,11 +1,19 @@
+from collections.abc import Sequence
 from datetime import datetime
+from functools import partial
+from typing import Any
 
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.module_system.position.crud import PositionCRUD
 from app.api.v1.module_system.role.crud import RoleCRUD
+from app.core.auth_cache import invalidate_auth_cache
 from app.core.base_crud import CRUDBase
 from app.core.base_schema import AuthSchema
+from app.core.login_stats import record_new_users
+from app.core.permission import bump_data_scope_version
+from app.core.permission_set import repoint_user_sessions, role_set_hash
 
 from .model import UserModel
 from .schema import UserCreateSchema, UserUpdateSchema
@@ -14,9 +22,54 @@ from .schema import UserCreateSchema, UserUpdateSchema
 class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
     """用户模块数据层"""
 
+    # 仪表盘读用户总数
+    track_total = True
+
     def __init__(self, auth: AuthSchema, db: AsyncSession) -> None:
         super().__init__(model=UserModel, auth=auth, db=db)
 
+    # 新增用户提交后累加当日新增数（仪表盘当日数据读 Redis 计数）
+
+    async def create(self, data: UserCreateSchema | dict[str, Any], load_audit: bool = True) -> UserModel:
+        obj = await super().create(data=data, load_audit=load_audit)
+        self._after_commit(partial(record_new_users, 1))
+        return obj
+
+    async def create_many(self, rows: Sequence[UserCreateSchema | dict[str, Any]], *args: Any, **kwargs: Any) -> list[int]:
+        ids = await super().create_many(rows, *args, **kwargs)
+        self._after_commit(partial(record_new_users, len(rows)))
+        return ids
+
+    # 用户信息（状态、部门、超管标记、密码等）变更后失效这些用户的认证会话缓存。
+    # 失效在事务提交后执行：提交前失效，并发请求会按未提交前的用户数据重新填充缓存
+
+    def _invalidate_auth_after_commit(self, user_ids: list[int] | None = None) -> None:
+        if user_ids is None:
+            self._after_commit(partial(invalidate_auth_cache, clear_all=True), key=("auth_cache", "all"))
+        elif user_ids:
+            self._after_commit(partial(invalidate_auth_cache, user_ids=list(user_ids)), key=("auth_cache", *sorted(user_ids)))
+
+    async def update(self, id: int, data: UserUpdateSchema | dict[str, Any], load_audit: bool = True) -> UserModel:
+        obj = await super().update(id=id, data=data, load_audit=load_audit)
+        self._invalidate_auth_after_commit([id])
+        return obj
+
+    async def set(self, ids: list[int], include_deleted: bool = False, scoped: bool = False, **kwargs) -> list[int]:
+        affected = await super().set(ids, include_deleted=include_deleted, scoped=scoped, **kwargs)
+        self._invalidate_auth_after_commit(affected)
+        return affected
+
+    async def delete(self, ids: list[int], scoped: bool = False) -> list[int]:
+        affected = await super().delete(ids, scoped=scoped)
+        self._invalidate_auth_after_commit(affected)
+        return affected
+
+    async def upsert_many(self, *args: Any, **kwargs: Any) -> list[int]:
+        ids = await super().upsert_many(*args, **kwargs)
+        # 冲突更新到的已有用户无法区分，整体失效
+        self._invalidate_auth_after_commit()
+        return ids
+
     async def create_obj_crud(self, data: UserCreateSchema) -> UserModel | None:
         """创建用户
 
@@ -28,13 +81,19 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
         """
         return await self.create(data=data)
 
-    async def update_last_login(self, id: int) -> None:
+    async def update_last_login(self, id: int, password_hash: str | None = None) -> None:
         """更新用户最后登录时间
 
         参数:
         - id (int): 用户ID
+        - password_hash (str | None): 需要重算的密码哈希，随登录时间同一条 UPDATE 写回
+
+        不经 set()：登录时间与哈希重算不影响认证缓存和计数，每次登录不必广播失效
         """
-        await self.set([id], last_login=datetime.now())
+        values: dict[str, Any] = {"last_login": datetime.now()}
+        if password_hash:
+            values["password"] = password_hash
+        await self.db.execute(update(UserModel).where(UserModel.id == id).values(**values))
 
     async def set_user_roles(self, user_ids: list[int], role_ids: list[int]) -> None:
         """批量设置用户角色"""
@@ -45,6 +104,11 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
             obj.roles.clear()
             obj.roles.extend(role_objs)
         await self.db.flush()
+        self._after_commit(bump_data_scope_version, key="data_scope_version")
+        # 在线会话改为引用新的角色组合，无需强制下线；与缓存失效一样等事务提交后执行
+        role_sets = {obj.id: role_set_hash(role.id for role in obj.roles) for obj in user_objs}
+        self._after_commit(partial(repoint_user_sessions, role_sets))
+        self._invalidate_auth_after_commit(user_ids)
 
     async def set_user_positions(self, user_ids: list[int], position_ids: list[int]) -> None:
         """批量设置用户岗位"""
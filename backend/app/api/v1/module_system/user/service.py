@@ -1,3 +1,5 @@
+import asyncio
+from collections.abc import AsyncIterator
 from typing import Any
 
 from fastapi import UploadFile
@@ -13,7 +15,7 @@ from app.core.exceptions import CustomException
 from app.core.logger import logger
 from app.utils.common_util import search_to_dict, traversal_to_tree
 from app.utils.excel_util import ExcelUtil
-from app.utils.password_util import PwdUtil
+from app.utils.password_util import PwdUtil, pwd_hash_pool
 
 from .crud import UserCRUD
 from .schema import (
@@ -102,7 +104,7 @@ class UserService:
             raise CustomException(msg="该数据不存在")
 
         if data.password:
-            data.password = PwdUtil.hash_password(password=data.password)
+            data.password = await PwdUtil.hash_password_async(password=data.password)
 
         create_data = data.model_dump(exclude_none=True, exclude={"role_ids", "position_ids"})
         new_user = await UserCRUD(self.auth, self.db).create(data=create_data)
@@ -135,7 +137,7 @@ class UserService:
                 raise CustomException(msg="部门已被禁用")
 
         update_data = data.model_dump(exclude_unset=True, exclude_none=True, exclude={"role_ids", "position_ids"})
-        await UserCRUD(self.auth, self.db).update(id=id, data=update_data)
+        await UserCRUD(self.auth, self.db).update(id=id, data=update_data, load_audit=False)
 
         if data.role_ids:
             roles = await RoleCRUD(self.auth, self.db).get_list(search={"id": ("in", data.role_ids)})
@@ -238,7 +240,7 @@ class UserService:
                     raise CustomException(msg="该数据已存在")
 
         user_update_data = UserUpdateSchema(**data.model_dump())
-        await UserCRUD(self.auth, self.db).update(id=user_id, data=user_update_data)
+        await UserCRUD(self.auth, self.db).update(id=user_id, data=user_update_data, load_audit=False)
         return await self.detail(id=user_id)
 
     async def set_available(self, data: BatchSetAvailable) -> None:
@@ -254,10 +256,10 @@ class UserService:
             raise CustomException(msg="该数据不存在")
 
         user = await UserCRUD(self.auth, self.db).get_or_404(id=user_id)
-        if not PwdUtil.verify_password(plain_password=data.old_password, password_hash=user.password):
+        if not await PwdUtil.verify_password_async(plain_password=data.old_password, password_hash=user.password):
             raise CustomException(msg="原密码输入错误")
 
-        new_password_hash = PwdUtil.hash_password(password=data.new_password)
+        new_password_hash = await PwdUtil.hash_password_async(password=data.new_password)
         await UserCRUD(self.auth, self.db).change_password(id=user_id, password_hash=new_password_hash)
         return await self.detail(id=user_id)
 
@@ -266,7 +268,7 @@ class UserService:
         if user.is_superuser:
             raise CustomException(msg="超级管理员密码不能重置")
 
-        new_password_hash = PwdUtil.hash_password(password=data.password)
+        new_password_hash = await PwdUtil.hash_password_async(password=data.password)
         await UserCRUD(self.auth, self.db).change_password(id=data.id, password_hash=new_password_hash)
         return await self.detail(id=data.id)
 
@@ -277,7 +279,7 @@ class UserService:
         if user.is_superuser:
             raise CustomException(msg="超级管理员密码不能重置")
 
-        new_password_hash = PwdUtil.hash_password(password=data.new_password)
+        new_password_hash = await PwdUtil.hash_password_async(password=data.new_password)
         await UserCRUD(self.auth, self.db).change_password(id=user.id, password_hash=new_password_hash)
         return await self.detail(id=user.id)
 
@@ -289,7 +291,7 @@ class UserService:
 
         create_data = UserCreateSchema(
             username=data.username,
-            password=PwdUtil.hash_password(password=data.password),
+            password=await PwdUtil.hash_password_async(password=data.password),
             name=data.name or data.username,
             status=0,
         )
@@ -340,15 +342,17 @@ class UserService:
             if errors:
                 raise CustomException(msg="\n".join(errors))
 
-            success_count = 0
-            error_msgs = []
-
+            error_msgs: list[str] = []
+            valid_rows: list[tuple[int, dict]] = []
             for i, row in enumerate(mapped_rows, start=2):
-                count_delta, err = await self._process_import_row(i, row, update_support)
+                user_data, err = self._validate_import_row(i, row)
                 if err:
                     error_msgs.append(err)
                 else:
-                    success_count += count_delta
+                    valid_rows.append((i, user_data))  # type: ignore[arg-type]
+
+            success_count, write_errors = await self._write_import_rows(valid_rows, update_support)
+            error_msgs.extend(write_errors)
 
             result = f"成功导入 {success_count} 条数据"
             if error_msgs:
@@ -359,36 +363,23 @@ class UserService:
             logger.error(f"批量导入用户失败: {e!s}")
             raise CustomException(msg=f"导入失败: {e!s}") from e
 
-    async def _process_import_row(
-        self,
-        row_num: int,
-        row: dict,
-        update_support: bool,
-    ) -> tuple[int, str | None]:
-        """处理单行导入数据
-
-        验证字段合法性，执行创建或更新操作。
+    def _validate_import_row(self, row_num: int, row: dict) -> tuple[dict | None, str | None]:
+        """校验单行导入数据（初始密码在写入前按用户逐个哈希）
 
         参数:
         - row_num (int): Excel 行号（用于错误提示）
         - row (dict): 经过字段映射后的用户数据行
-        - update_support (bool): 是否支持更新已存在用户
 
         返回:
-        - tuple[int, str | None]: (成功计数增量, 错误信息或 None)
+        - tuple[dict | None, str | None]: (可直接入库的用户数据, 错误信息或 None)
         """
         try:
             username = (str(row["username"]) if row["username"] is not None else "").strip()
             name = (str(row["name"]) if row["name"] is not None else "").strip()
             if not username:
-                return 0, f"第{row_num}行: 账号不能为空"
+                return None, f"第{row_num}行: 账号不能为空"
             if not name:
-                return 0, f"第{row_num}行: 昵称不能为空"
-
-            dept_id = int(row["dept_id"])
-            dept = await DeptCRUD(self.auth, self.db).get(id=dept_id)
-            if not dept:
-                return 0, f"第{row_num}行: 部门ID {dept_id} 不存在"
+                return None, f"第{row_num}行: 昵称不能为空"
 
             user_data = {
                 "username": username,
@@ -397,37 +388,90 @@ class UserService:
                 "mobile": str(row["mobile"]).strip() if row.get("mobile") is not None else None,
                 "gender": str(row["gender"]).strip() if row.get("gender") is not None else "1",
                 "status": 0 if str(row["status"]).strip() == "正常" else 1,
-                "dept_id": dept_id,
-                "password": PwdUtil.hash_password(password="123456"),
+                "dept_id": int(row["dept_id"]),
             }
+            user_create_schema = UserCreateSchema(**user_data)
+            return user_create_schema.model_dump(exclude_none=True, exclude={"role_ids", "position_ids"}), None
 
-            exists_user = await UserCRUD(self.auth, self.db).get(username=user_data["username"])
-            if exists_user:
-                if exists_user.is_superuser:
-                    return 0, f"第{row_num}行: 超级管理员不允许修改"
-                if update_support:
-                    user_update_data = UserUpdateSchema(**user_data)
-                    await UserCRUD(self.auth, self.db).update(id=exists_user.id, data=user_update_data)
-                    return 1, None
-                else:
-                    return 0, f"第{row_num}行: 用户 {user_data['username']} 已存在"
-            else:
-                user_create_schema = UserCreateSchema(**user_data)
-                new_user = await UserCRUD(self.auth, self.db).create(
-                    data=user_create_schema.model_dump(exclude_none=True, exclude={"role_ids", "position_ids"})  # type: ignore[arg-type]
-                )
-                if user_create_schema.role_ids and len(user_create_schema.role_ids) > 0:
-                    await UserCRUD(self.auth, self.db).set_user_roles(
-                        user_ids=[new_user.id], role_ids=user_create_schema.role_ids
-                    )
-                if user_create_schema.position_ids and len(user_create_schema.position_ids) > 0:
-                    await UserCRUD(self.auth, self.db).set_user_positions(
-                        user_ids=[new_user.id], position_ids=user_create_schema.position_ids
-                    )
-                return 1, None
+        except Exception as e:
+            return None, f"第{row_num}行: 异常{e!s}"
 
+    async def _write_import_rows(self, rows: list[tuple[int, dict]], update_support: bool) -> tuple[int, list[str]]:
+        """批量写入已校验的导入数据
+
+        部门与已存在用户（含已软删除）各一次查询预取；新用户走 create_many，允许覆盖时已存在用户走 upsert_many（按 username 冲突更新），
+        不再逐行 get/create/update。
+
+        参数:
+        - rows (list[tuple[int, dict]]): (Excel 行号, 用户数据) 列表
+        - update_support (bool): 是否支持更新已存在用户
+
+        返回:
+        - tuple[int, list[str]]: (成功条数, 错误信息列表)
+        """
+        if not rows:
+            return 0, []
+
+        user_crud = UserCRUD(self.auth, self.db)
+        dept_ids = list({data["dept_id"] for _, data in rows})
+        usernames = list({data["username"] for _, data in rows})
+        depts = await DeptCRUD(self.auth, self.db).get_list(search={"id": ("in", dept_ids)})
+        # 已软删除的账号仍占用 username 唯一约束，一并查出，避免落入 create_many 使整批写入失败
+        exists_users = await user_crud.get_list(search={"username": ("in", usernames)}, include_deleted=True)
+        dept_id_set = {dept.id for dept in depts}
+        exists_map = {user.username: user for user in exists_users}
+
+        error_msgs: list[str] = []
+        to_create: dict[str, dict] = {}
+        to_update: dict[str, dict] = {}
+        success_count = 0
+        for row_num, data in rows:
+            username = data["username"]
+            exists_user = exists_map.get(username)
+            if data["dept_id"] not in dept_id_set:
+                error_msgs.append(f"第{row_num}行: 部门ID {data['dept_id']} 不存在")
+                continue
+            if exists_user is not None and exists_user.is_deleted:
+                error_msgs.append(f"第{row_num}行: 用户 {username} 已被删除，请先恢复该用户")
+                continue
+            if exists_user is not None and exists_user.is_superuser:
+                error_msgs.append(f"第{row_num}行: 超级管理员不允许修改")
+                continue
+            if (exists_user is not None or username in to_create) and not update_support:
+                error_msgs.append(f"第{row_num}行: 用户 {username} 已存在")
+                continue
+            # 文件内重复账号以最后一行为准，与逐行“先建后改”的结果一致
+            (to_create if exists_user is None else to_update)[username] = data
+            success_count += 1
+
+        await self._hash_import_passwords([*to_create.values(), *to_update.values()])
+        try:
+            if to_create:
+                await user_crud.create_many(list(to_create.values()))
+            if to_update:
+                await user_crud.upsert_many(
+                    list(to_update.values()),
+                    conflict_cols=["username"],
+                    update_cols=[col for col in UserUpdateSchema.model_fields if col not in ("role_ids", "position_ids", "username")],
+                )
         except Exception as e:
-            return 0, f"第{row_num}行: 异常{e!s}"
+            return 0, [*error_msgs, f"批量写入失败: {e!s}"]
+
+        return success_count, error_msgs
+
+    @staticmethod
+    async def _hash_import_passwords(rows: list[dict]) -> None:
+        """为导入用户写入初始密码哈希：每个用户单独加盐，不共用同一哈希值。
+
+        并发数不超过哈希进程数，大批量导入不会占满进程池的排队名额而让同时段的登录被拒绝。
+        """
+        semaphore = asyncio.Semaphore(pwd_hash_pool.workers)
+
+        async def _hash(data: dict) -> None:
+            async with semaphore:
+                data["password"] = await PwdUtil.hash_password_async(password="123456")
+
+        await asyncio.gather(*(_hash(data) for data in rows))
 
     @staticmethod
     def get_import_template() -> bytes:
@@ -451,11 +495,12 @@ class UserService:
             option_list=option_list,
         )
 
-    @staticmethod
-    def export_list(user_list: list[dict[str, Any]]) -> bytes:
-        if not user_list:
-            raise CustomException(msg="没有数据可导出")
-
+    async def export_list(
+        self,
+        search: UserQueryParam | None = None,
+        order_by: list[dict[str, str]] | None = None,
+    ) -> bytes:
+        """流式导出用户：按批读取、按批写入 Excel，不再先把全表加载成 ORM 对象 + Schema + dict。"""
         mapping_dict = {
             "id": "用户编号",
             "avatar": "头像",
@@ -474,12 +519,20 @@ class UserService:
             "updated_id": "更新者ID",
         }
 
-        data = user_list.copy()
-        for item in data:
-            item["status"] = "启用" if item.get("status") == 0 else "停用"
-            gender = item.get("gender")
-            item["gender"] = "男" if gender == "1" else ("女" if gender == "2" else "未知")
-            item["is_superuser"] = "是" if item.get("is_superuser") else "否"
-            item["creator"] = item.get("created_by", {}).get("name", "未知") if isinstance(item.get("created_by"), dict) else "未知"
-
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        async def _batches() -> AsyncIterator[list[dict[str, Any]]]:
+            users = UserCRUD(self.auth, self.db).stream(search=search_to_dict(search), order_by=order_by, preload=["dept"])
+            async for batch in users:
+                rows = []
+                for user in batch:
+                    item = {key: getattr(user, key, None) for key in mapping_dict}
+                    item["dept_name"] = user.dept.name if user.dept else None
+                    item["status"] = "启用" if user.status == 0 else "停用"
+                    item["gender"] = "男" if user.gender == "1" else ("女" if user.gender == "2" else "未知")
+                    item["is_superuser"] = "是" if user.is_superuser else "否"
+                    rows.append(item)
+                yield rows
+
+        content, count = await ExcelUtil.export_stream2excel(_batches(), mapping_dict=mapping_dict)
+        if not count:
+            raise CustomException(msg="没有数据可导出")
+        return content
@@ -50,6 +50,25 @@ class RedisInitKeyConfig(Enum):
     APSCHEDULER_LOCK_KEY = {"key": "scheduler_job_lock", "remark": "定时任务初始化锁"}
     AI_MODEL_CONFIG = {"key": "ai_model_config", "remark": "用户AI模型配置"}
     WX_MINI_ACCESS_TOKEN = {"key": "wx_mini_access_token", "remark": "微信小程序 access_token 缓存"}
+    COUNT_CACHE = {"key": "count_cache", "remark": "分页总数缓存"}
+    DATA_SCOPE_CACHE = {"key": "data_scope_cache", "remark": "用户数据权限范围缓存"}
+    DATA_SCOPE_VERSION = {"key": "data_scope_version", "remark": "数据权限版本号（角色/部门变更时递增）"}
+    PERMISSION_SET = {"key": "permission_set", "remark": "角色组合权限编译结果缓存"}
+    PERMISSION_SET_VERSION = {"key": "permission_set_version", "remark": "权限版本号（角色/菜单变更时递增）"}
+    ONLINE_SESSIONS = {"key": "online_sessions", "remark": "在线会话索引（有序集合，分值为过期时间）"}
+    USER_ONLINE_SESSIONS = {"key": "user_online_sessions", "remark": "用户在线会话索引"}
+    ONLINE_SESSIONS_IP = {"key": "online_sessions_ip", "remark": "IP 在线会话索引"}
+    AUTH_CACHE_CHANNEL = {"key": "auth_cache_invalidate", "remark": "认证会话缓存失效广播频道"}
+    SYSTEM_CONFIG_VERSION = {"key": "system_config_version", "remark": "系统参数版本号（参数修改时递增）"}
+    SYSTEM_CONFIG_CHANNEL = {"key": "system_config_changed", "remark": "系统参数变更广播频道"}
+    READ_PRIMARY_PIN = {"key": "read_primary_pin", "remark": "写后读主库窗口"}
+    ENTITY_TOTAL = {"key": "entity_total", "remark": "实体总数计数器（CRUD 写入时增减）"}
+    LOGIN_DAILY_COUNTER = {"key": "login_daily_counter", "remark": "当日登录计数（哈希）"}
+    LOGIN_DAILY_USERS = {"key": "login_daily_users", "remark": "当日成功登录的用户名（HyperLogLog）"}
+    LOGIN_DAILY_LOGIN_USERS = {"key": "login_daily_login_users", "remark": "当日登录（含失败）的用户名（HyperLogLog）"}
+    ACTIVE_USERS = {"key": "active_users", "remark": "每日活跃用户（HyperLogLog）"}
+    RECENT_LOGINS = {"key": "recent_logins", "remark": "最近登录记录（定长列表）"}
+    DASHBOARD_SNAPSHOT = {"key": "dashboard_snapshot", "remark": "仪表盘统计快照"}
 
     @property
     def key(self) -> str:
@@ -1,3 +1,4 @@
+import json
 from collections.abc import Mapping
 from datetime import date, datetime, time
 from typing import Any
@@ -23,6 +24,33 @@ def jsonable_response_content(content: Any) -> Any:
     return jsonable_encoder(content, custom_encoder=_JSON_DATETIME_CUSTOM_ENCODER)
 
 
+def _json_default(obj: Any) -> Any:
+    """json.dumps 遇到非基础类型时的回调：日期时间按展示格式输出，Pydantic 模型转 dict 后继续由 C 编码器遍历，
+    其余少见类型（Decimal、UUID、Enum、set 等）交给 jsonable_encoder，与原输出一致。
+    """
+    if isinstance(obj, datetime):
+        return obj.strftime(DATETIME_DISPLAY_FMT)
+    if isinstance(obj, date):
+        return obj.strftime(DATE_DISPLAY_FMT)
+    if isinstance(obj, time):
+        return obj.strftime(TIME_DISPLAY_FMT)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return jsonable_response_content(obj)
+
+
+def dumps_response_content(content: Any) -> bytes:
+    """序列化响应内容：标准库 C 编码器一次遍历，只有日期时间、模型等非基础类型回调 Python。
+
+    输出与改写前 ResponseSchema(...).model_dump() → jsonable_response_content → JSONResponse.render 相同（模型按 model_dump() 而非 JSON 模式展开）；
+    dict 键为日期等 json 不支持的类型时退回 jsonable_response_content。
+    """
+    try:
+        return json.dumps(content, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    except TypeError:
+        return json.dumps(jsonable_response_content(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
 class ResponseSchema[T](BaseModel):
     """响应模型"""
 
@@ -33,7 +61,14 @@ class ResponseSchema[T](BaseModel):
     success: bool = Field(default=True, description="操作是否成功")
 
 
-class SuccessResponse(JSONResponse):
+class FastJSONResponse(JSONResponse):
+    """JSON 响应：内容直接交给 dumps_response_content，不再先 jsonable_encoder 整体转换一遍。"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_response_content(content)
+
+
+class SuccessResponse(FastJSONResponse):
     """成功响应类"""
 
     def __init__(
@@ -56,18 +91,13 @@ class SuccessResponse(JSONResponse):
         返回:
         - None
         """
-        content = ResponseSchema(
-            code=code,
-            msg=msg,
-            data=data,
-            status_code=status_code,
-            success=success,
-        ).model_dump()
-        super().__init__(content=jsonable_response_content(content), status_code=status_code)
+        # 信封字段与 ResponseSchema 一致；data 原样交给序列化，不再经 model_dump 复制一遍
+        content = {"code": code, "msg": msg, "data": data, "status_code": status_code, "success": success}
+        super().__init__(content=content, status_code=status_code)
         self.headers["Content-Type"] = "application/json; charset=utf-8"
 
 
-class ErrorResponse(JSONResponse):
+class ErrorResponse(FastJSONResponse):
     """错误响应类"""
 
     def __init__(
@@ -90,14 +120,9 @@ class ErrorResponse(JSONResponse):
         返回:
         - None
         """
-        content = ResponseSchema(
-            code=code,
-            msg=msg,
-            data=data,
-            status_code=status_code,
-            success=success,
-        ).model_dump()
-        super().__init__(content=jsonable_response_content(content), status_code=status_code)
+        # 信封字段与 ResponseSchema 一致；data 原样交给序列化，不再经 model_dump 复制一遍
+        content = {"code": code, "msg": msg, "data": data, "status_code": status_code, "success": success}
+        super().__init__(content=content, status_code=status_code)
         self.headers["Content-Type"] = "application/json; charset=utf-8"
 
 
@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import Any, Literal
 from urllib.parse import quote_plus
 
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.common.enums import EnvironmentEnum
@@ -71,6 +72,12 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 12  # refresh_token过期时间(秒)12 小时
     TOKEN_TYPE: str = "Bearer"  # token类型（RFC 6750 标准大小写）
     TOKEN_SLIDING_EXPIRE: bool = True  # 是否启用滑动过期(用户操作时自动续期)
+    AUTH_CACHE_TTL: int = 30  # 进程内认证会话缓存秒数（变更经 Redis 频道广播失效，0 关闭缓存）
+    AUTH_CACHE_MAXSIZE: int = 10000  # 进程内认证会话缓存最大条目数（LRU 淘汰）
+    PERMISSION_SET_CACHE_TTL: int = 3600  # 角色组合权限编译结果的 Redis 缓存秒数（角色/菜单写入时按版本号失效，TTL 兜底）
+    PASSWORD_HASH_ITERATIONS: int = 600_000  # PBKDF2 迭代次数（调整后老密码在下次登录成功时自动重算）
+    PASSWORD_HASH_WORKERS: int = 2  # 每个 worker 的密码哈希进程数
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # 密码哈希最大排队数，超出直接返回 429
 
     # ================================================= #
     # ******************** 数据库配置 ******************* #
@@ -97,6 +104,11 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str = ""
     DATABASE_NAME: str = "fastapiadmin"
 
+    # 只读副本（读写分离）：异步连接 URL 列表，为空则所有请求都走主库
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_RETRY_SECONDS: int = 10  # 副本连接失败后摘除的时长(秒)，到期重新参与轮询
+    READ_YOUR_WRITES_SECONDS: int = 5  # 同一会话写请求后读请求固定走主库的时长(秒)，规避复制延迟
+
     # ================================================= #
     # ******************** Redis配置 ******************* #
     # ================================================= #
@@ -108,6 +120,26 @@ class Settings(BaseSettings):
     REDIS_HEALTH_CHECK_INTERVAL: int = 20  # Redis 健康检查间隔（秒，对应 async_pool 的 health_check_interval）
     REDIS_DEFAULT_CACHE_TTL: int = 86400  # RedisCURD.set() 默认 TTL（秒，24 小时）
 
+    # ================================================= #
+    # ******************** 分页统计配置 ****************** #
+    # ================================================= #
+    PAGE_COUNT_CACHE_TTL: int = 60  # count_mode="cached" 时 COUNT 结果缓存秒数（经 CRUD 写入的事务提交后删除该模型的缓存哈希）
+    PAGE_COUNT_ESTIMATE_MIN_ROWS: int = 100_000  # count_mode="estimated" 时估算行数低于此值改走精确 COUNT
+
+    # ================================================= #
+    # ******************* 仪表盘统计配置 ***************** #
+    # ================================================= #
+    DASHBOARD_SNAPSHOT_TTL: int = 30  # 仪表盘统计快照缓存秒数
+    DASHBOARD_ROLLUP_INTERVAL: int = 10  # 登录日汇总任务执行间隔（分钟）
+    DASHBOARD_ROLLUP_BACKFILL_DAYS: int = 30  # 汇总表为空或长时间未汇总时最多回溯的天数
+    ENTITY_TOTAL_TTL: int = 3600  # 实体总数计数器有效期（秒），到期后按库重算一次，兜底回滚等造成的偏差
+    ACTIVE_USERS_RETENTION_DAYS: int = 400  # 每日活跃用户 HyperLogLog 保留天数（每天约 12KB），决定可查询的最早日期
+
+    # ================================================= #
+    # ******************** 数据权限配置 ****************** #
+    # ================================================= #
+    DATA_SCOPE_CACHE_TTL: int = 300  # 用户数据权限范围缓存秒数（角色/部门写入时按版本号失效，TTL 兜底）
+
     # ================================================= #
     # ******************** 验证码配置 ******************* #
     # ================================================= #
@@ -160,19 +192,51 @@ class Settings(BaseSettings):
     ]  # 需要记录的请求方法
 
     # ================================================= #
-    # ******************* Gzip压缩配置 ******************* #
+    # ******************* 响应压缩配置 ******************* #
     # ================================================= #
-    GZIP_MIN_SIZE: int = 1000  # 最小压缩大小(字节)
-    GZIP_COMPRESS_LEVEL: int = 9  # 压缩级别(1-9)
+    COMPRESS_MIN_SIZE: int = Field(1000, validation_alias=AliasChoices("COMPRESS_MIN_SIZE", "GZIP_MIN_SIZE"))  # 最小压缩大小(字节)，更小的响应原样返回；兼容旧名 GZIP_MIN_SIZE
+    COMPRESS_LARGE_SIZE: int = 64 * 1024  # 大响应阈值(字节)，文本类超过后改用快速级别（各编码级别见 app.core.compression.LEVELS）
+    COMPRESS_ENCODINGS: list[str] = ["zstd", "br", "gzip"]  # 服务端优先顺序；zstd/br 需安装 zstandard/brotli，未安装自动跳过
+    GZIP_COMPRESS_LEVEL: int | None = None  # 已弃用：设置后 gzip 不分档位统一使用该级别(1-9)，与旧版一致
 
     # ================================================= #
     # ******************* 安全中间件配置 ****************** #
     # ================================================= #
     ALLOWED_HOSTS: list[str] = ["service.fastapiadmin.com", "*.fastapiadmin.com"]  # 允许访问的主机名列表
 
+    # 演示模式/IP 黑白名单配置快照的兜底刷新间隔（秒）：正常由参数变更广播即时刷新，订阅中断时按此间隔回源
+    REQUEST_GUARD_REFRESH_SECONDS: int = 60
+
     # 操作日志保留天数（调度器按此天数定期清理过期日志）
     OPERATION_LOG_RETENTION_DAYS: int = 90
 
+    # 操作日志的请求/响应采集（app.core.log_capture）
+    # raw：只截取原始请求体与响应体（含流式响应）的前 OPERATION_LOG_CAPTURE_BYTES 字节，不做反序列化；
+    # parsed：完整解析请求体再序列化（改造前的行为），超过上限记为"请求参数过长"
+    OPERATION_LOG_CAPTURE_MODE: Literal["raw", "parsed"] = "raw"
+    OPERATION_LOG_CAPTURE_BYTES: int = 2000
+    # 脱敏字段（不区分大小写），JSON 与表单中这些字段的值记为 ******
+    OPERATION_LOG_SENSITIVE_FIELDS: list[str] = [
+        "password",
+        "old_password",
+        "new_password",
+        "confirm_password",
+        "access_token",
+        "refresh_token",
+        "token",
+        "secret",
+        "api_key",
+    ]
+    # 采样率（0~1）：默认值 + 按路由覆盖，键为完整接口路径，* 结尾表示前缀匹配；状态码 >= 400 的请求始终记录
+    OPERATION_LOG_SAMPLE_RATE: float = 1.0
+    OPERATION_LOG_SAMPLE_RATES: dict[str, float] = {}
+
+    # 操作/登录日志批量写入（app.core.log_writer）：攒够行数或等满间隔后一个事务批量插入
+    LOG_WRITER_QUEUE_SIZE: int = 10000  # 队列上限（条）
+    LOG_WRITER_BATCH_SIZE: int = 200  # 每批最多行数
+    LOG_WRITER_FLUSH_INTERVAL_MS: int = 500  # 批次最长等待时间（毫秒）
+    LOG_WRITER_PUT_TIMEOUT_MS: int = 100  # 队列满时请求最多等待的时间（毫秒），超时丢弃并计数
+
     # 接口白名单（无需认证即可访问的接口路径，支持 * 开头表示前缀匹配）
     WHITE_API_LIST_PATH: list[str] = [
         "/api/v1/system/auth/login",
@@ -230,6 +294,11 @@ class Settings(BaseSettings):
     # ================================================= #
     # ******************* 动态配置 ******************* #
     # ================================================= #
+    @property
+    def GZIP_MIN_SIZE(self) -> int:
+        """已弃用，同 COMPRESS_MIN_SIZE"""
+        return self.COMPRESS_MIN_SIZE
+
     @property
     def ALLOW_ORIGINS(self) -> list[str]:
         """根据环境动态返回 CORS 允许的域名列表。"""
@@ -252,15 +321,17 @@ class Settings(BaseSettings):
     def MIDDLEWARE_LIST(self) -> list[str | None]:
         # 中间件列表（注册时逆序叠加：下列第一项在列表中最前，最终位于最外层，优先生效）
         # 中间件执行顺序（从外到内）：
-        #   HTTPSRedirect → TrustedHost → CORS → RequestLog → GZip → CorrelationId → 业务路由
+        #   HTTPSRedirect → TrustedHost → CORS → RequestLog → Compression → CorrelationId → 业务路由
+        # 均为纯 ASGI 中间件（不使用 BaseHTTPMiddleware），SSE/流式响应与后台任务语义不受影响；
+        # 新增中间件同样按纯 ASGI 编写，开销见 tests/benchmarks/bench_middleware.py。
         # 安全响应头（X-Content-Type-Options / Referrer-Policy / Permissions-Policy / HSTS）
-        # 由前置 Nginx / 反向代理通过 add_header 设置，避免应用层 BaseHTTPMiddleware 开销。
+        # 由前置 Nginx / 反向代理通过 add_header 设置，不在应用层处理。
         MIDDLEWARES: list[str | None] = [
             "app.core.middlewares.CustomHTTPSRedirectMiddleware" if self.ENVIRONMENT == EnvironmentEnum.PROD else None,
             "app.core.middlewares.CustomTrustedHostMiddleware" if self.ENVIRONMENT == EnvironmentEnum.PROD else None,
             "app.core.middlewares.CustomCORSMiddleware",
             "app.core.middlewares.RequestLogMiddleware",
-            "app.core.middlewares.CustomGZipMiddleware",
+            "app.core.middlewares.CustomCompressionMiddleware",
             "app.core.middlewares.CorrelationIdMiddleware",  # 请求上下文
         ]
         return MIDDLEWARES
@@ -143,20 +143,27 @@ class SchedulerUtil:
 
             # 注册系统级定时任务
             from app.api.v1.module_system.log.service import OperationLogService
+            from app.core.login_stats import rollup_login_stats
 
             cls.register_system_job(
                 "system_cleanup_operation_log", OperationLogService.cleanup_operation_log,
                 trigger=CronTrigger(day_of_week="sun", hour=3, minute=0), name="操作日志清理",
             )
-            logger.info("✅ 1 个系统周期任务已注册（操作日志清理）")
+            # 启动后立即汇总一次，补齐停机期间的日统计
+            cls.register_system_job(
+                "system_rollup_login_stats", rollup_login_stats,
+                trigger=IntervalTrigger(minutes=settings.DASHBOARD_ROLLUP_INTERVAL), name="登录日汇总",
+                next_run_time=datetime.now(scheduler.timezone),
+            )
+            logger.info("✅ 2 个系统周期任务已注册（操作日志清理、登录日汇总）")
         except Exception as e:
             logger.error(f"❌ 定时任务调度器初始化失败: {e}")
             raise
 
     @classmethod
-    def register_system_job(cls, job_id: str, func: Callable, trigger: Any, name: str) -> None:
-        """外部注册系统级定时任务。"""
-        scheduler.add_job(func, trigger=trigger, id=job_id, name=name, replace_existing=True)
+    def register_system_job(cls, job_id: str, func: Callable, trigger: Any, name: str, **kwargs: Any) -> None:
+        """外部注册系统级定时任务，kwargs 透传给 add_job（如 next_run_time）。"""
+        scheduler.add_job(func, trigger=trigger, id=job_id, name=name, replace_existing=True, **kwargs)
 
     @classmethod
     def start(cls, paused: bool = False) -> None:
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.base_schema import AuthSchema, CoreUserSchema
+from app.core.logger import logger
+from app.core.permission_set import PermissionSet, clear_local_permission_sets
+from app.core.redis_crud import RedisCURD
+
+
+@dataclass(frozen=True, slots=True)
+class _AuthEntry:
+    expires_at: float
+    user: CoreUserSchema
+    permission_set: PermissionSet
+
+
+class AuthSessionCache:
+    """进程内认证会话缓存：session_id → 已解析的用户信息，LRU + 短 TTL。
+
+    命中时 _authenticate 只确认 Redis 会话仍在（并滑动续期），不再解析会话、不再查 sys_user 与权限；
+    用户、角色/菜单变更在事务提交后经 Redis 频道广播失效消息，各进程的订阅任务收到后清理本地条目，TTL 兜底订阅中断的情况。
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _AuthEntry] = OrderedDict()
+        self._sessions_by_user: dict[int, set[str]] = {}
+
+    def get(self, session_id: str) -> AuthSchema | None:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._pop(session_id)
+            return None
+        self._entries.move_to_end(session_id)
+        # 每次请求一个新的 AuthSchema（其上挂有请求级缓存），用户信息与权限集合只读共享
+        auth = AuthSchema.model_construct(
+            user=entry.user,
+            permissions=entry.permission_set.permissions,
+            menu_ids=entry.permission_set.menu_ids,
+        )
+        auth._permission_set = entry.permission_set
+        return auth
+
+    def put(self, session_id: str, auth: AuthSchema) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._pop(session_id)
+        permission_set = auth._permission_set or PermissionSet.build(auth.permissions, auth.menu_ids)
+        self._entries[session_id] = _AuthEntry(time.monotonic() + self.ttl, auth.user, permission_set)
+        self._sessions_by_user.setdefault(auth.user.id, set()).add(session_id)
+        while len(self._entries) > self.maxsize:
+            self._pop(next(iter(self._entries)))
+
+    def invalidate_session(self, session_id: str) -> None:
+        self._pop(session_id)
+
+    def invalidate_users(self, user_ids: list[int]) -> None:
+        for user_id in user_ids:
+            for session_id in list(self._sessions_by_user.get(user_id, ())):
+                self._pop(session_id)
+
+    def clear(self) -> None:
+        """全量失效（角色/菜单变更、订阅中断），角色组合的权限编译结果一并清空。"""
+        self._entries.clear()
+        self._sessions_by_user.clear()
+        clear_local_permission_sets()
+
+    def apply(self, message: dict) -> None:
+        """执行一条失效消息：{"session_id": ...} / {"user_ids": [...]} / {"all": true}。"""
+        if message.get("all"):
+            self.clear()
+            return
+        if message.get("session_id"):
+            self.invalidate_session(message["session_id"])
+        if message.get("user_ids"):
+            self.invalidate_users(message["user_ids"])
+
+    def _pop(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            sessions = self._sessions_by_user.get(entry.user.id)
+            if sessions is not None:
+                sessions.discard(session_id)
+                if not sessions:
+                    del self._sessions_by_user[entry.user.id]
+
+
+auth_session_cache = AuthSessionCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.AUTH_CACHE_TTL)
+
+
+async def invalidate_auth_cache(
+    session_id: str | None = None,
+    user_ids: list[int] | None = None,
+    clear_all: bool = False,
+) -> None:
+    """本进程立即失效，并广播给其他进程。Redis 未连接时只清本地。"""
+    from app.core.database import redis_client
+
+    message = {"session_id": session_id, "user_ids": user_ids or [], "all": clear_all}
+    auth_session_cache.apply(message)
+    if redis_client is not None:
+        await RedisCURD(redis_client).publish(RedisInitKeyConfig.AUTH_CACHE_CHANNEL.key, json.dumps(message))
+
+
+async def listen_auth_invalidation(redis: Redis) -> None:
+    """订阅失效频道直到任务被取消；连接中断时清空本地缓存并重连（断连期间的消息已丢失）。"""
+    channel = RedisInitKeyConfig.AUTH_CACHE_CHANNEL.key
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(channel)
+                async for item in pubsub.listen():
+                    if item.get("type") == "message":
+                        auth_session_cache.apply(json.loads(item["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ 认证缓存失效订阅中断，稍后重连: {e}")
+            auth_session_cache.clear()
+            await asyncio.sleep(1)
@@ -1,23 +1,45 @@
-from collections.abc import Sequence
-from datetime import UTC, datetime, timedelta
-from typing import Any, TypeVar, cast
+import base64
+import hashlib
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Sequence
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from functools import partial
+from typing import Any, Literal, TypeVar, cast
 
 from pydantic import BaseModel
-from sqlalchemy import asc, delete, desc, false, func, select, true, update
-from sqlalchemy import inspect as sa_inspect
-from sqlalchemy.engine import Result
+from sqlalchemy import and_, asc, bindparam, delete, desc, false, func, insert, literal, or_, select, text, true, tuple_, update
+from sqlalchemy.engine import Result, RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.elements import ColumnElement
 
-from app.core.base_model import ModelMixin
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.base_model import ModelMixin, TreeMixin
 from app.core.base_schema import AuthSchema, PageResultSchema
 from app.core.exceptions import CustomException
+from app.core.model_meta import ModelMeta, Projection, get_model_meta
+from app.utils.common_util import uuid4_str
 
 OutSchemaType = TypeVar("OutSchemaType", bound=BaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# 分页 COUNT 策略：
+# - exact     精确 COUNT（默认）
+# - cached    精确 COUNT 结果按 (模型, WHERE 哈希) 缓存到 Redis，写入提交后整表失效
+# - estimated 无筛选条件时读 PG/MySQL 的统计信息估算行数，否则退化为 exact
+# - none      不统计总数，多取一行判断 has_next
+CountMode = Literal["exact", "cached", "estimated", "none"]
+
+# 只读投影模式：按 out_schema 字段只查需要的列（含审计人 LEFT JOIN），不经过 ORM 实体和 identity map
+# - schema  行 → dict → out_schema.model_validate（dict 输入，不走 from_attributes）
+# - dict    行 → dict，直接返回
+ProjectionMode = Literal["schema", "dict"]
+
 # 操作符 → 方法名映射，留给 _resolve_condition 运行时根据具体 attr 调用
 # 因为不同列的 ColumnElement 类型不同，不能提取为类级常量
 _OPERATOR_MAP: dict[str, str] = {
@@ -30,13 +52,63 @@ _OPERATOR_MAP: dict[str, str] = {
 }
 
 
+def _encode_cursor_value(value: Any) -> Any:
+    """游标中的排序键值 → JSON 可序列化值（datetime/date/Decimal 带类型标记以便原样还原）。"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    return value
+
+
+def _decode_cursor_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        if "$dec" in value:
+            return Decimal(value["$dec"])
+    return value
+
+
+def encode_cursor(fields: list[str], values: list[Any], backward: bool = False) -> str:
+    """排序字段 + 边界行的键值 → 不透明游标（urlsafe base64 JSON）。
+
+    fields 一并写入游标，解码时与本次排序比对，防止游标跨排序方式误用。
+    """
+    payload = {"f": fields, "v": [_encode_cursor_value(v) for v in values], "b": int(backward)}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fields: list[str]) -> tuple[list[Any], bool]:
+    """不透明游标 → (边界键值列表, 是否向前翻页)。格式不合法或排序不一致时抛 CustomException。"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["f"] != fields or len(payload["v"]) != len(fields):
+            raise ValueError("cursor fields mismatch")
+        return [_decode_cursor_value(v) for v in payload["v"]], bool(payload.get("b"))
+    except Exception as e:
+        raise CustomException(msg="分页游标无效或与当前排序不一致") from e
+
+
 class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
     """事务边界在 HTTP 层（db_getter 有 session.begin()），CRUD 只 flush 不 commit。
 
     CRUD 层只自动填充 created_id/updated_id，不按这些字段过滤数据。
     数据权限由 Service 层负责 —— Service 层忘记过滤 = 越权风险。
+
+    子类可覆盖 ``count_mode`` 设置模型级分页 COUNT 策略，``page(count_mode=...)`` 可按调用覆盖；
+    ``track_total = True`` 时由写入维护 Redis 总数计数器，``total()`` 直接读计数器。
     """
 
+    count_mode: CountMode = "exact"
+    track_total: bool = False
+
     def __init__(self, model: type[ModelType], auth: AuthSchema, db: AsyncSession) -> None:
         self.model = model
         self.auth = auth
@@ -44,20 +116,19 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
 
     # ── 辅助方法 ──────────────────────────────────────────────────────
 
+    @property
+    def _meta(self) -> ModelMeta:
+        """模型元数据（主键、软删除、关系、loader options），按模型缓存，避免每次调用都 sa_inspect。"""
+        return get_model_meta(self.model)
+
     def _get_pk_col(self) -> ColumnElement:
         """获取模型的主键列。delete/set/restore/page 批量操作共用。"""
-        mapper = sa_inspect(self.model)
-        pk_cols = list(mapper.primary_key)
-        if not pk_cols:
-            raise CustomException(msg="模型缺少主键")
-        if len(pk_cols) > 1:
-            raise CustomException(msg="暂不支持复合主键操作")
-        return pk_cols[0]
+        return self._meta.get_pk()
 
     @property
     def _supports_soft_delete(self) -> bool:
         # 判断模型是否有 is_deleted / deleted_time / deleted_id 三个字段
-        return all(hasattr(self.model, attr) for attr in ("is_deleted", "deleted_time", "deleted_id"))
+        return self._meta.soft_delete
 
     def _soft_delete_values(self) -> dict[str, Any]:
         """返回 UPDATE 设置软删除字段所需的 values 字典。"""
@@ -118,21 +189,74 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
         preload: list[str | Any] | None = None,
         load_columns: list | None = None,
         include_deleted: bool = False,
-    ) -> Sequence[ModelType]:
-        """不分页的列表查询。"""
+        out_schema: type[OutSchemaType] | None = None,
+        projection: ProjectionMode | None = None,
+    ) -> Sequence[ModelType] | list[OutSchemaType] | list[dict[str, Any]]:
+        """不分页的列表查询。
+
+        projection 不为空时走只读投影（见 ProjectionMode），preload/load_columns 不生效；
+        否则返回 ORM 对象，传了 out_schema 则逐个 model_validate。
+        """
         try:
             conditions = await self._build_conditions(include_deleted=include_deleted, **(search or {}))
             order = order_by or [{"id": "asc"}]
+            if projection:
+                plan = self._meta.projection(out_schema)
+                sql = self._projection_select(plan).where(*conditions).order_by(*self._parse_order(order))
+                result: Result = await self.db.execute(sql)
+                return self._project_items(plan, result.all(), out_schema, projection)
+
             sql = select(self.model).where(*conditions).order_by(*self._parse_order(order))
             if load_columns:
                 sql = sql.options(load_only(*load_columns))
             for opt in self._loader_options(preload):
                 sql = sql.options(opt)
-            result: Result = await self.db.execute(sql)
-            return result.scalars().all()
+            result = await self.db.execute(sql)
+            objs = result.scalars().all()
+            return [out_schema.model_validate(obj) for obj in objs] if out_schema else objs
         except Exception as e:
             raise CustomException(msg=f"列表查询失败: {e!s}") from e
 
+    async def stream(
+        self,
+        search: dict[str, Any] | None = None,
+        order_by: list[dict[str, str]] | None = None,
+        batch_size: int = 1000,
+        columns: list[str | Any] | None = None,
+        preload: list[str | Any] | None = None,
+        include_deleted: bool = False,
+    ) -> AsyncIterator[Sequence[ModelType] | Sequence[RowMapping]]:
+        """流式查询：AsyncSession.stream + yield_per 走服务端游标，按批产出，内存占用与总行数无关。
+
+        - columns 为空时每批是 ORM 对象（preload 同 get_list，一对多关系每批一次 selectin 查询）；
+        - columns 给字段名或列对象时只查这些列，每批是 RowMapping，不实例化 ORM 对象，适合导出；
+        - 条件构造与 get_list 一致，同样带软删除与数据权限过滤。
+
+        用法::
+
+            async for rows in crud.stream(search=..., columns=["id", "name"]):
+                ...
+        """
+        try:
+            conditions = await self._build_conditions(include_deleted=include_deleted, **(search or {}))
+            order = self._parse_order(order_by or [{"id": "asc"}])
+            if columns:
+                cols = [getattr(self.model, col) if isinstance(col, str) else col for col in columns]
+                sql = select(*cols).where(*conditions).order_by(*order)
+            else:
+                sql = select(self.model).where(*conditions).order_by(*order).options(*self._loader_options(preload))
+
+            result = await self.db.stream(sql.execution_options(yield_per=batch_size))
+            try:
+                rows = result.mappings() if columns else result.scalars()
+                async for partition in rows.partitions():
+                    yield partition
+            finally:
+                # 调用方提前停止迭代时同样释放服务端游标
+                await result.close()
+        except Exception as e:
+            raise CustomException(msg=f"流式查询失败: {e!s}") from e
+
     async def page(
         self,
         offset: int,
@@ -143,131 +267,440 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
         preload: list[str | Any] | None = None,
         load_columns: list | None = None,
         include_deleted: bool = False,
+        cursor: str | None = None,
+        count_mode: CountMode | None = None,
+        projection: ProjectionMode | None = None,
     ) -> PageResultSchema[OutSchemaType] | PageResultSchema:
-        """分页查询。COUNT + 数据分两趟查，COUNT 复用 WHERE 但不带 loading options。"""
+        """分页查询。COUNT + 数据分两趟查，COUNT 复用 WHERE 但不带 loading options。
+
+        projection 不为空时数据查询走只读投影（见 ProjectionMode），preload/load_columns 不生效。
+
+        cursor 不为 None 时走 keyset（游标）分页，忽略 offset：
+        - 空串 "" 表示游标模式的第一页；
+        - 其他值为上一次返回的 next_cursor / prev_cursor。
+
+        count_mode 为 None 时取模型级 ``self.count_mode``，游标模式下则默认 "none"（游标分页本就是为了省掉 COUNT）；
+        为 "none" 时 total 只是已知下界（offset + 本页条数 + 是否有下一页）。
+        """
         try:
-            conditions = await self._build_conditions(include_deleted=include_deleted, **(search or {}))
+            conditions, filtered = await self._build_where(include_deleted=include_deleted, **(search or {}))
             order = order_by or [{"id": "asc"}]
 
             pk = self._get_pk_col()  # COUNT 用主键列更精确
 
-            data_sql = select(self.model).where(*conditions)
-            if load_columns:
-                data_sql = data_sql.options(load_only(*load_columns))
-            for opt in self._loader_options(preload):
-                data_sql = data_sql.options(opt)
+            plan = self._meta.projection(out_schema) if projection else None
+            if plan is not None:
+                # keyset 需要从行里取排序键生成游标，不在投影里的排序键额外追加到 select 末尾
+                extra = [] if cursor is None else [column for field, column, _, _ in self._keyset_keys(order) if field not in plan.keys]
+                data_sql = self._projection_select(plan, extra).where(*conditions)
+            else:
+                data_sql = select(self.model).where(*conditions)
+                if load_columns:
+                    data_sql = data_sql.options(load_only(*load_columns))
+                for opt in self._loader_options(preload):
+                    data_sql = data_sql.options(opt)
 
-            # 从 data_sql 提取 WHERE，构造独立的 COUNT 查询（去掉 loader option，避免 LEFT JOIN 开销）
+            # 从 data_sql 提取 WHERE，构造独立的 COUNT 查询（去掉 loader option / 投影的 LEFT JOIN）
             count_sql = select(func.count(pk)).select_from(self.model)
             where_clause = data_sql.whereclause
             if where_clause is not None:
                 count_sql = count_sql.where(where_clause)
 
-            total_result = await self.db.execute(count_sql)
-            total = total_result.scalar() or 0
-
-            result: Result = await self.db.execute(data_sql.order_by(*self._parse_order(order)).offset(offset).limit(limit))
-            objs = result.scalars().all()
+            # 除软删除条件外没有任何条件（无筛选、无数据权限）才允许用统计信息估算
+            mode = count_mode or ("none" if cursor is not None else self.count_mode)
+            total = await self._page_total(count_sql, mode, unfiltered=not filtered)
+
+            if cursor is not None:
+                return await self._keyset_page(data_sql, limit, order, cursor, total, out_schema, plan, projection)
+
+            # 不统计总数时多取一行判断是否有下一页
+            fetch = limit + 1 if total is None else limit
+            result: Result = await self.db.execute(data_sql.order_by(*self._parse_order(order)).offset(offset).limit(fetch))
+            objs = list(result.all() if plan is not None else result.scalars().all())
+            if total is None:
+                has_next = len(objs) > limit
+                objs = objs[:limit]
+                total = offset + len(objs) + int(has_next)
+            else:
+                has_next = offset + limit < total
 
-            items = [out_schema.model_validate(obj) for obj in objs] if out_schema else list(objs)
+            if plan is not None:
+                items = self._project_items(plan, objs, out_schema, projection)
+            else:
+                items = [out_schema.model_validate(obj) for obj in objs] if out_schema else objs
 
             return PageResultSchema(
                 page_no=offset // limit + 1 if limit else 1,
                 page_size=limit or 10,
                 total=total,
-                has_next=offset + limit < total,
+                has_next=has_next,
                 items=items,
             )
+        except CustomException:
+            raise
         except Exception as e:
             raise CustomException(msg=f"分页查询失败: {e!s}") from e
 
+    async def _keyset_page(
+        self,
+        data_sql: Any,
+        limit: int,
+        order: list[dict[str, str]],
+        cursor: str,
+        total: int | None,
+        out_schema: type[OutSchemaType] | None = None,
+        plan: Projection | None = None,
+        projection: ProjectionMode | None = None,
+    ) -> PageResultSchema[OutSchemaType] | PageResultSchema:
+        """keyset 分页：WHERE (k1, k2, ..., id) > (v1, v2, ..., vid) ORDER BY ... LIMIT n+1。
+
+        排序键 = order_by 字段 + 主键兜底（保证全序、翻页不重不漏），多取一行判断是否还有下一页。
+        向前翻页（prev_cursor）时比较方向和排序方向同时取反，取回后再把结果倒序。
+        """
+        keys = self._keyset_keys(order)
+        fields = [field for field, _, _, _ in keys]
+        values, backward = decode_cursor(cursor, fields) if cursor else (None, False)
+
+        if values is not None:
+            data_sql = data_sql.where(self._keyset_condition(keys, values, backward))
+        result: Result = await self.db.execute(data_sql.order_by(*self._keyset_ordering(keys, backward)).limit(limit + 1))
+        objs = list(result.all() if plan is not None else result.scalars().all())
+        has_more = len(objs) > limit
+        objs = objs[:limit]
+        if backward:
+            objs.reverse()
+
+        def _cursor_of(obj: Any, to_prev: bool) -> str:
+            return encode_cursor(fields, [getattr(obj, field) for field in fields], backward=to_prev)
+
+        # 正向翻页：多出的一行说明还有下一页；只要不是第一页就一定能往回翻
+        # 反向翻页：多出的一行说明前面还有；来源页一定存在，所以总能往后翻
+        next_cursor = prev_cursor = None
+        if objs:
+            if has_more or backward:
+                next_cursor = _cursor_of(objs[-1], to_prev=False)
+            if (has_more and backward) or (not backward and values is not None):
+                prev_cursor = _cursor_of(objs[0], to_prev=True)
+
+        if plan is not None:
+            items = self._project_items(plan, objs, out_schema, projection)
+        else:
+            items = [out_schema.model_validate(obj) for obj in objs] if out_schema else objs
+        return PageResultSchema(
+            page_no=None,
+            page_size=limit or 10,
+            total=total if total is not None else len(objs) + int(next_cursor is not None),
+            has_next=next_cursor is not None,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            items=items,
+        )
+
+    # ── 分页统计 ──────────────────────────────────────────────────────
+
+    async def _page_total(self, count_sql: Any, mode: CountMode, unfiltered: bool) -> int | None:
+        """按 count_mode 取分页总数。返回 None 表示不统计（count_mode="none"）。"""
+        if mode == "none":
+            return None
+        if mode == "estimated" and unfiltered:
+            estimated = await self._estimated_count()
+            if estimated is not None:
+                return estimated
+        if mode == "cached":
+            return await self._cached_count(count_sql)
+        result: Result = await self.db.execute(count_sql)
+        return result.scalar() or 0
+
+    async def _estimated_count(self) -> int | None:
+        """读数据库统计信息估算全表行数（PostgreSQL pg_class / MySQL information_schema）。
+
+        sqlite 无统计信息、表从未 ANALYZE、或估算值低于 PAGE_COUNT_ESTIMATE_MIN_ROWS（小表精确 COUNT 足够快）时返回 None。
+        """
+        dialect = self.db.get_bind().dialect.name
+        table_name = self.model.__table__.name
+        if dialect == "postgresql":
+            sql = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)")
+        elif dialect == "mysql":
+            sql = text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t")
+        else:
+            return None
+        result: Result = await self.db.execute(sql, {"t": table_name})
+        estimated = result.scalar()
+        if estimated is None or estimated < settings.PAGE_COUNT_ESTIMATE_MIN_ROWS:
+            return None
+        return int(estimated)
+
+    async def _cached_count(self, count_sql: Any) -> int:
+        """COUNT 结果缓存在 Redis 哈希 ``count_cache:<表名>`` 中，field 为 WHERE 哈希，value 为 "总数:写入时间戳"。
+
+        过期按写入时间戳判断（哈希整体 TTL 会被不断续期，无法约束单个 field）；
+        本模型经 CRUD 写入的事务提交后整个哈希被删除。Redis 不可用时退化为精确 COUNT。
+        """
+        from app.core.database import redis_client
+        from app.core.redis_crud import RedisCURD
+
+        if redis_client is None:
+            result: Result = await self.db.execute(count_sql)
+            return result.scalar() or 0
+
+        compiled = count_sql.compile()
+        digest = hashlib.md5(f"{compiled}|{sorted(compiled.params.items())!r}".encode()).hexdigest()
+        name = self._count_cache_name()
+        cached = (await RedisCURD(redis_client).hash_get(name, [digest]) or [None])[0]
+        if cached:
+            total, _, stored_at = str(cached).partition(":")
+            if time.time() - int(stored_at or 0) < settings.PAGE_COUNT_CACHE_TTL:
+                return int(total)
+
+        result = await self.db.execute(count_sql)
+        total = result.scalar() or 0
+        await RedisCURD(redis_client).hash_set(name, digest, f"{total}:{int(time.time())}")
+        await RedisCURD(redis_client).expire(name, settings.PAGE_COUNT_CACHE_TTL)
+        return total
+
+    def _count_cache_name(self) -> str:
+        return f"{RedisInitKeyConfig.COUNT_CACHE.key}:{self.model.__table__.name}"
+
+    async def total(self) -> int:
+        """未删除记录总数（不带数据权限过滤），供仪表盘等全局统计使用。
+
+        启用 track_total 的模型：计数器 ``entity_total:<表名>`` 缺失时 COUNT 一次并带 TTL 写入，此后经 CRUD 的新增/删除/恢复
+        按增减量原子调整，读取不再查库。调整在事务提交后执行，回滚的写入不计入；与并发的缺失重算交错时可能偏差一两条，TTL 到期重算时消除。
+        未启用或 Redis 不可用时直接 COUNT。
+        """
+        from app.core.database import redis_client
+        from app.core.redis_crud import RedisCURD
+
+        redis = RedisCURD(redis_client) if self.track_total and redis_client is not None else None
+        if redis is not None:
+            cached = await redis.get(self._total_key())
+            if cached is not None:
+                return int(cached)
+
+        count_sql = select(func.count()).select_from(self.model)
+        if self._meta.has("is_deleted"):
+            count_sql = count_sql.where(getattr(self.model, "is_deleted") == false())
+        result: Result = await self.db.execute(count_sql)
+        total = result.scalar() or 0
+        if redis is not None:
+            await redis.set(self._total_key(), total, expire=settings.ENTITY_TOTAL_TTL)
+        return total
+
+    def _total_key(self) -> str:
+        return f"{RedisInitKeyConfig.ENTITY_TOTAL.key}:{self.model.__table__.name}"
+
+    def _adjust_total(self, delta: int | None) -> None:
+        """登记事务提交后按增减量调整总数计数器；delta 为 None 表示本次写入无法确定增减（upsert、整表删除），直接丢弃计数器待下次重算。"""
+        if self.track_total and delta != 0:
+            self._after_commit(partial(self._apply_total_delta, delta))
+
+    async def _apply_total_delta(self, delta: int | None) -> None:
+        from app.core.database import redis_client
+        from app.core.redis_crud import INCR_IF_EXISTS_SCRIPT, RedisCURD
+
+        if redis_client is None:
+            return
+        if delta is None:
+            await RedisCURD(redis_client).delete(self._total_key())
+        else:
+            await RedisCURD(redis_client).run_script(INCR_IF_EXISTS_SCRIPT, [self._total_key()], [delta])
+
+    async def _after_write(self) -> None:
+        """写入成功后的缓存失效钩子，子类按需扩展（如角色/部门变更时递增数据权限版本号）。
+
+        失效动作经 _after_commit 登记到事务提交之后执行，避免并发请求在提交前把旧数据重新写回缓存。
+        """
+        self._after_commit(self._invalidate_count_cache, key=("count_cache", self.model.__table__.name))
+
+    def _after_commit(self, callback: Callable[[], Awaitable[Any]], key: Hashable | None = None) -> None:
+        """登记当前事务提交后执行的回调（见 app.core.database.after_commit），同一 key 一个事务内只执行一次。"""
+        from app.core.database import after_commit
+
+        after_commit(self.db, callback, key)
+
+    async def _invalidate_count_cache(self) -> None:
+        """丢弃本模型的 COUNT 缓存。只删一个键，对未启用缓存的模型也几乎无开销。"""
+        from app.core.database import redis_client
+        from app.core.redis_crud import RedisCURD
+
+        if redis_client is not None:
+            await RedisCURD(redis_client).delete(self._count_cache_name())
+
     # ── 写入 ──────────────────────────────────────────────────────────
 
-    async def create(self, data: CreateSchemaType | dict[str, Any]) -> ModelType:
-        """新增记录。"""
+    async def create(self, data: CreateSchemaType | dict[str, Any], load_audit: bool = True) -> ModelType:
+        """新增记录。
+
+        支持 RETURNING 的方言（PostgreSQL/sqlite）一条 INSERT ... RETURNING 带回整行，不再 flush 后 refresh；
+        load_audit=False 时不回查 created_by/updated_by，适合只关心主键或随后自行 detail 的调用方。
+        """
         try:
             obj_dict = data.model_dump(exclude_none=True) if isinstance(data, BaseModel) else cast("dict[str, Any]", data)
-            obj = self.model(**obj_dict)
+            obj_dict = {**obj_dict, **self._audit_values("created_id", "created_dept_id", "updated_id")}
 
-            user = self.auth.user
-            if user.id:
-                # 自动填充审计人，hasattr 兼容无审计字段的模型
-                if hasattr(obj, "created_id"):
-                    setattr(obj, "created_id", user.id)
-                if hasattr(obj, "updated_id"):
-                    setattr(obj, "updated_id", user.id)
-
-            self.db.add(obj)
-            await self.db.flush()
-            await self.db.refresh(obj)
-
-            preload_options = []
-            mapper = sa_inspect(self.model)
-            if hasattr(mapper, "relationships"):
-                for rel_name in ("created_by", "updated_by"):
-                    if rel_name in mapper.relationships:
-                        preload_options.append(joinedload(getattr(self.model, rel_name)))
-            if preload_options:
-                result = await self.db.execute(
-                    select(self.model).options(*preload_options).where(self._get_pk_col() == obj.id)
-                )
-                obj = result.scalar_one()
-
-            return obj
+            if self._dialect.insert_returning and self._is_column_dict(obj_dict):
+                result = await self.db.scalars(insert(self.model).returning(self.model), [obj_dict])
+                obj = result.one()
+            else:
+                # MySQL 无 RETURNING，或入参含关系属性：走 ORM，flush 后主键和 Python 端默认值已就位，无需 refresh
+                obj = self.model(**obj_dict)
+                self.db.add(obj)
+                await self.db.flush()
+            if self._meta.tree:
+                paths = await self.sync_tree_paths()
+                set_committed_value(obj, "tree_path", paths.get(getattr(obj, self._get_pk_col().key), obj.tree_path))
+            self._adjust_total(1)
+            await self._after_write()
+
+            return await self._load_audit(obj) if load_audit else obj
         except Exception as e:
             raise CustomException(msg=f"创建失败: {e!s}") from e
 
-    async def update(self, id: int, data: UpdateSchemaType | dict[str, Any]) -> ModelType:
-        """更新记录。用 exclude_unset / exclude_none 准确表达前端意图。"""
+    async def update(self, id: int, data: UpdateSchemaType | dict[str, Any], load_audit: bool = True) -> ModelType:
+        """更新记录。用 exclude_unset / exclude_none 准确表达前端意图。
+
+        支持 RETURNING 的方言一条 UPDATE ... WHERE <主键 + 软删除 + 数据权限> RETURNING 完成“存在性校验 + 更新 + 取回”；
+        MySQL 退回先 get 再 flush。load_audit 含义同 create。
+        """
         try:
             obj_dict = data.model_dump(exclude_unset=True, exclude_none=True, exclude={"id"}) if isinstance(data, BaseModel) else cast("dict[str, Any]", data)
-            obj = await self.get(id=id)
-            if not obj:
-                raise CustomException(msg="更新对象不存在")
-
-            # 更新操作自动更新 updated_id
-            user = self.auth.user
-            if user.id and hasattr(obj, "updated_id"):
-                setattr(obj, "updated_id", user.id)
-
-            for key, value in obj_dict.items():
-                if hasattr(obj, key):
-                    setattr(obj, key, value)
-
-            await self.db.flush()
-            await self.db.refresh(obj)
-
-            preload_options = []
-            mapper = sa_inspect(self.model)
-            if hasattr(mapper, "relationships"):
-                for rel_name in ("created_by", "updated_by"):
-                    if rel_name in mapper.relationships:
-                        preload_options.append(joinedload(getattr(self.model, rel_name)))
-            if preload_options:
-                result = await self.db.execute(
-                    select(self.model).options(*preload_options).where(self._get_pk_col() == obj.id)
+            meta = self._meta
+            obj_dict = {key: value for key, value in obj_dict.items() if meta.has(key)}
+            obj_dict.update(self._audit_values("updated_id"))
+            # 修改 parent_id 即移动节点：先校验不成环并记下新旧路径
+            move = await self._tree_prepare_move(id, obj_dict["parent_id"]) if meta.tree and "parent_id" in obj_dict else None
+
+            if obj_dict and self._dialect.update_returning and self._is_column_dict(obj_dict):
+                conditions = await self._build_conditions(id=id)
+                sql = (
+                    update(self.model)
+                    .where(*conditions)
+                    .values(**obj_dict)
+                    .returning(self.model)
+                    .execution_options(populate_existing=True)
                 )
-                obj = result.scalar_one()
-
-            return obj
+                result: Result = await self.db.execute(sql)
+                obj = result.scalars().first()
+                if not obj:
+                    raise CustomException(msg="更新对象不存在")
+            else:
+                obj = await self.get(id=id)
+                if not obj:
+                    raise CustomException(msg="更新对象不存在")
+                for key, value in obj_dict.items():
+                    setattr(obj, key, value)
+                await self.db.flush()
+                if not load_audit:
+                    # onupdate 生成的列（updated_time 等）flush 后处于过期状态，异步会话里不能懒加载，回查一次；
+                    # load_audit=True 时 _load_audit 的查询会顺带刷新过期属性
+                    await self.db.refresh(obj)
+            if move is not None:
+                await self._tree_move(obj, *move)
+            await self._after_write()
+
+            return await self._load_audit(obj) if load_audit else obj
         except CustomException:
             raise
         except Exception as e:
             raise CustomException(msg=f"更新失败: {e!s}") from e
 
-    async def delete(self, ids: list[int]) -> None:
-        """软删除优先，无软删除则物理删除。"""
+    async def create_many(
+        self,
+        rows: Sequence[CreateSchemaType | dict[str, Any]],
+        returning: bool = False,
+        batch_size: int = 500,
+    ) -> list[int]:
+        """批量新增：按 batch_size 分批，每批走 SQLAlchemy insertmanyvalues 渲染为多行 INSERT ... VALUES (...), (...)。
+
+        - 审计字段（created_id/updated_id）统一填充，不逐行 flush/refresh/回查审计人；
+        - returning=True 时按入参顺序返回新主键：预先生成 uuid，支持 RETURNING 的方言（PostgreSQL/sqlite）随 INSERT 带回
+          (id, uuid)，MySQL 插入后按 uuid 回查一次；
+        - 不经过 ORM 对象，插入行不会进入 Session identity map。
+        """
+        try:
+            values = self._bulk_values(rows)
+            if not values:
+                return []
+            key_cols: list[str] = []
+            if returning and self._meta.has("uuid"):
+                for row in values:
+                    row.setdefault("uuid", uuid4_str())
+                key_cols = ["uuid"]
+            ids = await self._execute_bulk(insert(self.model), values, batch_size, returning, key_cols)
+            if self._meta.tree:
+                await self.sync_tree_paths()
+            self._adjust_total(len(values))
+            await self._after_write()
+            return [pk for pk in ids if pk is not None]
+        except Exception as e:
+            raise CustomException(msg=f"批量创建失败: {e!s}") from e
+
+    async def upsert_many(
+        self,
+        rows: Sequence[CreateSchemaType | dict[str, Any]],
+        conflict_cols: list[str],
+        update_cols: list[str] | None = None,
+        returning: bool = False,
+        batch_size: int = 500,
+    ) -> list[int]:
+        """批量新增或更新：INSERT ... ON CONFLICT DO UPDATE（PostgreSQL/sqlite）/ ON DUPLICATE KEY UPDATE（MySQL）。
+
+        - conflict_cols 须对应唯一约束；MySQL 由任一唯一键触发冲突，conflict_cols 仅用于 returning 回查；
+        - update_cols 默认取入参中除冲突列、主键、uuid、创建审计字段外的全部列，传空列表则冲突时跳过；
+        - 冲突更新时同步刷新 updated_id/updated_time（ON CONFLICT 不会触发 ORM onupdate）；
+        - returning=True 时按入参顺序返回主键，冲突跳过而未被语句带回的行不在其中。
+        """
+        try:
+            values = self._bulk_values(rows)
+            if not values:
+                return []
+            if self._meta.has("updated_time"):
+                now = datetime.now(UTC)
+                for row in values:
+                    row.setdefault("updated_time", now)
+
+            protected = {*conflict_cols, self._get_pk_col().key, "uuid", "created_id", "created_dept_id", "created_time"}
+            if update_cols is None:
+                update_cols = [key for key in dict.fromkeys(k for row in values for k in row) if key not in protected]
+            elif update_cols:
+                update_cols = [*update_cols, *(col for col in ("updated_id", "updated_time") if col in values[0])]
+
+            dialect = self.db.get_bind().dialect.name
+            ids: list[int | None] = [None] * len(values)
+            for group in self._bulk_groups(values, batch_size):
+                rows = [values[index] for index in group]
+                sql = self._upsert_statement(dialect, conflict_cols, [col for col in update_cols if col in rows[0]])
+                group_ids = await self._execute_bulk(sql, rows, batch_size, returning, conflict_cols)
+                for index, pk in zip(group, group_ids, strict=False):
+                    ids[index] = pk
+            if self._meta.tree:
+                # 冲突更新可能改动已有行的 parent_id，此时整树重算
+                await self.sync_tree_paths(rebuild="parent_id" in update_cols)
+            # 无法区分新增与冲突更新的行数
+            self._adjust_total(None)
+            await self._after_write()
+            return [pk for pk in ids if pk is not None]
+        except Exception as e:
+            raise CustomException(msg=f"批量新增或更新失败: {e!s}") from e
+
+    async def delete(self, ids: list[int], scoped: bool = False) -> list[int]:
+        """软删除优先，无软删除则物理删除。返回实际受影响的主键（已删除/不存在的 id 不在其中）。
+
+        默认只按主键与软删除标记过滤；scoped=True 时再套用数据权限条件，权限外的 id 不受影响、也不在返回值中。
+        """
         try:
-            pk = self._get_pk_col()
+            # 加 is_deleted=false() 条件，防止重复软删除（幂等）
+            conditions = await self._write_conditions(ids, include_deleted=False, scoped=scoped)
             if self._supports_soft_delete:
-                # 加 is_deleted=false() 条件，防止重复软删除（幂等）
-                sql = update(self.model).where(pk.in_(ids)).where(
-                    getattr(self.model, "is_deleted") == false()
-                ).values(**self._soft_delete_values())
+                sql = update(self.model).values(**self._soft_delete_values())
             else:
-                sql = delete(self.model).where(pk.in_(ids))
-            await self.db.execute(sql)
-            await self.db.flush()
+                sql = delete(self.model)
+            affected = await self._execute_returning_ids(sql, conditions)
+            if self._meta.tree and not self._supports_soft_delete and affected:
+                await self._tree_detach(affected)
+            self._adjust_total(-len(affected))
+            await self._after_write()
+            return affected
         except Exception as e:
             raise CustomException(msg=f"删除失败: {e!s}") from e
 
@@ -282,38 +715,312 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
                 sql = delete(self.model)
             await self.db.execute(sql)
             await self.db.flush()
+            # 软删除模式只清理已删除记录，总数不变
+            self._adjust_total(0 if self._supports_soft_delete else None)
+            await self._after_write()
         except Exception as e:
             raise CustomException(msg=f"清空失败: {e!s}") from e
 
-    async def set(self, ids: list[int], include_deleted: bool = False, **kwargs) -> None:
-        """批量更新。软删除模式下默认跳过已删除的记录。"""
+    async def set(self, ids: list[int], include_deleted: bool = False, scoped: bool = False, **kwargs) -> list[int]:
+        """批量更新。软删除模式下默认跳过已删除的记录。返回实际受影响的主键，scoped 含义同 delete。"""
         try:
-            pk = self._get_pk_col()
-            sql = update(self.model).where(pk.in_(ids))
-            if self._supports_soft_delete and not include_deleted:
-                sql = sql.where(getattr(self.model, "is_deleted") == false())
-            sql = sql.values(**kwargs)
-            await self.db.execute(sql)
-            await self.db.flush()
+            conditions = await self._write_conditions(ids, include_deleted=include_deleted, scoped=scoped)
+            sql = update(self.model).values(**kwargs)
+            affected = await self._execute_returning_ids(sql, conditions)
+            if self._meta.tree and "parent_id" in kwargs and affected:
+                await self.sync_tree_paths(rebuild=True)
+            if "is_deleted" in kwargs:
+                self._adjust_total(None)
+            await self._after_write()
+            return affected
         except Exception as e:
             raise CustomException(msg=f"批量更新失败: {e!s}") from e
 
-    async def restore(self, ids: list[int]) -> None:
-        """反删除：还原 is_deleted、清空删除时间和人。"""
+    async def restore(self, ids: list[int], scoped: bool = False) -> list[int]:
+        """反删除：还原 is_deleted、清空删除时间和人。返回实际受影响的主键，scoped 含义同 delete。"""
         try:
             if not self._supports_soft_delete:
                 raise CustomException(msg="该模型不支持软删除，无法恢复")
-            pk = self._get_pk_col()
-            sql = update(self.model).where(pk.in_(ids)).values(is_deleted=False, deleted_time=None, deleted_id=None)
-            await self.db.execute(sql)
-            await self.db.flush()
+            conditions = await self._write_conditions(ids, include_deleted=True, scoped=scoped)
+            # 只还原已删除的记录，受影响行数即总数增量
+            conditions.append(getattr(self.model, "is_deleted") == true())
+            sql = update(self.model).values(is_deleted=False, deleted_time=None, deleted_id=None)
+            affected = await self._execute_returning_ids(sql, conditions)
+            self._adjust_total(len(affected))
+            await self._after_write()
+            return affected
         except Exception as e:
             raise CustomException(msg=f"恢复失败: {e!s}") from e
 
+    # ── 精简写入辅助 ──────────────────────────────────────────────────
+
+    @property
+    def _dialect(self) -> Any:
+        return self.db.get_bind().dialect
+
+    def _audit_values(self, *attrs: str) -> dict[str, Any]:
+        """当前用户 → 审计人字段（created_dept_id 取当前用户部门），hasattr 兼容无审计字段的模型。"""
+        user = self.auth.user
+        if not user.id:
+            return {}
+        meta = self._meta
+        values = {attr: user.id for attr in attrs if meta.has(attr)}
+        if "created_dept_id" in values:
+            if user.dept_id is None:
+                del values["created_dept_id"]
+            else:
+                values["created_dept_id"] = user.dept_id
+        return values
+
+    def _is_column_dict(self, obj_dict: dict[str, Any]) -> bool:
+        """入参只含列属性时才能走 INSERT/UPDATE ... RETURNING，含关系属性的交给 ORM。"""
+        return self._meta.column_keys.issuperset(obj_dict)
+
+    async def _load_audit(self, obj: ModelType) -> ModelType:
+        """按主键回查一次，joinedload 创建人/更新人。"""
+        preload_options = self._meta.audit_options
+        if not preload_options:
+            return obj
+        pk = self._get_pk_col()
+        result: Result = await self.db.execute(
+            select(self.model).options(*preload_options).where(pk == getattr(obj, pk.key))
+        )
+        return result.scalar_one()
+
+    async def _execute_returning_ids(self, sql: Any, conditions: list[ColumnElement]) -> list[int]:
+        """给 UPDATE/DELETE 加上 conditions 执行并返回受影响主键。
+
+        支持 RETURNING 的方言随语句带回；MySQL 先按同一条件 SELECT ... FOR UPDATE 取主键，再按主键执行，
+        顺带避开 MySQL 不允许 UPDATE 子查询引用自身表的限制。
+        """
+        pk = self._get_pk_col()
+        supported = self._dialect.delete_returning if sql.is_delete else self._dialect.update_returning
+        if supported:
+            result: Result = await self.db.execute(sql.where(*conditions).returning(pk))
+            affected = list(result.scalars().all())
+        else:
+            result = await self.db.execute(select(pk).where(*conditions).with_for_update())
+            affected = list(result.scalars().all())
+            if affected:
+                await self.db.execute(sql.where(pk.in_(affected)))
+        await self.db.flush()
+        return affected
+
+    async def _write_conditions(self, ids: list[int], include_deleted: bool, scoped: bool) -> list[ColumnElement]:
+        """delete/set/restore 的 WHERE：主键 + 软删除标记，scoped=True 时经 _build_conditions 再带上数据权限。"""
+        pk = self._get_pk_col()
+        if scoped:
+            return await self._build_conditions(include_deleted=include_deleted, **{pk.key: ("in", ids)})
+        conditions: list[ColumnElement] = [pk.in_(ids)]
+        if self._supports_soft_delete and not include_deleted:
+            conditions.append(getattr(self.model, "is_deleted") == false())
+        return conditions
+
+    # ── 树形（物化路径） ──────────────────────────────────────────────
+
+    async def get_descendant_ids(self, ids: list[int]) -> list[int]:
+        """ids 及其全部子孙节点主键（一条 tree_path 前缀匹配 SQL）。仅适用于 TreeMixin 模型，带软删除与数据权限过滤。"""
+        paths = await self._tree_paths(ids)
+        if not paths:
+            return []
+        pk = self._get_pk_col()
+        conditions = await self._build_conditions()
+        tree_path = getattr(self.model, "tree_path")
+        result: Result = await self.db.execute(select(pk).where(*conditions, or_(*(tree_path.startswith(path) for path in paths))))
+        return list(result.scalars().all())
+
+    async def get_ancestor_ids(self, ids: list[int]) -> list[int]:
+        """ids 及其全部祖先节点主键，直接由 tree_path 解析。仅适用于 TreeMixin 模型。"""
+        paths = await self._tree_paths(ids)
+        return list(dict.fromkeys(node_id for path in paths for node_id in self.model.path_ids(path)))
+
+    async def sync_tree_paths(self, rebuild: bool = False) -> dict[int, str]:
+        """补齐 tree_path 为空的节点（新增后调用）；rebuild=True 时按 parent_id 整树重算，只写回有变化的行。
+
+        返回本次写入的 {主键: 路径}。不经过数据权限过滤，也不刷新 updated_time（路径属于结构信息）。
+        """
+        pk = self._get_pk_col()
+        model = cast("Any", self.model)
+        stmt = select(pk, model.parent_id, model.tree_path)
+        if not rebuild:
+            stmt = stmt.where(model.tree_path == "")
+        rows = (await self.db.execute(stmt)).all()
+        if not rows:
+            return {}
+        nodes = {row[0]: row[1] for row in rows}
+        current = {row[0]: row[2] for row in rows}
+
+        known: dict[int, str] = {}
+        parent_ids = {parent_id for parent_id in nodes.values() if parent_id is not None and parent_id not in nodes}
+        if parent_ids:
+            result: Result = await self.db.execute(select(pk, model.tree_path).where(pk.in_(parent_ids), model.tree_path != ""))
+            known = {row[0]: row[1] for row in result.all()}
+
+        paths = {node_id: path for node_id, path in model.compute_paths(nodes, known).items() if current[node_id] != path}
+        if paths:
+            table = model.__table__
+            sql = update(table).where(table.c[pk.key] == bindparam("b_id")).values(tree_path=bindparam("b_path"), **self._keep_updated_time(table))
+            await self.db.execute(sql, [{"b_id": node_id, "b_path": path} for node_id, path in paths.items()])
+        return paths
+
+    async def _tree_paths(self, ids: list[int]) -> list[str]:
+        if not self._meta.tree:
+            raise CustomException(msg=f"{self.model.__name__} 不是树形模型")
+        if not ids:
+            return []
+        pk = self._get_pk_col()
+        tree_path = getattr(self.model, "tree_path")
+        result: Result = await self.db.execute(select(tree_path).where(pk.in_(ids), tree_path != ""))
+        return list(result.scalars().all())
+
+    async def _tree_prepare_move(self, id: int, parent_id: int | None) -> tuple[str, str]:
+        """校验新上级不是自身或子孙节点，返回 (旧路径, 新路径)。"""
+        if parent_id == id:
+            raise CustomException(msg="上级节点不能是自身")
+        pk = self._get_pk_col()
+        tree_path = getattr(self.model, "tree_path")
+        result: Result = await self.db.execute(select(pk, tree_path).where(pk.in_([id, parent_id])))
+        paths = {row[0]: row[1] for row in result.all()}
+        parent_path = paths.get(parent_id) if parent_id is not None else None
+        if parent_path and f"{TreeMixin.TREE_SEP}{id}{TreeMixin.TREE_SEP}" in parent_path:
+            raise CustomException(msg="上级节点不能是自身的下级节点")
+        return paths.get(id, ""), self.model.child_path(parent_path, id)
+
+    async def _tree_move(self, obj: ModelType, old_path: str, new_path: str) -> None:
+        """把以 old_path 为前缀的整棵子树改写为 new_path 前缀，一条 UPDATE 完成。"""
+        if not old_path:
+            # 旧路径缺失（未回填的历史数据）时退化为补齐
+            await self.sync_tree_paths()
+        elif old_path != new_path:
+            table = cast("Any", self.model).__table__
+            sql = (
+                update(table)
+                .where(table.c.tree_path.startswith(old_path))
+                .values(tree_path=literal(new_path) + func.substr(table.c.tree_path, len(old_path) + 1), **self._keep_updated_time(table))
+            )
+            await self.db.execute(sql)
+        set_committed_value(obj, "tree_path", new_path)
+
+    async def _tree_detach(self, deleted_ids: list[int]) -> None:
+        """物理删除后，路径经过被删节点的剩余子孙重新挂接（父节点已不存在则成为根）。"""
+        table = cast("Any", self.model).__table__
+        sep = TreeMixin.TREE_SEP
+        sql = (
+            update(table)
+            .where(or_(*(table.c.tree_path.contains(f"{sep}{node_id}{sep}") for node_id in deleted_ids)))
+            .values(tree_path="", **self._keep_updated_time(table))
+        )
+        await self.db.execute(sql)
+        await self.sync_tree_paths()
+
+    @staticmethod
+    def _keep_updated_time(table: Any) -> dict[str, Any]:
+        """显式赋回原值，避免 onupdate 把结构性改写记成业务更新。"""
+        return {"updated_time": table.c.updated_time} if "updated_time" in table.c else {}
+
+    # ── 批量写入辅助 ──────────────────────────────────────────────────
+
+    def _bulk_values(self, rows: Sequence[BaseModel | dict[str, Any]]) -> list[dict[str, Any]]:
+        """入参 → INSERT 参数字典列表，统一填充审计字段。"""
+        audit = self._audit_values("created_id", "created_dept_id", "updated_id")
+        values: list[dict[str, Any]] = []
+        for row in rows:
+            data = row.model_dump(exclude_none=True) if isinstance(row, BaseModel) else dict(row)
+            values.append({**audit, **data})
+        return values
+
+    @staticmethod
+    def _bulk_groups(values: list[dict[str, Any]], batch_size: int) -> list[list[int]]:
+        """按键集合分组（同组才能共用一条 INSERT 模板、upsert 的 SET 列才一致），组内再按 batch_size 切片。
+
+        返回每批行在 values 中的下标，调用方据此把结果还原为入参顺序。
+        """
+        groups: dict[frozenset[str], list[int]] = {}
+        for index, row in enumerate(values):
+            groups.setdefault(frozenset(row), []).append(index)
+        return [group[i : i + batch_size] for group in groups.values() for i in range(0, len(group), batch_size)]
+
+    async def _execute_bulk(self, sql: Any, values: list[dict[str, Any]], batch_size: int, returning: bool, key_cols: list[str]) -> list[int | None]:
+        """分批执行批量 INSERT，returning=True 时返回与 values 逐项对齐的主键（语句未带回的行为 None，如冲突跳过）。
+
+        RETURNING 带回 (主键, *key_cols) 后按唯一键在 Python 里对齐顺序，而不用 sort_by_parameter_order：
+        后者在 sqlite 上会退化成逐行 INSERT。没有唯一键可用时才退回 sort_by_parameter_order，再按分组下标还原顺序。
+        """
+        groups = self._bulk_groups(values, batch_size)
+        if not returning:
+            for group in groups:
+                await self.db.execute(sql, [values[index] for index in group])
+            return []
+
+        pk = self._get_pk_col()
+        if not self._supports_multirow_returning():
+            for group in groups:
+                await self.db.execute(sql, [values[index] for index in group])
+            return await self._ids_by_keys(values, key_cols)
+
+        if not key_cols:
+            ids: list[int | None] = [None] * len(values)
+            for group in groups:
+                result: Result = await self.db.execute(sql.returning(pk, sort_by_parameter_order=True), [values[index] for index in group])
+                for index, new_id in zip(group, result.scalars().all(), strict=True):
+                    ids[index] = new_id
+            return ids
+
+        columns = [getattr(self.model, col) for col in key_cols]
+        ids_by_key: dict[tuple, int] = {}
+        for group in groups:
+            result = await self.db.execute(sql.returning(pk, *columns), [values[index] for index in group])
+            ids_by_key.update({tuple(row[1:]): row[0] for row in result.all()})
+        return [ids_by_key.get(tuple(row[col] for col in key_cols)) for row in values]
+
+    def _supports_multirow_returning(self) -> bool:
+        # MySQL 不支持 RETURNING（MariaDB 支持但 aiomysql 方言未声明），其余方言以 SQLAlchemy 声明为准
+        return bool(getattr(self.db.get_bind().dialect, "insert_executemany_returning", False))
+
+    def _upsert_statement(self, dialect: str, conflict_cols: list[str], update_cols: list[str]) -> Any:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+            sql = mysql_insert(self.model)
+            if not update_cols:
+                # 冲突时跳过：主键赋值为自身。不用 INSERT IGNORE，它会把非空/外键/截断等错误一并降级为警告吞掉
+                pk_name = self._get_pk_col().key
+                return sql.on_duplicate_key_update({pk_name: self.model.__table__.c[pk_name]})
+            return sql.on_duplicate_key_update({col: sql.inserted[col] for col in update_cols})
+        else:
+            raise CustomException(msg=f"数据库方言 {dialect} 不支持批量 upsert")
+
+        sql = dialect_insert(self.model)
+        if not update_cols:
+            return sql.on_conflict_do_nothing(index_elements=conflict_cols)
+        return sql.on_conflict_do_update(index_elements=conflict_cols, set_={col: sql.excluded[col] for col in update_cols})
+
+    async def _ids_by_keys(self, values: list[dict[str, Any]], key_cols: list[str]) -> list[int | None]:
+        """不支持 RETURNING 时按唯一键回查主键，结果与入参逐项对齐。"""
+        pk = self._get_pk_col()
+        columns = [getattr(self.model, col) for col in key_cols]
+        ids_by_key: dict[tuple, int] = {}
+        for i in range(0, len(values), 500):
+            keys = [tuple(row[col] for col in key_cols) for row in values[i : i + 500]]
+            result: Result = await self.db.execute(select(pk, *columns).where(tuple_(*columns).in_(keys)))
+            ids_by_key.update({tuple(row[1:]): row[0] for row in result.all()})
+        return [ids_by_key.get(tuple(row[col] for col in key_cols)) for row in values]
+
     # ── 条件与排序 ────────────────────────────────────────────────────
 
     async def _build_conditions(self, include_deleted: bool = False, **kwargs) -> list[ColumnElement]:
-        """根据 kwargs 动态拼接 WHERE 条件列表。
+        """根据 kwargs 动态拼接 WHERE 条件列表，规则见 _build_where。"""
+        conditions, _ = await self._build_where(include_deleted=include_deleted, **kwargs)
+        return conditions
+
+    async def _build_where(self, include_deleted: bool = False, **kwargs) -> tuple[list[ColumnElement], bool]:
+        """根据 kwargs 动态拼接 WHERE 条件列表，返回 (条件列表, 是否含软删除以外的条件)。
+
+        第二项为 False 表示结果即全表未删除记录，分页 COUNT 可改用统计信息估算。
 
         值类型决定比较方式：
         - tuple     → 委托 _resolve_condition（like/in/between/date/null/比较操作符）
@@ -326,10 +1033,6 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
         """
         conditions: list[ColumnElement] = []
 
-        # 自动排除已删除记录（除非调用方明确要查询已删除数据）
-        if hasattr(self.model, "is_deleted") and not include_deleted:
-            conditions.append(getattr(self.model, "is_deleted") == false())
-
         from app.core.permission import Permission
 
         permission_condition = await Permission(self.model, self.auth, self.db)._permission_condition()
@@ -344,7 +1047,12 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
                 conditions.extend(self._resolve_condition(attr, value))
             else:
                 conditions.append(attr == value)
-        return conditions
+        filtered = bool(conditions)
+
+        # 自动排除已删除记录（除非调用方明确要查询已删除数据）
+        if self._meta.has("is_deleted") and not include_deleted:
+            conditions.insert(0, getattr(self.model, "is_deleted") == false())
+        return conditions, filtered
 
     @staticmethod
     def _resolve_condition(attr: ColumnElement, value: tuple) -> list[ColumnElement]:
@@ -398,6 +1106,78 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
                 columns.append(desc(column) if direction.lower() == "desc" else asc(column))
         return columns
 
+    def _projection_select(self, plan: Projection, extra: Sequence[Any] = ()) -> Any:
+        """投影计划 → SELECT 列 FROM 模型 LEFT JOIN 关系别名（审计人等）。"""
+        sql = select(*plan.columns, *extra).select_from(self.model)
+        for join in plan.joins:
+            sql = sql.outerjoin(join)
+        return sql
+
+    @staticmethod
+    def _project_items(
+        plan: Projection,
+        rows: Sequence[Any],
+        out_schema: type[OutSchemaType] | None,
+        projection: ProjectionMode | None,
+    ) -> list[Any]:
+        data = [plan.to_dict(row) for row in rows]
+        if projection == "schema" and out_schema is not None:
+            return [out_schema.model_validate(item) for item in data]
+        return data
+
+    def _keyset_keys(self, order: list[dict[str, str]]) -> list[tuple[str, Any, bool, bool]]:
+        """order_by → keyset 排序键 [(字段名, 列, 是否降序, 是否可为 NULL)]，末尾补主键保证排序唯一。"""
+        keys: list[tuple[str, Any, bool, bool]] = []
+        for item in order:
+            for field, direction in item.items():
+                column = getattr(self.model, field)
+                keys.append((field, column, direction.lower() == "desc", bool(getattr(column.expression, "nullable", True))))
+        pk_name = self._get_pk_col().key
+        if pk_name not in {key[0] for key in keys}:
+            # 主键方向跟随最后一个排序字段，(created_time desc, id desc) 这类组合可以复用联合索引
+            keys.append((pk_name, getattr(self.model, pk_name), keys[-1][2] if keys else False, False))
+        return keys
+
+    @staticmethod
+    def _keyset_ordering(keys: list[tuple[str, Any, bool, bool]], backward: bool) -> list[ColumnElement]:
+        """keyset 排序子句。可为 NULL 的列约定 NULL 大于任何值（升序排最后、降序排最前）。
+
+        用 ``column IS NULL`` 排序项显式表达而不是 NULLS FIRST/LAST：MySQL 不支持后者，且各库默认的 NULL 位置不同。
+        """
+        ordering: list[ColumnElement] = []
+        for _, column, is_desc, nullable in keys:
+            direction = asc if is_desc == backward else desc
+            if nullable:
+                ordering.append(direction(column.is_(None)))
+            ordering.append(direction(column))
+        return ordering
+
+    @staticmethod
+    def _keyset_condition(keys: list[tuple[str, Any, bool, bool]], values: list[Any], backward: bool) -> ColumnElement:
+        """展开为 (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...，兼容各字段升降序混排。
+
+        行值比较 (k1, k2) > (v1, v2) 要求所有字段同向，混排时只能展开。
+        NULL 按 _keyset_ordering 的约定视为最大值：
+        - 向大的方向翻：边界非 NULL 时 NULL 行也在后面（> v OR IS NULL），边界为 NULL 时该字段已无更大值；
+        - 向小的方向翻：边界非 NULL 时 < v 天然排除 NULL，边界为 NULL 时所有非 NULL 行都在前面（IS NOT NULL）。
+        """
+        clauses: list[ColumnElement] = []
+        prefix: list[ColumnElement] = []
+        for (_, column, is_desc, nullable), value in zip(keys, values, strict=True):
+            ascending = is_desc == backward
+            if value is None:
+                if not ascending:
+                    clauses.append(and_(*prefix, column.isnot(None)))
+                prefix.append(column.is_(None))
+                continue
+            if ascending:
+                strict = or_(column > value, column.is_(None)) if nullable else column > value
+            else:
+                strict = column < value
+            clauses.append(and_(*prefix, strict))
+            prefix.append(column == value)
+        return or_(*clauses) if clauses else false()
+
     def _loader_options(self, preload: list[str | Any] | None = None) -> list[Any]:
         """将字符串预加载描述转为 SQLAlchemy loading options。
 
@@ -406,66 +1186,9 @@ class CRUDBase[ModelType: ModelMixin, CreateSchemaType, UpdateSchemaType]:
         - 已存在 options 对象 → 原样追加
 
         自动为 created_by / updated_by 添加 joinedload（所有查询都 LEFT JOIN 用户表获取审计人）。
+        字符串部分按组合缓存在 ModelMeta 上，同一接口重复请求不再重新解析。
         """
-        options: list[Any] = []
-        if not preload:
-            preload = []
-        mapper = sa_inspect(self.model)
-        processed_attrs = set()
-
-        for opt in preload:
-            if isinstance(opt, str):
-                parts = opt.split(".")
-                if len(parts) == 1:
-                    attr_name = parts[0]
-                    if attr_name in processed_attrs:
-                        continue  # 跳过同层重复名称
-                    processed_attrs.add(attr_name)
-                    if not hasattr(self.model, attr_name):
-                        continue  # 非模型属性，忽略
-                    prop = mapper.relationships.get(attr_name)
-                    if prop is None:
-                        continue  # 列属性不支持 eager loading，忽略
-                    attr = getattr(self.model, attr_name)
-                    # 一对一/多对一用 joinedload（一条 SQL 完成），一对多/多对多用 selectinload（N+1 → 2 条 SQL）
-                    if not prop.uselist:
-                        options.append(joinedload(attr))
-                    else:
-                        options.append(selectinload(attr))
-                else:
-                    full_path = ".".join(parts)
-                    if full_path in processed_attrs:
-                        continue  # 跳过完全相同的嵌套路径
-                    processed_attrs.add(full_path)
-                    current_model = self.model
-                    current_mapper = mapper
-                    current_option = None
-                    for part in parts:
-                        if not hasattr(current_model, part):
-                            break
-                        attr = getattr(current_model, part)
-                        prop = current_mapper.relationships.get(part)
-                        if prop is None:
-                            break  # 非关系属性中断链
-                        loader = selectinload(attr) if prop.uselist else joinedload(attr)
-                        # 嵌套加载通过 .options() 链式组合
-                        if current_option is None:
-                            current_option = loader
-                        else:
-                            current_option = current_option.options(loader)
-                        current_model = prop.mapper.class_
-                        current_mapper = sa_inspect(current_model)
-                    if current_option is not None:
-                        options.append(current_option)
-            else:
-                options.append(opt)
-
-        # 自动预加载审计关系：常见列表页都要展示创建人/更新人，统一处理避免 N+1
-        for audit_attr in ["created_by", "updated_by"]:
-            if audit_attr not in processed_attrs and audit_attr in mapper.relationships:
-                prop = mapper.relationships[audit_attr]
-                if hasattr(self.model, audit_attr):
-                    attr = getattr(self.model, audit_attr)
-                    options.append(joinedload(attr))
-
+        paths = tuple(opt for opt in preload or () if isinstance(opt, str))
+        options = list(self._meta.loader_options(paths))
+        options.extend(opt for opt in preload or () if not isinstance(opt, str))
         return options
@@ -125,6 +125,15 @@ class UserMixin(MappedBase):
         index=True,
         comment="创建人ID",
     )
+    # 创建人部门（冗余）：数据权限“本部门及以下”直接按本列 IN 过滤，免去逐行关联 sys_user 的 EXISTS 子查询。
+    # 老库由迁移 d6c41e8a2f53 加列并回填；仍为空的行在数据权限过滤中退回按创建人当前部门判断
+    created_dept_id: Mapped[int | None] = mapped_column(
+        Integer,
+        default=None,
+        nullable=True,
+        index=True,
+        comment="创建人部门ID",
+    )
     updated_id: Mapped[int | None] = mapped_column(
         Integer,
         ForeignKey("sys_user.id", ondelete="SET NULL", onupdate="CASCADE"),
@@ -169,3 +178,56 @@ class UserMixin(MappedBase):
             foreign_keys=lambda: self.deleted_id,  # pyright: ignore[reportArgumentType]
             uselist=False,
         )
+
+
+class TreeMixin(MappedBase):
+    """树形结构 Mixin（物化路径）
+
+    tree_path 记录从根到自身的主键链，形如 ``/1/5/12/``（首尾带分隔符，避免 ``/1/`` 误匹配 ``/12/``）：
+    - 子孙（含自身）：``tree_path LIKE '/1/5/%'``，前缀匹配走索引；
+    - 祖先（含自身）：直接解析自身 tree_path，无需查库。
+
+    路径由 CRUDBase 在新增/移动（修改 parent_id）/物理删除时维护，模型需自带 ``parent_id`` 列。
+    """
+
+    __abstract__: bool = True
+
+    TREE_SEP = "/"
+
+    tree_path: Mapped[str] = mapped_column(
+        String(512),
+        default="",
+        server_default="",
+        nullable=False,
+        index=True,
+        comment="物化路径(/祖先ID/.../自身ID/)",
+    )
+
+    @classmethod
+    def child_path(cls, parent_path: str | None, id: int) -> str:
+        """父节点路径 + 自身主键 → 自身路径；父路径为空视为根节点。"""
+        return f"{parent_path or cls.TREE_SEP}{id}{cls.TREE_SEP}"
+
+    @classmethod
+    def path_ids(cls, path: str | None) -> list[int]:
+        """路径 → 主键链（根在前，含自身）。"""
+        return [int(part) for part in (path or "").split(cls.TREE_SEP) if part]
+
+    @classmethod
+    def compute_paths(cls, nodes: dict[int, int | None], known: dict[int, str]) -> dict[int, str]:
+        """按 {id: parent_id} 计算路径，known 为已知路径的节点（通常是待算节点的现存父节点）。
+
+        迭代实现，不受递归深度限制；父节点不存在或成环时按根节点处理。
+        """
+        paths: dict[int, str] = {}
+        for start in nodes:
+            chain: list[int] = []
+            current: int | None = start
+            while current is not None and current in nodes and current not in paths and current not in chain:
+                chain.append(current)
+                current = nodes[current]
+            # current 落在已算出/已知路径的节点上则接上，否则（根、孤儿、环）从根开始
+            base = paths.get(current) or known.get(current) if current is not None and current not in chain else None
+            for node_id in reversed(chain):
+                base = paths[node_id] = cls.child_path(base, node_id)
+        return paths
@@ -2,7 +2,7 @@ import json
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_validator
 
 from app.core.validator import DateTimeStr
 
@@ -130,11 +130,16 @@ class PageResultSchema[T](BaseModel):
     page_size: int | None = Field(default=None, ge=1, description="页面大小，默认为10")
     total: int = Field(default=0, ge=0, description="总记录数")
     has_next: bool | None = Field(default=False, description="是否有下一页")
+    next_cursor: str | None = Field(default=None, description="下一页游标（仅游标分页返回）")
+    prev_cursor: str | None = Field(default=None, description="上一页游标（仅游标分页返回）")
     items: list[T] = Field(default_factory=list, description="分页后的数据列表")
 
 
 class PaginationQueryParam(BaseModel):
-    """分页 —— order_by 以 JSON 字符串传递，避免 Depends() 模式下 list 字段被当 body 验证。"""
+    """分页 —— order_by 以 JSON 字符串传递，避免 Depends() 模式下 list 字段被当 body 验证。
+
+    cursor 为 None 时走 OFFSET/LIMIT；不为 None 时走 keyset 游标分页（深翻页不退化）。
+    """
 
     page_no: int = Field(default=1, description="当前页码", ge=1)
     page_size: int = Field(default=10, description="每页数量", ge=1, le=100)
@@ -142,6 +147,10 @@ class PaginationQueryParam(BaseModel):
         default=None,
         description="排序字段 JSON 字符串, 格式:[{'field1': 'asc'}, {'field2': 'desc'}]",
     )
+    cursor: str | None = Field(
+        default=None,
+        description="游标分页：传空串取第一页，之后传上次返回的 next_cursor/prev_cursor；传入后忽略 page_no",
+    )
 
     @field_validator("order_by")
     @classmethod
@@ -209,3 +218,8 @@ class AuthSchema(BaseModel):
     user: CoreUserSchema = Field(default_factory=CoreUserSchema, description="用户信息", exclude=True)
     permissions: list[str] = Field(default_factory=list, description="用户权限标识列表")
     menu_ids: list[int] = Field(default_factory=list, description="角色授权的菜单ID列表")
+
+    # 请求级缓存：数据权限解析结果（角色数据范围, 可访问部门ID），AuthSchema 随请求创建，生命周期即一次请求
+    _data_scope: tuple[frozenset, frozenset[int]] | None = PrivateAttr(default=None)
+    # 角色组合编译后的权限集合（app.core.permission_set.PermissionSet），认证时挂上，进程内共享只读
+    _permission_set: Any = PrivateAttr(default=None)
@@ -0,0 +1,145 @@
+import zlib
+from functools import lru_cache, partial
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, IdentityResponder
+from starlette.types import ASGIApp
+
+from app.config.setting import settings
+
+# zstd / brotli 为可选依赖（uv sync --extra compress），未安装时只协商 gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 本身已压缩的类型：再压只耗 CPU、几乎不减小体积（xlsx/docx/pptx 实为 zip 容器）
+EXCLUDED_CONTENT_TYPES = (
+    *DEFAULT_EXCLUDED_CONTENT_TYPES,
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-rar-compressed",
+    "application/x-xz",
+    "application/x-zip-compressed",
+    "application/zstd",
+)
+
+# 文本类（压缩率高）：小响应用较高级别，大响应/流式换成快速级别
+TEXT_CONTENT_TYPES = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "application/x-ndjson",
+        "image/svg+xml",
+    }
+)
+
+# 各编码在三个档位的级别：text 为文本类普通响应，large 为文本类大响应或流式，other 为其他可压缩类型
+LEVELS: dict[str, dict[str, int]] = {
+    "zstd": {"text": 6, "large": 3, "other": 1},
+    "br": {"text": 5, "large": 3, "other": 1},
+    "gzip": {"text": 6, "large": 3, "other": 1},
+}
+
+# 单块超过该大小时放到线程池压缩，避免阻塞事件循环
+_THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+def available_encodings() -> tuple[str, ...]:
+    """按 COMPRESS_ENCODINGS 的优先顺序，返回当前环境可用的编码。"""
+    installed = {"zstd": zstandard is not None, "br": brotli is not None, "gzip": True}
+    return tuple(name for name in settings.COMPRESS_ENCODINGS if installed.get(name))
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """按服务端优先顺序挑选客户端接受（q > 0）的第一个编码；客户端的 q 值只用来排除，不参与排序。
+
+    Accept-Encoding 的取值种类很少，结果按原始头缓存。
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in encodings:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def level_for(encoding: str, media_type: str, size: int, streaming: bool) -> int:
+    """按内容类型与大小档位取压缩级别；gzip 在配置了旧的 GZIP_COMPRESS_LEVEL 时沿用该级别。"""
+    if encoding == "gzip" and settings.GZIP_COMPRESS_LEVEL is not None:
+        return settings.GZIP_COMPRESS_LEVEL
+    is_text = media_type.startswith("text/") or media_type in TEXT_CONTENT_TYPES or media_type.endswith("+json")
+    if not is_text:
+        profile = "other"
+    elif streaming or size >= settings.COMPRESS_LARGE_SIZE:
+        profile = "large"
+    else:
+        profile = "text"
+    return LEVELS[encoding][profile]
+
+
+class StreamCompressor:
+    """单个响应的增量压缩器：compress(chunk, final) 返回可直接发送的字节；非最后一块做同步刷新，客户端可立即解出。"""
+
+    __slots__ = ("_compress", "_finish", "_flush")
+
+    def __init__(self, encoding: str, level: int, size_hint: int = -1) -> None:
+        if encoding == "zstd":
+            impl = zstandard.ZstdCompressor(level=level).compressobj(size=size_hint)
+            self._compress, self._finish = impl.compress, impl.flush
+            self._flush = partial(impl.flush, zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        elif encoding == "br":
+            impl = brotli.Compressor(quality=level)
+            self._compress, self._flush, self._finish = impl.process, impl.flush, impl.finish
+        else:
+            impl = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress, self._finish = impl.compress, impl.flush
+            self._flush = partial(impl.flush, zlib.Z_SYNC_FLUSH)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        return self._compress(chunk) + (self._finish() if final else self._flush())
+
+
+class CompressionResponder(IdentityResponder):
+    """在 starlette 的 IdentityResponder 上实现压缩：响应头、Vary、Content-Length 与流式处理沿用其逻辑，
+    只在第一块响应体到达时按内容类型与大小确定级别，之后每块增量压缩。
+    """
+
+    def __init__(self, app: ASGIApp, encoding: str) -> None:
+        super().__init__(app, settings.COMPRESS_MIN_SIZE, exclude_content_types=EXCLUDED_CONTENT_TYPES)
+        self.content_encoding = encoding
+        self._compressor: StreamCompressor | None = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            media_type = Headers(raw=self.initial_message["headers"]).get("content-type", "")
+            media_type = media_type.partition(";")[0].strip().lower()
+            level = level_for(self.content_encoding, media_type, len(body), more_body)
+            self._compressor = StreamCompressor(self.content_encoding, level, -1 if more_body else len(body))
+        if len(body) >= _THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self._compressor.compress, body, not more_body)
+        return self._compressor.compress(body, not more_body)
@@ -1,9 +1,15 @@
+import asyncio
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
 from fastapi import FastAPI
 from redis import exceptions
 from redis.asyncio import Redis
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 
 from app.config.setting import settings
 from app.core.base_model import MappedBase
@@ -84,8 +90,131 @@ def create_async_engine_and_session(db_url: str = settings.ASYNC_DB_URI) -> tupl
         return async_engine, AsyncSessionLocal
 
 
+class ReplicaRouter:
+    """只读副本路由：按轮询顺序挑选副本，连接失败的副本摘除 REPLICA_RETRY_SECONDS 后再参与轮询。
+
+    引擎在首次使用时才创建，未配置副本时不占用任何连接池。
+    """
+
+    def __init__(self, urls: list[str]) -> None:
+        self._urls = list(urls)
+        self._sessions: dict[int, async_sessionmaker[AsyncSession]] = {}
+        self._engines: list[AsyncEngine] = []
+        self._down_until = [0.0] * len(self._urls)
+        self._cursor = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._urls)
+
+    def _session_factory(self, index: int) -> async_sessionmaker[AsyncSession]:
+        factory = self._sessions.get(index)
+        if factory is None:
+            replica_engine, factory = create_async_engine_and_session(self._urls[index])
+            self._engines.append(replica_engine)
+            self._sessions[index] = factory
+        return factory
+
+    def _candidates(self) -> list[int]:
+        """本轮可用副本下标，从轮询游标处开始。"""
+        now = time.monotonic()
+        total = len(self._urls)
+        start = next(self._cursor) % total
+        return [i for i in ((start + n) % total for n in range(total)) if self._down_until[i] <= now]
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        self._down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        logger.warning(f"⚠️ 只读副本 #{index} 不可用，{settings.REPLICA_RETRY_SECONDS}s 内改走其他副本/主库: {error}")
+
+    async def open_session(self) -> AsyncSession | None:
+        """打开一个已建立连接的副本会话；全部副本不可用时返回 None，由调用方回落主库。"""
+        for index in self._candidates():
+            session = self._session_factory(index)()
+            try:
+                # 取连接即健康检查（pool_pre_ping 会顺带探活），失败说明副本不可达
+                await session.connection()
+            except Exception as e:
+                await session.close()
+                self.mark_down(index, e)
+                continue
+            return session
+        return None
+
+    async def dispose(self) -> None:
+        for replica_engine in self._engines:
+            await replica_engine.dispose()
+
+
 engine, db_session = create_engine_and_session()
 async_engine, async_db_session = create_async_engine_and_session()
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+# 全局 Redis 连接，供无 Request 上下文的核心层（如 CRUDBase 的 COUNT 缓存）使用；未连接时为 None
+redis_client: Redis | None = None
+
+# ── 事务提交后回调 ──────────────────────────────────────────────────
+# 缓存失效、版本号递增、计数器累加等 Redis 副作用必须在事务提交之后执行：
+# 提交前执行的话，并发请求可能在失效与提交之间读到旧数据并重新写入缓存，旧数据会一直保留到缓存过期。
+
+_AFTER_COMMIT_KEY = "after_commit"
+_AFTER_COMMIT_TASKS_KEY = "after_commit_tasks"
+# 已调度但尚未结束的回调任务，持有强引用防止被 GC 回收
+_after_commit_running: set[asyncio.Task] = set()
+
+
+def after_commit(session: AsyncSession | Session, callback: Callable[[], Awaitable[Any]], key: Hashable | None = None) -> None:
+    """登记当前事务提交成功后执行的异步回调，事务回滚则丢弃。
+
+    参数:
+    - session (AsyncSession | Session): 当前数据库会话。
+    - callback (Callable[[], Awaitable[Any]]): 无参异步回调。
+    - key (Hashable | None): 去重键，同一事务内 key 相同的回调只执行第一个登记的。
+
+    返回:
+    - None
+    """
+    pending: dict[Hashable, Callable[[], Awaitable[Any]]] = session.info.setdefault(_AFTER_COMMIT_KEY, {})
+    pending.setdefault(key if key is not None else object(), callback)
+
+
+async def wait_after_commit(session: AsyncSession) -> None:
+    """等待本会话已提交事务的回调执行完毕。db_getter 在提交后调用，保证响应返回前缓存已失效。"""
+    tasks = session.info.pop(_AFTER_COMMIT_TASKS_KEY, None)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def _run_after_commit(callbacks: list[Callable[[], Awaitable[Any]]]) -> None:
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            # 数据已提交，回调失败只记录日志，缓存由各自的 TTL 兜底
+            logger.error(f"❌ 事务提交后回调执行失败: {e}")
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_after_commit(session: Session) -> None:
+    pending = session.info.pop(_AFTER_COMMIT_KEY, None)
+    if not pending:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("⚠️ 同步会话提交时无事件循环，事务提交后回调被丢弃")
+        return
+    task = loop.create_task(_run_after_commit(list(pending.values())))
+    _after_commit_running.add(task)
+    task.add_done_callback(_after_commit_running.discard)
+    session.info.setdefault(_AFTER_COMMIT_TASKS_KEY, []).append(task)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_commit(session: Session, transaction: SessionTransaction) -> None:
+    # 最外层事务结束时仍未被 after_commit 取走的回调说明事务已回滚；SAVEPOINT 回滚不影响外层登记的回调
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+
 
 async def check_db() -> None:
     """检查数据库连接是否正常。"""
@@ -137,6 +266,7 @@ async def redis_connect(app: FastAPI, status: bool) -> Redis | None:
     返回:
     - Redis | None: Redis连接实例,如果连接失败则返回None。
     """
+    global redis_client
     if status:
         try:
             rd = await Redis.from_url(
@@ -148,6 +278,7 @@ async def redis_connect(app: FastAPI, status: bool) -> Redis | None:
                 socket_timeout=settings.POOL_TIMEOUT,
             )
             app.state.redis = rd
+            redis_client = rd
             if await rd.ping():  # pyright: ignore[reportGeneralTypeIssues]
                 return rd
         except exceptions.AuthenticationError as e:
@@ -160,5 +291,6 @@ async def redis_connect(app: FastAPI, status: bool) -> Redis | None:
             logger.error(f"❌ 数据库 Redis 连接错误: {e}")
             raise
     else:
+        redis_client = None
         await app.state.redis.close()
         logger.info("✅️ Redis连接已关闭")
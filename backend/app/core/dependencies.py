@@ -1,6 +1,5 @@
 import json
 from collections.abc import AsyncGenerator
-from typing import Any
 
 from fastapi import Depends, Request
 from redis.asyncio.client import Redis
@@ -9,22 +8,94 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.enums import RET, RedisInitKeyConfig
 from app.config.setting import settings
+from app.core.auth_cache import auth_session_cache
 from app.core.base_schema import AuthSchema, CoreUserSchema
-from app.core.database import async_db_session
+from app.core.database import async_db_session, replica_router, wait_after_commit
 from app.core.exceptions import CustomException
 from app.core.logger import logger
-from app.core.redis_crud import RedisCURD
+from app.core.login_stats import ActiveUsers
+from app.core.permission_set import PermissionSet, get_permission_set
+from app.core.redis_crud import SESSION_TOUCH_SCRIPT, RedisCURD
 from app.core.security import OAuth2Schema, decode_access_token
 
+# 只读请求方法：配置了只读副本时这类请求走副本
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-async def db_getter() -> AsyncGenerator[AsyncSession, None]:
+
+async def db_getter(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """数据库会话 — 请求级生命周期管理。
 
     一个 HTTP 请求内所有 SQL 共享同一个事务：要么全成功，要么全失败。
     读操作也走这个事务（牺牲一点 MVCC 隔离换取读已写一致性）。
+
+    配置了 DATABASE_REPLICA_URLS 时做读写分离：
+    - GET/HEAD/OPTIONS 轮询取副本会话，副本全部不可用时回落主库；
+    - 其余方法走主库，提交成功后把当前登录会话固定到主库 READ_YOUR_WRITES_SECONDS 秒，
+      期间同一会话的读请求也走主库，避免读到复制延迟前的旧数据。
+
+    会在 GET 接口里写库的场景请改用 primary_db_getter。
+
+    提交后等待本事务登记的 after_commit 回调（缓存失效等）执行完毕再结束请求。
     """
+    if not replica_router.enabled:
+        async with async_db_session() as session, session.begin():
+            yield session
+        await wait_after_commit(session)
+        return
+
+    if request.method in _SAFE_METHODS:
+        if not await _read_pinned(request):
+            replica = await replica_router.open_session()
+            if replica is not None:
+                # 副本会话只读：不提交，关闭时回滚
+                async with replica:
+                    yield replica
+                return
+        async with async_db_session() as session, session.begin():
+            yield session
+        await wait_after_commit(session)
+        return
+
     async with async_db_session() as session, session.begin():
         yield session
+    await wait_after_commit(session)
+    await _pin_read_primary(request)
+
+
+async def primary_db_getter() -> AsyncGenerator[AsyncSession, None]:
+    """固定走主库的数据库会话（不参与读写分离）。"""
+    async with async_db_session() as session, session.begin():
+        yield session
+    await wait_after_commit(session)
+
+
+def _request_session_id(request: Request) -> str | None:
+    """从 Authorization 头解析登录会话 ID，未登录/令牌非法返回 None（这里不做鉴权）。"""
+    token = request.headers.get("Authorization", "")
+    if token.startswith("Bearer"):
+        token = token.split(" ")[-1]
+    if not token:
+        return None
+    try:
+        payload = decode_access_token(token, verify_exp=False)
+    except Exception:
+        return None
+    return payload.sub if payload else None
+
+
+async def _read_pinned(request: Request) -> bool:
+    session_id = _request_session_id(request)
+    if not session_id:
+        return False
+    return bool(await RedisCURD(request.app.state.redis).exists(f"{RedisInitKeyConfig.READ_PRIMARY_PIN.key}:{session_id}"))
+
+
+async def _pin_read_primary(request: Request) -> None:
+    session_id = _request_session_id(request)
+    if session_id:
+        await RedisCURD(request.app.state.redis).set(
+            f"{RedisInitKeyConfig.READ_PRIMARY_PIN.key}:{session_id}", "1", expire=settings.READ_YOUR_WRITES_SECONDS
+        )
 
 
 async def redis_getter(request: Request) -> Redis:
@@ -48,6 +119,22 @@ async def get_current_user(
     return await _authenticate(token, db, redis)
 
 
+async def _read_session(redis: Redis, session_id: str) -> str | None:
+    """读取会话数据；滑动模式下读会话 + 续期在一个脚本里一次往返完成。"""
+    session_key = f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}"
+    if not settings.TOKEN_SLIDING_EXPIRE:
+        return await RedisCURD(redis).get(session_key)
+    return await RedisCURD(redis).run_script(
+        SESSION_TOUCH_SCRIPT,
+        keys=[
+            session_key,
+            f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
+            f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
+        ],
+        args=[settings.ACCESS_TOKEN_EXPIRE_SECONDS, settings.REFRESH_TOKEN_EXPIRE_SECONDS],
+    )
+
+
 async def _authenticate(
     token: str,
     db: AsyncSession,
@@ -70,29 +157,23 @@ async def _authenticate(
     if not session_id:
         raise CustomException(msg="认证已失效", code=RET.UNAUTHORIZED.code, status_code=401)
 
-    raw = await RedisCURD(redis).get(f"{RedisInitKeyConfig.USER_SESSION.key}:{session_id}")
+    raw = await _read_session(redis, session_id)
     if not raw:
+        # 注销/强制下线在其他进程执行且失效广播丢失时，本地缓存条目也随会话一起作废
+        auth_session_cache.invalidate_session(session_id)
         raise CustomException(msg="认证已失效", code=RET.UNAUTHORIZED.code, status_code=401)
+
+    # 进程内缓存命中：会话仍在即可，不再解析会话、不查库；用户停用/删除经提交后的失效广播清掉条目，下次未命中时按库校验
+    cached = auth_session_cache.get(session_id)
+    if cached is not None:
+        await ActiveUsers.touch(cached.user.id)
+        return cached
     user_info = json.loads(raw)
 
     # 校验 session 数据完整性
     if not user_info.get("session_id"):
         raise CustomException(msg="认证已失效", code=RET.UNAUTHORIZED.code, status_code=401)
 
-    # 滑动过期续期
-    if settings.TOKEN_SLIDING_EXPIRE:
-        ttl = await RedisCURD(redis).ttl(key=f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        expire_seconds = settings.ACCESS_TOKEN_EXPIRE_SECONDS
-        if ttl > 0 and ttl < expire_seconds // 2:
-            await RedisCURD(redis).expire(
-                key=f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
-                expire=expire_seconds,
-            )
-            await RedisCURD(redis).expire(
-                key=f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}",
-                expire=settings.REFRESH_TOKEN_EXPIRE_SECONDS,
-            )
-
     username = user_info.get("user_name")
     if not username:
         raise CustomException(msg="认证已失效", code=RET.UNAUTHORIZED.code, status_code=401)
@@ -113,13 +194,21 @@ async def _authenticate(
     user_obj = result.scalars().first()
     if not user_obj:
         raise CustomException(msg="用户不存在", code=RET.NOT_FOUND.code, status_code=401)
+    # 会话里的状态是登录时的快照，登录后被停用的用户以库为准
+    if user_obj.status == 1:
+        raise CustomException(msg="用户已被停用", code=RET.UNAUTHORIZED.code, status_code=401)
 
     user = CoreUserSchema.model_validate(user_obj)
-    return AuthSchema(
-        user=user,
-        permissions=user_info.get("permissions", []),
-        menu_ids=user_info.get("menu_ids", []),
-    )
+    # 会话只引用角色组合，权限数据按组合共享（进程内 / Redis）；升级前登录的会话仍带完整权限列表
+    if "role_set" in user_info:
+        permission_set = await get_permission_set(db, user_info["role_set"], user.id)
+    else:
+        permission_set = PermissionSet.build(user_info.get("permissions", []), user_info.get("menu_ids", []))
+    auth = AuthSchema(user=user, permissions=permission_set.permissions, menu_ids=permission_set.menu_ids)
+    auth._permission_set = permission_set
+    auth_session_cache.put(session_id, auth)
+    await ActiveUsers.touch(user.id)
+    return auth
 
 
 class AuthPermission:
@@ -155,12 +244,13 @@ class AuthPermission:
         if "*" in self.permissions or "*:*:*" in self.permissions:
             return auth
 
-        user_permissions = set[Any](auth.permissions)
+        permission_set = auth._permission_set or PermissionSet.build(auth.permissions, auth.menu_ids)
 
-        if not user_permissions:
+        if not permission_set.permissions:
             raise CustomException(msg="无权限操作", code=RET.FORBIDDEN.code, status_code=403)
 
-        if not any(perm in user_permissions for perm in self.permissions):
+        # 前缀树逐段匹配，支持 module_system:user:* 这类通配授权
+        if not permission_set.allows(self.permissions):
             logger.error(f"用户缺少任何所需的权限: {self.permissions}")
             raise CustomException(msg="无权限操作", code=10403, status_code=403)
 
@@ -0,0 +1,123 @@
+import random
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+from functools import lru_cache
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from app.config.setting import settings
+
+_REDACTED = b"******"
+
+# 只截取文本类响应，文件下载等记为 "{}"
+_TEXT_TYPES = ("application/json", "application/x-ndjson", "application/xml", "application/x-www-form-urlencoded", "text/")
+
+
+@lru_cache(maxsize=8)
+def _redact_patterns(fields: tuple[str, ...]) -> tuple[re.Pattern[bytes], re.Pattern[bytes]]:
+    names = b"|".join(re.escape(field.encode()) for field in fields)
+    # JSON："key": "值" / 数字 / true 等；截断处未闭合的字符串一直脱敏到末尾
+    json_pattern = re.compile(rb'("(?:' + names + rb')"\s*:\s*)(?:"(?:[^"\\]|\\.)*(?:"|\\?$)|[^,}\]\s]+)', re.IGNORECASE)
+    # 表单：key=值
+    form_pattern = re.compile(rb"((?:^|&)(?:" + names + rb")=)[^&]*", re.IGNORECASE)
+    return json_pattern, form_pattern
+
+
+def redact(data: bytes) -> bytes:
+    """一遍扫描截取到的字节，把 OPERATION_LOG_SENSITIVE_FIELDS 中字段的值替换为 ******（不解析 JSON，截断的片段同样适用）。"""
+    fields = tuple(settings.OPERATION_LOG_SENSITIVE_FIELDS)
+    if not data or not fields:
+        return data
+    json_pattern, form_pattern = _redact_patterns(fields)
+    data = json_pattern.sub(rb'\1"' + _REDACTED + b'"', data)
+    return form_pattern.sub(rb"\1" + _REDACTED, data)
+
+
+def clip(data: bytes | memoryview, total: int | None = None) -> str:
+    """截取前 OPERATION_LOG_CAPTURE_BYTES 字节并脱敏；被截断时在末尾注明原始大小。"""
+    limit = settings.OPERATION_LOG_CAPTURE_BYTES
+    total = len(data) if total is None else total
+    text = redact(bytes(data[:limit])).decode("utf-8", errors="ignore")
+    return f"{text}…(共 {total} 字节)" if total > limit else text
+
+
+def sample_rate(path: str) -> float:
+    """路由的采样率：OPERATION_LOG_SAMPLE_RATES 中精确匹配优先，其次最长的前缀（以 * 结尾）匹配，否则为默认值。"""
+    rates = settings.OPERATION_LOG_SAMPLE_RATES
+    if path in rates:
+        return rates[path]
+    prefixes = [pattern for pattern in rates if pattern.endswith("*") and path.startswith(pattern[:-1])]
+    return rates[max(prefixes, key=len)] if prefixes else settings.OPERATION_LOG_SAMPLE_RATE
+
+
+def sampled(rate: float) -> bool:
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+async def capture_request(request: Request) -> str:
+    """请求参数：JSON/原始请求体直接截取已缓存的字节，表单只取文本字段（文件不读），都不做反序列化。"""
+    content_type = request.headers.get("Content-Type", "")
+    if content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        try:
+            form = await request.form()
+        except Exception:
+            return ""
+        parts: list[str] = []
+        size = 0
+        # 拼到超过上限即停，字段很多的表单也只处理前面一段
+        for key, value in form.multi_items():
+            if isinstance(value, str):
+                parts.append(f"{key}={value}")
+                size += len(key) + len(value) + 2
+                if size > settings.OPERATION_LOG_CAPTURE_BYTES:
+                    break
+        return clip("&".join(parts).encode())
+    body = await request.body()
+    return clip(memoryview(body)) if body else ""
+
+
+class ResponseCapture:
+    """响应体截取：普通响应直接切片 body；流式响应包装 body_iterator，边发送边保留前 N 字节，
+    日志在后台任务（响应发送完成后）读取 text。
+    """
+
+    __slots__ = ("_chunks", "_size", "total")
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self.total = 0
+
+    @classmethod
+    def attach(cls, response: Response) -> "ResponseCapture | None":
+        content_type = response.headers.get("Content-Type", "")
+        if not content_type.startswith(_TEXT_TYPES) and "+json" not in content_type:
+            return None
+        capture = cls()
+        if isinstance(response, StreamingResponse):
+            response.body_iterator = capture._tee(response.body_iterator)
+        else:
+            # FileResponse 等没有 body 属性
+            capture.feed(getattr(response, "body", b""))
+        return capture
+
+    def feed(self, chunk: bytes | memoryview | str) -> None:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(errors="ignore")
+        self.total += len(chunk)
+        room = settings.OPERATION_LOG_CAPTURE_BYTES - self._size
+        if room > 0:
+            piece = bytes(memoryview(chunk)[:room])
+            self._chunks.append(piece)
+            self._size += len(piece)
+
+    async def _tee(self, iterator: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        async for chunk in iterator:
+            self.feed(chunk)
+            yield chunk
+
+    @property
+    def text(self) -> str:
+        return clip(b"".join(self._chunks), self.total)
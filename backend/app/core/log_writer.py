@@ -0,0 +1,138 @@
+import asyncio
+from collections import defaultdict
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.config.setting import settings
+from app.core.logger import logger
+
+# 队列中的停止标记：flusher 取到后写完当前批次并退出
+_STOP = object()
+
+# 丢弃计数每达到该倍数打一条告警，避免队列满时刷屏
+_DROP_WARN_EVERY = 1000
+
+
+class LogBatchWriter:
+    """操作日志 / 登录日志的进程内批量写入器。
+
+    请求路径只把校验后的行放进有界队列；后台 flusher 攒够 LOG_WRITER_BATCH_SIZE 行或等满
+    LOG_WRITER_FLUSH_INTERVAL_MS 后，在一个事务里按 CRUD 类分组 create_many（多行 INSERT），
+    把"每条日志一个会话 + 一个事务"合并为每批一个。
+
+    - 队列满时最多等待 LOG_WRITER_PUT_TIMEOUT_MS（背压），仍放不进则丢弃并计数；
+    - 整批写入失败时逐行重试，单条坏数据不影响同批其他日志；
+    - 未启动（如测试环境的精简 lifespan）或已停止时直接单条写入，行为与改造前一致；
+    - stop() 在 lifespan 关闭时调用，写完队列中剩余的日志再返回。
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.counters: dict[str, int] = dict.fromkeys(("enqueued", "written", "dropped", "failed", "batches"), 0)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.LOG_WRITER_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run(self._queue))
+
+    async def stop(self) -> None:
+        """停止接收并排空队列。"""
+        task, queue = self._task, self._queue
+        if task is None or queue is None:
+            return
+        # 先摘掉队列，之后的写入直接落库；停止标记排在已入队日志之后
+        self._task = self._queue = None
+        if not task.done():
+            await queue.put(_STOP)
+            await task
+        logger.info("日志批量写入器已停止: {}", self.counters)
+
+    async def write(self, crud_cls: type, data: BaseModel) -> None:
+        """提交一条日志。crud_cls 为对应的 CRUD 类（如 OperationLogCRUD），data 为其新增 Schema。"""
+        row = data.model_dump(exclude_none=True)
+        queue = self._queue
+        if queue is None or not self.running:
+            await self._insert(crud_cls, [row])
+            return
+        item = (crud_cls, row)
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(queue.put(item), settings.LOG_WRITER_PUT_TIMEOUT_MS / 1000)
+            except TimeoutError:
+                self.counters["dropped"] += 1
+                if self.counters["dropped"] % _DROP_WARN_EVERY == 1:
+                    logger.warning("日志写入队列已满，已累计丢弃 {} 条", self.counters["dropped"])
+                return
+        self.counters["enqueued"] += 1
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.LOG_WRITER_FLUSH_INTERVAL_MS / 1000
+        batch_size = settings.LOG_WRITER_BATCH_SIZE
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + interval
+            while len(batch) < batch_size:
+                # 先取已在队列里的，队列空了再等到截止时间
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[type, dict[str, Any]]]) -> None:
+        from app.core.base_schema import AuthSchema
+        from app.core.database import async_db_session
+
+        groups: dict[type, list[dict[str, Any]]] = defaultdict(list)
+        for crud_cls, row in batch:
+            groups[crud_cls].append(row)
+        try:
+            async with async_db_session() as session, session.begin():
+                for crud_cls, rows in groups.items():
+                    await crud_cls(AuthSchema(), session).create_many(rows, batch_size=settings.LOG_WRITER_BATCH_SIZE)
+            self.counters["written"] += len(batch)
+            self.counters["batches"] += 1
+        except Exception:
+            logger.exception("批量写入日志失败，改为逐条写入: {} 条", len(batch))
+            for crud_cls, row in batch:
+                await self._insert(crud_cls, [row])
+
+    async def _insert(self, crud_cls: type, rows: list[dict[str, Any]]) -> None:
+        """单独一个事务写入，失败只记日志。"""
+        from app.core.base_schema import AuthSchema
+        from app.core.database import async_db_session
+
+        try:
+            async with async_db_session() as session, session.begin():
+                await crud_cls(AuthSchema(), session).create_many(rows)
+            self.counters["written"] += len(rows)
+        except Exception:
+            self.counters["failed"] += len(rows)
+            logger.exception("日志写入失败: {}", crud_cls.__name__)
+
+
+log_writer = LogBatchWriter()
@@ -0,0 +1,248 @@
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import case, delete, false, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import logger
+from app.core.redis_crud import RedisCURD
+
+# 当日计数键的有效期：跨过零点后不再写入，过期前汇总任务早已把当天落表
+_COUNTER_TTL = 2 * 86400
+
+# 汇总表与当日计数共有的指标：unique_users 只计成功登录（趋势），login_users 含失败登录（今日独立用户）
+STAT_FIELDS = ("login_count", "success_count", "fail_count", "unique_users", "login_users", "new_users")
+
+# 进程内"今天已记过的活跃用户"上限，超过后清空重来（只多几次幂等的 PFADD）
+_ACTIVE_SEEN_MAXSIZE = 100_000
+
+
+def stat_today() -> date:
+    """统计日期按 UTC 划分，与 created_time 的存储及汇总时的 DATE(created_time) 一致。
+
+    （改写前"今天"取服务器本地日期的零点，与按 DATE(created_time) 分组的趋势在非 UTC 时区下对不上）
+    """
+    return datetime.now(UTC).date()
+
+
+def _counter_key(day: date) -> str:
+    return f"{RedisInitKeyConfig.LOGIN_DAILY_COUNTER.key}:{day.isoformat()}"
+
+
+def _users_key(day: date) -> str:
+    return f"{RedisInitKeyConfig.LOGIN_DAILY_USERS.key}:{day.isoformat()}"
+
+
+def _login_users_key(day: date) -> str:
+    return f"{RedisInitKeyConfig.LOGIN_DAILY_LOGIN_USERS.key}:{day.isoformat()}"
+
+
+async def record_logins(logins: Iterable[tuple[str, bool]]) -> None:
+    """登录日志提交后累加当日计数（一次 pipeline）：登录/成功/失败次数，用户名进当日 HyperLogLog（成功登录、全部登录各一个）。
+
+    参数:
+    - logins (Iterable[tuple[str, bool]]): (用户名, 是否成功) 列表，由 LoginLogCRUD 在写入事务提交后传入，
+      被写入器丢弃或写入失败的日志不计入。
+    """
+    from app.core.database import redis_client
+
+    logins = list(logins)
+    if redis_client is None or not logins:
+        return
+    day = stat_today()
+    counter_key, users_key, login_users_key = _counter_key(day), _users_key(day), _login_users_key(day)
+    usernames = [username for username, success in logins if success]
+    async with RedisCURD(redis_client).pipeline() as pipe:
+        pipe.hincrby(counter_key, "login_count", len(logins))
+        if usernames:
+            pipe.hincrby(counter_key, "success_count", len(usernames))
+        if len(usernames) < len(logins):
+            pipe.hincrby(counter_key, "fail_count", len(logins) - len(usernames))
+        pipe.expire(counter_key, _COUNTER_TTL)
+        if usernames:
+            pipe.pfadd(users_key, *usernames)
+            pipe.expire(users_key, _COUNTER_TTL)
+        pipe.pfadd(login_users_key, *(username for username, _ in logins))
+        pipe.expire(login_users_key, _COUNTER_TTL)
+
+
+async def record_new_users(count: int) -> None:
+    """新增用户的事务提交后累加当日新增数。"""
+    from app.core.database import redis_client
+
+    if redis_client is None or count <= 0:
+        return
+    counter_key = _counter_key(stat_today())
+    async with RedisCURD(redis_client).pipeline() as pipe:
+        pipe.hincrby(counter_key, "new_users", count)
+        pipe.expire(counter_key, _COUNTER_TTL)
+
+
+async def get_today_counters(redis: Redis) -> dict[str, int]:
+    """读取当日 Redis 计数；键不存在或读取失败时各项为 0。"""
+    day = stat_today()
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(_counter_key(day))
+            pipe.pfcount(_users_key(day))
+            pipe.pfcount(_login_users_key(day))
+            counters, unique_users, login_users = await pipe.execute()
+        result = {field: int(counters.get(field) or 0) for field in STAT_FIELDS}
+        result["unique_users"] = int(unique_users or 0)
+        result["login_users"] = int(login_users or 0)
+        return result
+    except Exception as e:
+        logger.error(f"读取当日登录计数失败: {e!s}")
+        return dict.fromkeys(STAT_FIELDS, 0)
+
+
+class ActiveUsers:
+    """活跃用户去重计数：每天一个 HyperLogLog 键 active_users:<日期>，成员为用户 ID。
+
+    每个键固定约 12KB，与用户数无关；DAU/WAU/MAU 及任意区间由多键 PFCOUNT 在服务端求并集，标准误差约 0.81%。
+    登录（create_token 的 pipeline）与每次认证都会记录；认证路径先查进程内的当日已记集合，
+    同一用户当天在本进程只发一次 PFADD，认证缓存命中时也不产生 Redis 往返。
+    """
+
+    _seen_day: date | None = None
+    _seen: set[int] = set()
+
+    @classmethod
+    def add(cls, pipe: Pipeline, user_id: int) -> None:
+        """排进调用方的 pipeline（登录时与会话一起写入）。"""
+        key = cls.key(stat_today())
+        pipe.pfadd(key, user_id)
+        pipe.expire(key, settings.ACTIVE_USERS_RETENTION_DAYS * 86400)
+        cls._mark_seen(user_id)
+
+    @classmethod
+    async def touch(cls, user_id: int) -> None:
+        """认证通过后调用；本进程当天已记过则直接返回。"""
+        from app.core.database import redis_client
+
+        if redis_client is None or not cls._mark_seen(user_id):
+            return
+        async with RedisCURD(redis_client).pipeline() as pipe:
+            cls.add(pipe, user_id)
+
+    @classmethod
+    async def count(cls, redis: Redis, start: date, end: date) -> int:
+        """[start, end] 区间内的去重活跃用户数。"""
+        days = (end - start).days + 1
+        return await RedisCURD(redis).pfcount(*(cls.key(start + timedelta(days=offset)) for offset in range(days)))
+
+    @classmethod
+    async def summary(cls, redis: Redis) -> dict[str, int]:
+        """截至今天的 DAU / WAU（近 7 天）/ MAU（近 30 天），三次 PFCOUNT 同一次往返。"""
+        today = stat_today()
+        windows = {"dau": 1, "wau": 7, "mau": 30}
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for days in windows.values():
+                    pipe.pfcount(*(cls.key(today - timedelta(days=offset)) for offset in range(days)))
+                counts = await pipe.execute()
+            return {name: int(count or 0) for name, count in zip(windows, counts, strict=True)}
+        except Exception as e:
+            logger.error(f"统计活跃用户失败: {e!s}")
+            return dict.fromkeys(windows, 0)
+
+    @staticmethod
+    def key(day: date) -> str:
+        return f"{RedisInitKeyConfig.ACTIVE_USERS.key}:{day.isoformat()}"
+
+    @classmethod
+    def _mark_seen(cls, user_id: int) -> bool:
+        """记入进程内当日集合，返回是否为今天首次。"""
+        today = stat_today()
+        if cls._seen_day != today or len(cls._seen) >= _ACTIVE_SEEN_MAXSIZE:
+            cls._seen_day, cls._seen = today, set()
+        if user_id in cls._seen:
+            return False
+        cls._seen.add(user_id)
+        return True
+
+
+async def get_daily_stats(db: AsyncSession, start: date, end: date) -> dict[date, dict[str, int]]:
+    """读取汇总表 [start, end] 区间的日统计：{日期: {指标: 值}}，缺失的日期不在结果中。"""
+    from app.api.v1.module_system.log.model import LoginDailyStatModel
+
+    stmt = select(LoginDailyStatModel).where(LoginDailyStatModel.stat_date.between(start, end))
+    rows = (await db.execute(stmt)).scalars().all()
+    return {row.stat_date: {field: getattr(row, field) for field in STAT_FIELDS} for row in rows}
+
+
+async def rollup_login_stats() -> int:
+    """调度任务：把登录日志与新增用户按天汇总进 sys_login_daily_stat，返回本次写入的天数。
+
+    增量执行：只重算最近一个已汇总日（可能是不完整的当天）到今天的区间，正常情况下每次只扫当天的日志；
+    汇总表为空或停机多日时最多回溯 DASHBOARD_ROLLUP_BACKFILL_DAYS 天。按日期先删后插，可重复执行。
+    """
+    from app.api.v1.module_system.log.model import LoginDailyStatModel
+    from app.core.database import async_db_session
+
+    today = stat_today()
+    earliest = today - timedelta(days=settings.DASHBOARD_ROLLUP_BACKFILL_DAYS - 1)
+    async with async_db_session() as db, db.begin():
+        last = (await db.execute(select(func.max(LoginDailyStatModel.stat_date)))).scalar()
+        start = max(_as_date(last), earliest) if last else earliest
+        stats = await _aggregate(db, start)
+        rows = [
+            {"stat_date": start + timedelta(days=offset), **stats.get(start + timedelta(days=offset), dict.fromkeys(STAT_FIELDS, 0))}
+            for offset in range((today - start).days + 1)
+        ]
+        await db.execute(delete(LoginDailyStatModel).where(LoginDailyStatModel.stat_date >= start))
+        await db.execute(insert(LoginDailyStatModel), rows)
+    logger.info(f"登录日汇总完成: {start.isoformat()} ~ {today.isoformat()}，共 {len(rows)} 天")
+    return len(rows)
+
+
+async def _aggregate(db: AsyncSession, start: date) -> dict[date, dict[str, int]]:
+    """从 start 当天零点（UTC）起按天聚合登录日志与新增用户，两条 GROUP BY。"""
+    from app.api.v1.module_system.log.model import LoginLogModel
+    from app.api.v1.module_system.user.model import UserModel
+
+    since = datetime.combine(start, datetime.min.time())
+    login_day = func.date(LoginLogModel.created_time)
+    login_sql = (
+        select(
+            login_day.label("day"),
+            func.count().label("login_count"),
+            func.sum(case((LoginLogModel.status == 1, 1), else_=0)).label("success_count"),
+            func.count(func.distinct(case((LoginLogModel.status == 1, LoginLogModel.username)))).label("unique_users"),
+            func.count(func.distinct(LoginLogModel.username)).label("login_users"),
+        )
+        .where(LoginLogModel.is_deleted == false(), LoginLogModel.created_time >= since)
+        .group_by(login_day)
+    )
+    user_day = func.date(UserModel.created_time)
+    user_sql = (
+        select(user_day.label("day"), func.count().label("new_users"))
+        .where(UserModel.is_deleted == false(), UserModel.created_time >= since)
+        .group_by(user_day)
+    )
+
+    stats: dict[date, dict[str, int]] = {}
+    for row in (await db.execute(login_sql)).all():
+        login_count, success_count = int(row.login_count or 0), int(row.success_count or 0)
+        stats.setdefault(_as_date(row.day), dict.fromkeys(STAT_FIELDS, 0)).update(
+            login_count=login_count,
+            success_count=success_count,
+            fail_count=login_count - success_count,
+            unique_users=int(row.unique_users or 0),
+            login_users=int(row.login_users or 0),
+        )
+    for row in (await db.execute(user_sql)).all():
+        stats.setdefault(_as_date(row.day), dict.fromkeys(STAT_FIELDS, 0))["new_users"] = int(row.new_users or 0)
+    return stats
+
+
+def _as_date(value: Any) -> date:
+    # sqlite 的 DATE() 返回字符串，MySQL/PostgreSQL 返回 date
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
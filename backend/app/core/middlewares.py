@@ -1,21 +1,19 @@
-import json
 import uuid
-from typing import Any
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import IdentityResponder
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.requests import Request
-from starlette.responses import RedirectResponse, Response
-from starlette.types import ASGIApp
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.common.enums import RedisInitKeyConfig, SysParamKey
 from app.common.response import ErrorResponse
 from app.config.setting import settings
+from app.core.compression import EXCLUDED_CONTENT_TYPES, CompressionResponder, available_encodings, negotiate_encoding
 from app.core.exceptions import CustomException
 from app.core.logger import logger, reset_correlation_id, set_correlation_id
-from app.core.redis_crud import RedisCURD
+from app.core.request_guard import request_guard_snapshot
 from app.utils.ip_local_util import get_client_ip
 
 
@@ -33,23 +31,39 @@ class CustomCORSMiddleware(CORSMiddleware):
         )
 
 
-class RequestLogMiddleware(BaseHTTPMiddleware):
-    """演示模式 & IP黑名单拦截"""
+class RequestLogMiddleware:
+    """演示模式 & IP黑名单拦截（纯 ASGI 实现，不经过 BaseHTTPMiddleware 的任务与内存流，流式响应/后台任务语义不变）
+
+    黑白名单支持单个地址与 CIDR 网段（IPv4/IPv6），编译为前缀树匹配，见 app.core.request_guard。
+    """
 
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        request = Request(scope)
         client_ip = get_client_ip(request)
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
         try:
             path = request.url.path
-            config = await self._load_config(request)
-            is_blacklisted = bool(client_ip and client_ip in config[SysParamKey.IP_BLACK_LIST])
+            # 进程内配置快照，正常情况下不访问 Redis
+            config = await request_guard_snapshot.get(getattr(request.app.state, "redis", None))
+            is_blacklisted = config.ip_black_list.match(client_ip)
             in_demo = (
-                config.get(SysParamKey.DEMO_ENABLE, False)
+                config.demo_enable
                 and request.method != "GET"
-                and (client_ip is None or client_ip not in config.get(SysParamKey.IP_WHITE_LIST, ()))
+                and not config.ip_white_list.match(client_ip)
                 and not any(
                     path.startswith(item.rstrip("*")) if item.endswith("*") else path == item
                     for item in settings.WHITE_API_LIST_PATH
@@ -65,65 +79,57 @@ class RequestLogMiddleware(BaseHTTPMiddleware):
                     client_ip,
                     "IP黑名单" if is_blacklisted else "演示模式",
                 )
-                return ErrorResponse(msg="IP已被黑名单" if is_blacklisted else "演示环境，禁止操作")
+                response = ErrorResponse(msg="IP已被黑名单" if is_blacklisted else "演示环境，禁止操作")
+                await response(scope, receive, send)
+                return
 
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except CustomException as e:
+            # 响应已开始发送时无法再改写，交给外层处理
+            if response_started:
+                raise
             logger.exception(f"中间件异常: {e!s}")
-            return ErrorResponse(msg="系统异常，请联系管理员", data=str(e))
-
-    @staticmethod
-    async def _load_config(request: Request) -> dict:
-        """加载中间件配置，失败时返回全部默认值。"""
-        redis = getattr(request.app.state, "redis", None)
-        if not redis:
-            return {SysParamKey.DEMO_ENABLE: False, SysParamKey.IP_WHITE_LIST: (), SysParamKey.IP_BLACK_LIST: ()}
-        try:
-            config_keys = [
-                f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{SysParamKey.DEMO_ENABLE.value}",
-                f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{SysParamKey.IP_WHITE_LIST.value}",
-                f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{SysParamKey.IP_BLACK_LIST.value}",
-            ]
-            config_values = await RedisCURD(redis).mget(config_keys)
-            result: dict[str, Any] = {SysParamKey.DEMO_ENABLE: False, SysParamKey.IP_WHITE_LIST: (), SysParamKey.IP_BLACK_LIST: ()}
-            raw_demo, raw_white, raw_black = config_values
-            for raw, key in ((raw_demo, SysParamKey.DEMO_ENABLE), (raw_white, SysParamKey.IP_WHITE_LIST), (raw_black, SysParamKey.IP_BLACK_LIST)):
-                if not raw:
-                    continue
-                try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
-                    logger.error("解析系统配置 %s 失败", key)
-                    continue
-                if not isinstance(payload, dict) or payload.get("status", 0) != 0:
-                    continue
-                cv = payload.get("config_value")
-                if cv is None:
-                    continue
-                if key == SysParamKey.DEMO_ENABLE:
-                    result[key.value] = cv in (True, "true", "1", "yes", "on")
-                else:
-                    result[key.value] = json.loads(cv) if isinstance(cv, str) else cv
-            return result
-        except Exception:
-            return {SysParamKey.DEMO_ENABLE: False, SysParamKey.IP_WHITE_LIST: (), SysParamKey.IP_BLACK_LIST: ()}
-
-
-class CustomGZipMiddleware(GZipMiddleware):
-    """GZip 压缩中间件"""
+            await ErrorResponse(msg="系统异常，请联系管理员", data=str(e))(scope, receive, send)
+
+
+class CustomCompressionMiddleware:
+    """响应压缩中间件：按 Accept-Encoding 协商 zstd / br / gzip（前两者需安装可选依赖）。
+
+    级别按内容类型与大小分档（见 app.core.compression.LEVELS），xlsx、zip、图片等已压缩类型原样返回，
+    流式响应逐块增量压缩。客户端不接受任何可用编码时原样返回，仍追加 Vary: Accept-Encoding。
+    """
 
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app, minimum_size=settings.GZIP_MIN_SIZE, compresslevel=settings.GZIP_COMPRESS_LEVEL)
+        self.app = app
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""), self.encodings)
+        responder: ASGIApp
+        if encoding is None:
+            responder = IdentityResponder(self.app, settings.COMPRESS_MIN_SIZE, exclude_content_types=EXCLUDED_CONTENT_TYPES)
+        else:
+            responder = CompressionResponder(self.app, encoding)
+        await responder(scope, receive, send)
 
-class CustomHTTPSRedirectMiddleware(BaseHTTPMiddleware):
+
+class CustomHTTPSRedirectMiddleware:
     """HTTP → HTTPS 重定向中间件（信任前端代理的 X-Forwarded-Proto 头）"""
 
-    async def dispatch(self, request: Request, call_next):
-        if request.url.scheme != "https" and request.headers.get("X-Forwarded-Proto") != "https":
-            url = request.url.replace(scheme="https")
-            return RedirectResponse(url, status_code=301)
-        return await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope.get("scheme") != "https":
+            request = Request(scope)
+            if request.headers.get("X-Forwarded-Proto") != "https":
+                await RedirectResponse(request.url.replace(scheme="https"), status_code=301)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
 
 
 class CustomTrustedHostMiddleware(TrustedHostMiddleware):
@@ -133,20 +139,28 @@ class CustomTrustedHostMiddleware(TrustedHostMiddleware):
         super().__init__(app, allowed_hosts=settings.ALLOWED_HOSTS)
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    """请求 ID 中间件"""
+class CorrelationIdMiddleware:
+    """请求 ID 中间件：在响应头 http.response.start 消息上追加 X-Correlation-ID"""
+
+    header = "X-Correlation-ID"
 
     def __init__(self, app: ASGIApp) -> None:
-        self._header = "X-Correlation-ID"
-        super().__init__(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cid = Headers(scope=scope).get(self.header) or str(uuid.uuid4())
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[self.header] = cid
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        cid = request.headers.get(self._header) or str(uuid.uuid4())
         token = set_correlation_id(cid)
         try:
-            response = await call_next(request)
-            response.headers[self._header] = cid
-            return response
+            await self.app(scope, receive, send_wrapper)
         finally:
             reset_correlation_id(token)
-
@@ -0,0 +1,215 @@
+import dataclasses
+import types
+import typing
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Mapper, aliased, joinedload, selectinload
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.base_model import TreeMixin
+from app.core.exceptions import CustomException
+
+# 审计关系：查询时默认 joinedload，列表页展示创建人/更新人
+AUDIT_RELATIONSHIPS: tuple[str, ...] = ("created_by", "updated_by")
+
+
+@dataclasses.dataclass(eq=False)
+class Projection:
+    """out_schema → 列投影计划：直接列 + 多对一关系（审计人等）LEFT JOIN 出的列，行元组按位置组装 dict。
+
+    select 里 columns 在前，调用方追加的额外列（如 keyset 排序键）在后，to_dict 只取计划内的位置。
+    """
+
+    columns: tuple[Any, ...]
+    joins: tuple[Any, ...]
+    keys: tuple[str, ...]
+    nested: tuple[tuple[str, tuple[str, ...], int], ...]
+
+    def to_dict(self, row: Row | tuple) -> dict[str, Any]:
+        data = {key: row[i] for i, key in enumerate(self.keys)}
+        for field, subkeys, start in self.nested:
+            # 外连接未命中时主键为 NULL，整个嵌套对象置 None
+            data[field] = None if row[start] is None else {key: row[start + j] for j, key in enumerate(subkeys)}
+        return data
+
+
+@dataclasses.dataclass(eq=False)
+class ModelMeta:
+    """单个模型的映射元数据，mapper 配置完成后不再变化，按模型只构建一次。
+
+    CRUDBase 原先每次调用都 sa_inspect + hasattr 探测 + 遍历 relationships，
+    这里把结果和按 preload 组合解析出的 loader options 一并缓存。
+    """
+
+    model: type
+    pk: ColumnElement | None
+    pk_error: str | None
+    column_keys: frozenset[str]
+    attr_keys: frozenset[str]
+    soft_delete: bool
+    tree: bool
+    relationship_uselist: dict[str, bool]
+    relationship_models: dict[str, type]
+    audit_options: tuple[Any, ...]
+    _loader_cache: dict[tuple[str, ...], tuple[Any, ...]] = dataclasses.field(default_factory=dict, repr=False)
+    _projection_cache: dict[type[BaseModel] | None, Projection] = dataclasses.field(default_factory=dict, repr=False)
+
+    def has(self, attr: str) -> bool:
+        """等价于 hasattr(model, attr)，但只查集合。"""
+        return attr in self.attr_keys
+
+    def get_pk(self) -> ColumnElement:
+        if self.pk is None:
+            raise CustomException(msg=self.pk_error or "模型缺少主键")
+        return self.pk
+
+    def loader_options(self, preload: tuple[str, ...]) -> tuple[Any, ...]:
+        """preload 字符串组合 → loader options（含默认审计 joinedload），按组合缓存。
+
+        loader option 对象是不可变的，可跨查询复用。
+        """
+        options = self._loader_cache.get(preload)
+        if options is None:
+            options = self._build_loader_options(preload)
+            self._loader_cache[preload] = options
+        return options
+
+    def _build_loader_options(self, preload: tuple[str, ...]) -> tuple[Any, ...]:
+        options: list[Any] = []
+        processed_attrs: set[str] = set()
+
+        for path in preload:
+            if path in processed_attrs:
+                continue  # 跳过重复名称/完全相同的嵌套路径
+            processed_attrs.add(path)
+
+            current_meta: ModelMeta = self
+            current_option = None
+            for part in path.split("."):
+                uselist = current_meta.relationship_uselist.get(part)
+                if uselist is None:
+                    break  # 非模型属性或列属性，不支持 eager loading
+                attr = getattr(current_meta.model, part)
+                # 一对一/多对一用 joinedload（一条 SQL 完成），一对多/多对多用 selectinload（N+1 → 2 条 SQL）
+                loader = selectinload(attr) if uselist else joinedload(attr)
+                # 嵌套加载通过 .options() 链式组合
+                current_option = loader if current_option is None else current_option.options(loader)
+                current_meta = get_model_meta(current_meta.relationship_models[part])
+            if current_option is not None:
+                options.append(current_option)
+
+        options.extend(
+            opt for name, opt in zip(self._audit_names(), self.audit_options, strict=True) if name not in processed_attrs
+        )
+        return tuple(options)
+
+    def projection(self, out_schema: type[BaseModel] | None) -> Projection:
+        """按 out_schema 字段推导投影列，按 schema 缓存。
+
+        - 字段名是本模型列 → 直接选该列；
+        - 字段名是多对一关系、类型是 BaseModel（如 created_by: CommonSchema）→ LEFT JOIN 目标表，
+          只选子 schema 里存在的列，主键放第一位用于判断外连接是否命中；
+        - 其余字段（如 role_ids、dept_name）不在 SQL 里，由 schema 默认值或调用方补齐。
+
+        out_schema 为 None 时投影全部列。
+        """
+        plan = self._projection_cache.get(out_schema)
+        if plan is None:
+            plan = self._projection_cache[out_schema] = self._build_projection(out_schema)
+        return plan
+
+    def _build_projection(self, out_schema: type[BaseModel] | None) -> Projection:
+        if out_schema is None:
+            keys = tuple(sa_inspect(self.model).column_attrs.keys())
+            return Projection(columns=tuple(getattr(self.model, key) for key in keys), joins=(), keys=keys, nested=())
+
+        keys = tuple(name for name in out_schema.model_fields if name in self.column_keys)
+        columns: list[Any] = [getattr(self.model, key) for key in keys]
+        joins: list[Any] = []
+        nested: list[tuple[str, tuple[str, ...], int]] = []
+        for name, field in out_schema.model_fields.items():
+            sub_schema = _schema_of(field.annotation)
+            if sub_schema is None or self.relationship_uselist.get(name) is not False:
+                continue
+            target = get_model_meta(self.relationship_models[name])
+            target_pk = target.get_pk().key
+            subkeys = (target_pk, *(key for key in sub_schema.model_fields if key in target.column_keys and key != target_pk))
+            if any(key not in subkeys for key, info in sub_schema.model_fields.items() if info.is_required()):
+                continue  # 子 schema 必填字段不全是目标表的列，无法只靠投影构造
+            alias = aliased(target.model, name=f"{name}_rel")
+            nested.append((name, subkeys, len(columns)))
+            columns.extend(getattr(alias, key).label(f"{name}__{key}") for key in subkeys)
+            joins.append(getattr(self.model, name).of_type(alias))
+        return Projection(columns=tuple(columns), joins=tuple(joins), keys=keys, nested=tuple(nested))
+
+    def _audit_names(self) -> tuple[str, ...]:
+        return tuple(name for name in AUDIT_RELATIONSHIPS if name in self.relationship_uselist)
+
+
+_registry: dict[type, ModelMeta] = {}
+
+
+def _schema_of(annotation: Any) -> type[BaseModel] | None:
+    """从字段注解里取出 BaseModel 子类（兼容 X | None / Optional[X]）。"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if isinstance(annotation, types.UnionType) or typing.get_origin(annotation) is typing.Union:
+        schemas = [arg for arg in typing.get_args(annotation) if isinstance(arg, type) and issubclass(arg, BaseModel)]
+        return schemas[0] if len(schemas) == 1 else None
+    return None
+
+
+def _build_model_meta(model: type) -> ModelMeta:
+    mapper = sa_inspect(model)
+    pk_cols = list(mapper.primary_key)
+    pk: ColumnElement | None = None
+    pk_error: str | None = None
+    if not pk_cols:
+        pk_error = "模型缺少主键"
+    elif len(pk_cols) > 1:
+        pk_error = "暂不支持复合主键操作"
+    else:
+        pk = pk_cols[0]
+
+    relationships = mapper.relationships
+    relationship_uselist = {name: bool(prop.uselist) for name, prop in relationships.items()}
+    relationship_models = {name: prop.mapper.class_ for name, prop in relationships.items()}
+    attr_keys = frozenset(name for name in dir(model) if not name.startswith("__"))
+    audit_options = tuple(
+        joinedload(getattr(model, name)) for name in AUDIT_RELATIONSHIPS if name in relationship_uselist
+    )
+
+    return ModelMeta(
+        model=model,
+        pk=pk,
+        pk_error=pk_error,
+        column_keys=frozenset(mapper.column_attrs.keys()),
+        attr_keys=attr_keys,
+        soft_delete=all(name in attr_keys for name in ("is_deleted", "deleted_time", "deleted_id")),
+        tree=issubclass(model, TreeMixin),
+        relationship_uselist=relationship_uselist,
+        relationship_models=relationship_models,
+        audit_options=audit_options,
+    )
+
+
+def get_model_meta(model: type) -> ModelMeta:
+    """取模型元数据。通常已在 mapper 配置完成时注册，未注册（如运行期新增的模型）则此处补建。"""
+    meta = _registry.get(model)
+    if meta is None:
+        meta = _registry[model] = _build_model_meta(model)
+    return meta
+
+
+@event.listens_for(Mapper, "after_configured")
+def _register_configured_models() -> None:
+    """所有 mapper 配置完成后批量注册；插件晚加载触发再次配置时只补建新模型。"""
+    from app.core.base_model import MappedBase
+
+    for mapper in MappedBase.registry.mappers:
+        if mapper.class_ not in _registry:
+            _registry[mapper.class_] = _build_model_meta(mapper.class_)
@@ -1,11 +1,14 @@
+import json
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.elements import ColumnElement
 
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
 from app.core.base_schema import AuthSchema
-from app.utils.common_util import get_child_id_map, get_child_recursion
+from app.core.redis_crud import RedisCURD
 
 
 class Permission:
@@ -35,40 +38,42 @@ class Permission:
         return await self._filter_by_data_scope()
 
     async def _filter_by_data_scope(self) -> ColumnElement | None:
-        from app.api.v1.module_system.role.model import RoleModel
         from app.api.v1.module_system.user.model import UserModel
 
         if not hasattr(self.model, "created_id"):
             return None
 
-        stmt = select(RoleModel).join(
-            RoleModel.users
-        ).where(UserModel.id == self.auth.user.id)
-        result = await self.db.execute(stmt)
-        roles = result.scalars().all()
+        data_scopes, accessible_dept_ids = await self._resolve_data_scope()
 
-        if not roles:
+        if not data_scopes:
             created_id_attr = getattr(self.model, "created_id", None)
             if created_id_attr is not None and self.auth.user and self.auth.user.id:
                 return created_id_attr == self.auth.user.id
             return None
 
-        data_scopes = {role.data_scope for role in roles}
-
         if self.DATA_SCOPE_ALL in data_scopes:
             return None
 
-        accessible_dept_ids = await self._get_accessible_dept_ids(data_scopes)
-
         if accessible_dept_ids:
             if self.model.__name__ == "UserModel" and hasattr(self.model, "dept_id"):
                 dept_id_attr = getattr(self.model, "dept_id", None)
                 if dept_id_attr is not None:
                     return dept_id_attr.in_(list(accessible_dept_ids))
 
+            dept_ids = list(accessible_dept_ids)
             creator_rel = getattr(self.model, "created_by", None)
-            if creator_rel is not None and hasattr(UserModel, "dept_id"):
-                return creator_rel.has(UserModel.dept_id.in_(list(accessible_dept_ids)))
+            creator_condition = creator_rel.has(UserModel.dept_id.in_(dept_ids)) if creator_rel is not None and hasattr(UserModel, "dept_id") else None
+
+            # 冗余的创建人部门列：普通索引 IN，不再逐行 EXISTS 关联 sys_user；
+            # 未回填（为空）的历史行退回按创建人当前部门判断，避免迁移前后这些行对部门权限用户不可见
+            created_dept_attr = getattr(self.model, "created_dept_id", None)
+            if created_dept_attr is not None:
+                if creator_condition is None:
+                    return created_dept_attr.in_(dept_ids)
+                return or_(created_dept_attr.in_(dept_ids), and_(created_dept_attr.is_(None), creator_condition))
+
+            if creator_condition is not None:
+                return creator_condition
 
             created_id_attr = getattr(self.model, "created_id", None)
             if created_id_attr is not None and self.auth.user and self.auth.user.id:
@@ -90,21 +95,79 @@ class Permission:
             return created_id_attr == self.auth.user.id
         return None
 
+    async def _resolve_data_scope(self) -> tuple[frozenset, frozenset[int]]:
+        """解析当前用户的数据权限输入：(角色数据范围集合, 可访问部门ID集合)。
+
+        与模型无关，一次请求里 get/count/page 多次构造条件时复用：
+        先查请求级缓存（挂在 AuthSchema 上），再查 Redis（按用户 + 部门 + 全局版本号），都未命中才查库。
+        角色/部门经 CRUD 写入时版本号递增（bump_data_scope_version），旧缓存自然失效。
+        """
+        cached = self.auth._data_scope
+        if cached is not None:
+            return cached
+
+        from app.core.database import redis_client
+
+        user_id = self.auth.user.id
+        dept_id = getattr(self.auth.user, "dept_id", None)
+        redis = RedisCURD(redis_client) if redis_client is not None else None
+        cache_key = f"{RedisInitKeyConfig.DATA_SCOPE_CACHE.key}:{user_id}"
+
+        version = "0"
+        if redis is not None:
+            raw_version, raw = await redis.mget([RedisInitKeyConfig.DATA_SCOPE_VERSION.key, cache_key]) or [None, None]
+            version = str(raw_version or 0)
+            if raw:
+                data = json.loads(raw)
+                if data.get("version") == version and data.get("dept_id") == dept_id:
+                    cached = (frozenset(data["scopes"]), frozenset(data["dept_ids"]))
+
+        if cached is None:
+            cached = await self._load_data_scope()
+            if redis is not None:
+                payload = {"version": version, "dept_id": dept_id, "scopes": list(cached[0]), "dept_ids": list(cached[1])}
+                await redis.set(cache_key, json.dumps(payload), expire=settings.DATA_SCOPE_CACHE_TTL)
+
+        self.auth._data_scope = cached
+        return cached
+
+    async def _load_data_scope(self) -> tuple[frozenset, frozenset[int]]:
+        from app.api.v1.module_system.role.model import RoleModel
+        from app.api.v1.module_system.user.model import UserModel
+
+        stmt = select(RoleModel.data_scope).join(RoleModel.users).where(UserModel.id == self.auth.user.id)
+        result = await self.db.execute(stmt)
+        data_scopes = frozenset(result.scalars().all())
+
+        if not data_scopes or self.DATA_SCOPE_ALL in data_scopes:
+            return data_scopes, frozenset()
+        return data_scopes, frozenset(await self._get_accessible_dept_ids(set(data_scopes)))
+
     async def _get_accessible_dept_ids(self, data_scopes: set) -> set[int]:
         accessible_dept_ids = set()
         user_dept_id = getattr(self.auth.user, "dept_id", None)
 
         if self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes and user_dept_id is not None:
-            try:
-                from app.api.v1.module_system.dept.model import DeptModel
+            from app.api.v1.module_system.dept.model import DeptModel
 
-                dept_sql = select(DeptModel)
+            # 本部门及以下：先取本部门路径，再按物化路径前缀匹配。
+            # 整个模式作为常量绑定（LIKE '/1/5/%'），tree_path 索引可用；路径只含数字与分隔符，无需转义
+            user_dept_path = (await self.db.execute(select(DeptModel.tree_path).where(DeptModel.id == user_dept_id))).scalar()
+            if user_dept_path:
+                dept_sql = select(DeptModel.id).where(DeptModel.tree_path.like(f"{user_dept_path}%"))
                 dept_result = await self.db.execute(dept_sql)
-                dept_objs = dept_result.scalars().all()
-                id_map = get_child_id_map(dept_objs)
-                dept_with_children_ids = get_child_recursion(id=user_dept_id, id_map=id_map)
-                accessible_dept_ids.update(dept_with_children_ids)
-            except Exception:
-                accessible_dept_ids.add(user_dept_id)
+                accessible_dept_ids.update(dept_result.scalars().all())
+            accessible_dept_ids.add(user_dept_id)
 
         return accessible_dept_ids
+
+
+async def bump_data_scope_version() -> None:
+    """角色、部门或用户角色关联变更后调用：递增全局版本号，所有用户的数据权限缓存随之失效。
+
+    须在事务提交后执行（CRUD 中经 _after_commit 登记）：提交前递增，并发请求会按旧数据重建缓存并带上新版本号。
+    """
+    from app.core.database import redis_client
+
+    if redis_client is not None:
+        await RedisCURD(redis_client).incr(RedisInitKeyConfig.DATA_SCOPE_VERSION.key)
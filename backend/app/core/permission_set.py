@@ -0,0 +1,215 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.redis_crud import RedisCURD
+from app.core.session_index import SessionIndex
+
+PERMISSION_SEP = ":"
+PERMISSION_WILDCARD = "*"
+
+# 进程内最多缓存的角色组合数（按 LRU 淘汰），角色组合数通常远小于用户数
+_LOCAL_MAXSIZE = 1024
+
+
+class PermissionTrie:
+    """权限标识前缀树，按 ":" 分段。
+
+    授权中的 "*" 段匹配任意一段；位于末尾时匹配其后的全部段，
+    如 "module_system:user:*" 覆盖 "module_system:user:query"，"module_system:*" 覆盖整个模块。
+    查找按段逐层下探，复杂度与标识段数成正比，与授权条数无关。
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, codes: Iterable[str] = ()) -> None:
+        self._root: dict[str | None, Any] = {}
+        for code in codes:
+            self.add(code)
+
+    def add(self, code: str) -> None:
+        node = self._root
+        for part in code.split(PERMISSION_SEP):
+            node = node.setdefault(part, {})
+        node[None] = True  # 终止标记
+
+    def match(self, code: str) -> bool:
+        return self._match(self._root, code.split(PERMISSION_SEP), 0)
+
+    def _match(self, node: dict[str | None, Any], parts: list[str], index: int) -> bool:
+        if index == len(parts):
+            return None in node
+        wildcard = node.get(PERMISSION_WILDCARD)
+        if wildcard is not None and (None in wildcard or self._match(wildcard, parts, index + 1)):
+            return True
+        child = node.get(parts[index])
+        return child is not None and self._match(child, parts, index + 1)
+
+
+@dataclass(frozen=True, eq=False)
+class PermissionSet:
+    """一个角色组合编译后的权限：权限标识、菜单 ID 与前缀树。对象只读，在请求间共享。"""
+
+    permissions: list[str]
+    menu_ids: list[int]
+    trie: PermissionTrie = field(repr=False)
+
+    @classmethod
+    def build(cls, permissions: Iterable[str], menu_ids: Iterable[int]) -> "PermissionSet":
+        permissions = sorted(set(permissions))
+        return cls(permissions=permissions, menu_ids=sorted(set(menu_ids)), trie=PermissionTrie(permissions))
+
+    def allows(self, required: Iterable[str]) -> bool:
+        """满足任意一个所需权限即通过。"""
+        return any(self.trie.match(code) for code in required)
+
+
+EMPTY_PERMISSION_SET = PermissionSet.build((), ())
+
+# 进程内缓存：角色组合 → (过期时刻, 权限集合)。角色/菜单变更提交后随认证缓存的失效广播整体清空，
+# 与认证缓存同一 TTL 兜底广播丢失的情况，过期后回到 Redis 按版本号校验
+_local_cache: OrderedDict[str, tuple[float, PermissionSet]] = OrderedDict()
+
+
+def role_set_hash(role_ids: Iterable[int]) -> str:
+    """角色组合的稳定标识：排序去重后的角色 ID 取摘要，相同角色组合的会话共享同一份权限数据。无角色时为空串。"""
+    role_ids = sorted(set(role_ids))
+    if not role_ids:
+        return ""
+    return hashlib.sha1(",".join(str(role_id) for role_id in role_ids).encode()).hexdigest()[:20]
+
+
+def clear_local_permission_sets() -> None:
+    """清空进程内缓存（随认证缓存的全量失效一起执行）。"""
+    _local_cache.clear()
+
+
+async def get_permission_set(db: AsyncSession, role_set: str, user_id: int) -> PermissionSet:
+    """按会话引用的角色组合取编译好的权限集合。
+
+    权限数据按角色组合只存一份：Redis 键 permission_set:<role_set>，内容为 {version, role_ids, permissions, menu_ids}，
+    会话里只保存 role_set。查找顺序：
+    - 进程内 LRU（短 TTL）；
+    - Redis 共享数据（与全局版本号一起 mget）：版本一致直接用，版本落后则按其中的 role_ids 重新编译并覆盖，
+      角色/菜单变更后每个角色组合只重算一次，所有会话立即看到新权限；
+    - 共享数据不存在（过期/被淘汰）时按用户当前角色查库重建。
+    """
+    if not role_set:
+        return EMPTY_PERMISSION_SET
+
+    entry = _local_cache.get(role_set)
+    if entry is not None:
+        if entry[0] > time.monotonic():
+            _local_cache.move_to_end(role_set)
+            return entry[1]
+        del _local_cache[role_set]
+    permission_set: PermissionSet | None = None
+
+    from app.core.database import redis_client
+
+    redis = RedisCURD(redis_client) if redis_client is not None else None
+    version = "0"
+    role_ids: list[int] | None = None
+    if redis is not None:
+        raw_version, raw = await redis.mget([RedisInitKeyConfig.PERMISSION_SET_VERSION.key, _blob_key(role_set)]) or [None, None]
+        version = str(raw_version or 0)
+        if raw:
+            data = json.loads(raw)
+            role_ids = data.get("role_ids")
+            if role_ids is not None and data.get("version") == version:
+                permission_set = PermissionSet.build(data["permissions"], data["menu_ids"])
+
+    if permission_set is None:
+        if role_ids is None:
+            role_ids = await _load_user_role_ids(db, user_id)
+            role_set = role_set_hash(role_ids)
+        permission_set = await _load_permission_set(db, role_ids) if role_ids else EMPTY_PERMISSION_SET
+        if redis is not None and role_set:
+            payload = {
+                "version": version,
+                "role_ids": sorted(set(role_ids)),
+                "permissions": permission_set.permissions,
+                "menu_ids": permission_set.menu_ids,
+            }
+            await redis.set(_blob_key(role_set), json.dumps(payload), expire=settings.PERMISSION_SET_CACHE_TTL)
+
+    if role_set and settings.AUTH_CACHE_TTL > 0:
+        _local_cache[role_set] = (time.monotonic() + settings.AUTH_CACHE_TTL, permission_set)
+        while len(_local_cache) > _LOCAL_MAXSIZE:
+            _local_cache.popitem(last=False)
+    return permission_set
+
+
+def _blob_key(role_set: str) -> str:
+    return f"{RedisInitKeyConfig.PERMISSION_SET.key}:{role_set}"
+
+
+async def _load_user_role_ids(db: AsyncSession, user_id: int) -> list[int]:
+    from app.api.v1.module_system.user.model import UserRolesModel
+
+    result = await db.execute(select(UserRolesModel.role_id).where(UserRolesModel.user_id == user_id))
+    return list(result.scalars().all())
+
+
+async def _load_permission_set(db: AsyncSession, role_ids: list[int]) -> PermissionSet:
+    """一条 SQL 取角色组合中启用角色下全部启用菜单的 (id, 权限标识)。
+
+    角色启用状态在这里过滤而不是登录时：停用/启用角色只需递增版本号，已登录会话的角色组合不变。
+    """
+    from app.api.v1.module_system.menu.model import MenuModel
+    from app.api.v1.module_system.role.model import RoleMenusModel, RoleModel
+
+    stmt = (
+        select(MenuModel.id, MenuModel.permission)
+        .join(RoleMenusModel, RoleMenusModel.menu_id == MenuModel.id)
+        .join(RoleModel, RoleModel.id == RoleMenusModel.role_id)
+        .where(RoleMenusModel.role_id.in_(role_ids), RoleModel.status == 0, MenuModel.status == 0)
+        .distinct()
+    )
+    rows = (await db.execute(stmt)).all()
+    return PermissionSet.build((permission for _, permission in rows if permission), (menu_id for menu_id, _ in rows))
+
+
+async def repoint_user_sessions(role_sets: dict[int, str]) -> int:
+    """用户角色调整后，把其在线会话引用的角色组合改为新值（保留会话剩余 TTL），返回改写的会话数。
+
+    参数:
+    - role_sets (dict[int, str]): {用户ID: 新的角色组合标识}
+    """
+    from app.core.database import redis_client
+
+    if redis_client is None or not role_sets:
+        return 0
+    redis = RedisCURD(redis_client)
+    updated = 0
+    for user_id, role_set in role_sets.items():
+        # 按用户会话索引只读该用户的会话
+        sessions = await SessionIndex(redis_client).by_user(user_id)
+        async with redis.pipeline() as pipe:
+            for session in sessions:
+                if session.get("role_set") == role_set:
+                    continue
+                session["role_set"] = role_set
+                pipe.set(f"{RedisInitKeyConfig.USER_SESSION.key}:{session['session_id']}", json.dumps(session, default=str), keepttl=True)
+                updated += 1
+    return updated
+
+
+async def bump_permission_version() -> None:
+    """角色/菜单变更后递增权限版本号，使 Redis 中所有角色组合的编译结果失效。
+
+    须在事务提交后执行（CRUD 中经 _after_commit 登记）：提交前递增，并发请求会按旧数据编译并以新版本号写回 Redis。
+    """
+    from app.core.database import redis_client
+
+    if redis_client is not None:
+        await RedisCURD(redis_client).incr(RedisInitKeyConfig.PERMISSION_SET_VERSION.key)
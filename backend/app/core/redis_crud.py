@@ -1,10 +1,80 @@
+import hashlib
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
 from typing import Any
 
-from redis.asyncio.client import Redis
+from redis.asyncio.client import Pipeline, Redis
+from redis.exceptions import NoScriptError
 
 from app.core.logger import logger
 
 
+class RedisScript:
+    """Lua 脚本：SHA1 在本地按源码算好，调用走 EVALSHA，只在 Redis 未缓存时（NOSCRIPT）加载一次源码。"""
+
+    def __init__(self, name: str, source: str) -> None:
+        self.name = name
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+
+# 校验锁值后删除
+UNLOCK_SCRIPT = RedisScript(
+    "unlock",
+    """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    else
+        return 0
+    end
+    """,
+)
+
+# 校验锁值后续约
+RENEW_LOCK_SCRIPT = RedisScript(
+    "renew_lock",
+    """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('expire', KEYS[1], ARGV[2])
+    else
+        return 0
+    end
+    """,
+)
+
+# 读取会话并滑动续期：KEYS = [会话, 访问令牌, 刷新令牌]，ARGV = [访问令牌有效期, 刷新令牌有效期]
+# 访问令牌剩余 TTL 不足一半时把两个令牌的 TTL 重置为满额；会话不存在返回 nil
+SESSION_TOUCH_SCRIPT = RedisScript(
+    "session_touch",
+    """
+    local session = redis.call('get', KEYS[1])
+    if not session then
+        return nil
+    end
+    local access_expire = tonumber(ARGV[1])
+    local ttl = redis.call('ttl', KEYS[2])
+    if ttl > 0 and ttl < math.floor(access_expire / 2) then
+        redis.call('expire', KEYS[2], access_expire)
+        redis.call('expire', KEYS[3], ARGV[2])
+    end
+    return session
+    """,
+)
+
+# 计数器存在时才增减（未初始化的计数器不凭空创建，留给读取方按库重算）；键不存在返回 nil
+INCR_IF_EXISTS_SCRIPT = RedisScript(
+    "incr_if_exists",
+    """
+    if redis.call('exists', KEYS[1]) == 1 then
+        return redis.call('incrby', KEYS[1], ARGV[1])
+    end
+    return nil
+    """,
+)
+
+REDIS_SCRIPTS: tuple[RedisScript, ...] = (UNLOCK_SCRIPT, RENEW_LOCK_SCRIPT, SESSION_TOUCH_SCRIPT, INCR_IF_EXISTS_SCRIPT)
+
+
 class RedisCURD:
     """缓存工具类"""
 
@@ -105,6 +175,110 @@ class RedisCURD:
             logger.error(f"设置缓存失败: {e!s}")
             return False
 
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False, raise_on_error: bool = False) -> AsyncIterator[Pipeline]:
+        """pipeline 上下文：块内排队的命令在退出时一次发送；transaction=True 时以 MULTI/EXEC 包裹
+
+        用法::
+
+            async with RedisCURD(redis).pipeline() as pipe:
+                pipe.expire(key_a, 60)
+                pipe.delete(key_b)
+
+        块内抛出异常时不发送任何命令。执行失败默认只记录日志（与其他方法一致，不向上抛出）；
+        写入失败会让调用方结果失效时（如登录写会话）传 raise_on_error=True，记录日志后原样抛出。
+        需要命令返回值时直接使用 redis.pipeline()。
+        """
+        async with self.redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            try:
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"执行 pipeline 失败: {e!s}")
+                if raise_on_error:
+                    raise
+
+    async def mset_with_ttl(self, items: dict[str, tuple[Any, int | None]], raise_on_error: bool = False, pipe: Pipeline | None = None) -> None:
+        """批量设置缓存，每个键各自带过期时间，一次往返写入
+
+        参数:
+        - items (dict[str, tuple[Any, int | None]]): {键名: (缓存值, 过期秒数)}，过期秒数为空表示不过期
+        - raise_on_error (bool): 同 pipeline()
+        - pipe (Pipeline | None): 传入时只排进调用方的 pipeline，随其一起发送（可与其他命令合并为一次往返）
+        """
+        if pipe is not None:
+            for key, (value, expire) in items.items():
+                pipe.set(name=key, value=value, ex=expire or None)
+            return
+        if not items:
+            return
+        async with self.pipeline(raise_on_error=raise_on_error) as own:
+            await self.mset_with_ttl(items, pipe=own)
+
+    async def multi_delete(self, keys: Iterable[str], chunk_size: int = 500, raise_on_error: bool = False, pipe: Pipeline | None = None) -> None:
+        """批量删除缓存（UNLINK，按 chunk_size 分组，一次往返）
+
+        参数:
+        - keys (Iterable[str]): 键名
+        - chunk_size (int): 单条 UNLINK 的最大键数
+        - raise_on_error (bool): 同 pipeline()
+        - pipe (Pipeline | None): 传入时只排进调用方的 pipeline，随其一起发送
+        """
+        if pipe is not None:
+            batch: list[str] = []
+            for key in keys:
+                batch.append(key)
+                if len(batch) >= chunk_size:
+                    pipe.unlink(*batch)
+                    batch = []
+            if batch:
+                pipe.unlink(*batch)
+            return
+        keys = list(keys)
+        if not keys:
+            return
+        async with self.pipeline(raise_on_error=raise_on_error) as own:
+            await self.multi_delete(keys, chunk_size=chunk_size, pipe=own)
+
+    async def run_script(self, script: RedisScript, keys: list[str], args: list[Any] | None = None) -> Any:
+        """执行 Lua 脚本（EVALSHA）
+
+        参数:
+        - script (RedisScript): 脚本
+        - keys (list[str]): KEYS 参数
+        - args (list[Any] | None): ARGV 参数
+
+        返回:
+        - Any: 脚本返回值,失败返回None
+        """
+        try:
+            return await self._evalsha(script, keys, args or [])
+        except Exception as e:
+            logger.error(f"执行 Lua 脚本失败: script={script.name}, err={e!s}")
+            return None
+
+    async def load_scripts(self, scripts: Iterable[RedisScript] = REDIS_SCRIPTS) -> bool:
+        """预加载脚本（SCRIPT LOAD），启动时调用，省去首次调用时的 NOSCRIPT 重试
+
+        返回:
+        - bool: 如果全部加载成功则返回True,否则返回False
+        """
+        try:
+            for script in scripts:
+                await self.redis.script_load(script.source)
+            return True
+        except Exception as e:
+            logger.error(f"预加载 Lua 脚本失败: {e!s}")
+            return False
+
+    async def _evalsha(self, script: RedisScript, keys: list[str], args: list[Any]) -> Any:
+        try:
+            return await self.redis.evalsha(script.sha, len(keys), *keys, *args)  # pyright: ignore[reportGeneralTypeIssues]
+        except NoScriptError:
+            # Redis 重启或 SCRIPT FLUSH 后脚本缓存丢失，重新加载一次
+            await self.redis.script_load(script.source)
+            return await self.redis.evalsha(script.sha, len(keys), *keys, *args)  # pyright: ignore[reportGeneralTypeIssues]
+
     async def lock(self, key: str, expire: int, value: str | None = None) -> tuple[bool, str]:
         """获取分布式锁
 
@@ -145,14 +319,7 @@ class RedisCURD:
         """
         try:
             # 使用Lua脚本确保原子性验证和删除
-            script = """
-            if redis.call('get', KEYS[1]) == ARGV[1] then
-                return redis.call('del', KEYS[1])
-            else
-                return 0
-            end
-            """
-            result = await self.redis.eval(script, 1, key, value)  # pyright: ignore[reportGeneralTypeIssues]
+            result = await self._evalsha(UNLOCK_SCRIPT, [key], [value])
             return result == 1
         except Exception as e:
             logger.error(f"释放分布式锁失败: {e!s}")
@@ -251,19 +418,28 @@ class RedisCURD:
         """
         try:
             # 使用Lua脚本确保原子性验证和续约
-            script = """
-            if redis.call('get', KEYS[1]) == ARGV[1] then
-                return redis.call('expire', KEYS[1], ARGV[2])
-            else
-                return 0
-            end
-            """
-            result = await self.redis.eval(script, 1, key, value, str(expire))  # pyright: ignore[reportGeneralTypeIssues]
+            result = await self._evalsha(RENEW_LOCK_SCRIPT, [key], [value, str(expire)])
             return result == 1
         except Exception as e:
             logger.error(f"续约分布式锁失败: {e!s}")
             return False
 
+    async def incr(self, key: str, amount: int = 1) -> int | None:
+        """计数器自增
+
+        参数:
+        - key (str): 计数器键名
+        - amount (int, optional): 自增步长,默认值为1
+
+        返回:
+        - int | None: 自增后的值,如果失败则返回None
+        """
+        try:
+            return await self.redis.incr(name=key, amount=amount)
+        except Exception as e:
+            logger.error(f"计数器自增失败: {e!s}")
+            return None
+
     async def expire(self, key: str, expire: int) -> bool:
         """设置缓存过期时间
 
@@ -291,9 +467,14 @@ class RedisCURD:
         """
         try:
             count = 0
+            batch: list = []
             async for key in self.redis.scan_iter(match=pattern, count=100):
-                if await self.redis.delete(key):
-                    count += 1
+                batch.append(key)
+                if len(batch) >= 100:
+                    count += await self.redis.unlink(*batch)
+                    batch.clear()
+            if batch:
+                count += await self.redis.unlink(*batch)
             return count
         except Exception as e:
             logger.error(f"按模式删除缓存失败: pattern={pattern}, err={e!s}")
@@ -370,6 +551,23 @@ class RedisCURD:
             logger.error(f"获取哈希缓存失败: {e!s}")
             return []
 
+    async def pfcount(self, *keys: str) -> int:
+        """HyperLogLog 基数估算，多个键时返回并集的基数（服务端合并，不落临时键）
+
+        参数:
+        - keys (str): HyperLogLog 键名
+
+        返回:
+        - int: 估算的去重数量,如果失败则返回0
+        """
+        if not keys:
+            return 0
+        try:
+            return await self.redis.pfcount(*keys)
+        except Exception as e:
+            logger.error(f"HyperLogLog 计数失败: {e!s}")
+            return 0
+
     async def publish(self, channel: str, message: str) -> int:
         """发布消息到频道（Redis pub/sub）
 
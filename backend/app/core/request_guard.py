@@ -0,0 +1,184 @@
+import asyncio
+import ipaddress
+import json
+import time
+from dataclasses import dataclass, replace
+from typing import Any
+
+from redis.asyncio import Redis
+
+from app.common.enums import RedisInitKeyConfig, SysParamKey
+from app.config.setting import settings
+from app.core.logger import logger
+from app.core.redis_crud import RedisCURD
+
+_TERMINAL = 2  # 节点下标：0/1 为子节点，2 为终止标记
+
+
+class IpPrefixTrie:
+    """IP 前缀树（按位的二叉 trie），IPv4 与 IPv6 各一棵。
+
+    条目可以是单个地址（等价于 /32、/128）或 CIDR 网段；查找沿地址的比特逐位下探，
+    遇到终止标记即命中，代价最多 32 / 128 步，与条目数量无关。IPv4 映射的 IPv6 地址（::ffff:a.b.c.d）按 IPv4 匹配。
+    """
+
+    __slots__ = ("_roots", "size")
+
+    def __init__(self, entries: list[str] | tuple[str, ...] = ()) -> None:
+        self._roots: dict[int, list[Any]] = {4: [None, None, False], 6: [None, None, False]}
+        self.size = 0
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: str) -> bool:
+        """加入一个地址或网段，无法解析时记录告警并跳过。"""
+        try:
+            network = ipaddress.ip_network(str(entry).strip(), strict=False)
+        except ValueError:
+            logger.warning(f"⚠️ 忽略无法解析的 IP/网段: {entry!r}")
+            return False
+        node = self._roots[network.version]
+        bits = network.max_prefixlen
+        value = int(network.network_address)
+        for index in range(network.prefixlen):
+            bit = (value >> (bits - 1 - index)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+        node[_TERMINAL] = True
+        self.size += 1
+        return True
+
+    def match(self, ip: str | None) -> bool:
+        if not ip or not self.size:
+            return False
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        node = self._roots[address.version]
+        bits = address.max_prefixlen
+        value = int(address)
+        for index in range(bits):
+            if node[_TERMINAL]:
+                return True
+            node = node[(value >> (bits - 1 - index)) & 1]
+            if node is None:
+                return False
+        return node[_TERMINAL]
+
+
+@dataclass(frozen=True, slots=True)
+class RequestGuardConfig:
+    """RequestLogMiddleware 使用的系统配置快照（演示模式、IP 白名单/黑名单），编译后只读共享。"""
+
+    version: str
+    demo_enable: bool
+    ip_white_list: IpPrefixTrie
+    ip_black_list: IpPrefixTrie
+    loaded_at: float
+
+
+DEFAULT_GUARD_CONFIG = RequestGuardConfig(
+    version="",
+    demo_enable=False,
+    ip_white_list=IpPrefixTrie(),
+    ip_black_list=IpPrefixTrie(),
+    loaded_at=0.0,
+)
+
+_CONFIG_KEYS = (SysParamKey.DEMO_ENABLE, SysParamKey.IP_WHITE_LIST, SysParamKey.IP_BLACK_LIST)
+
+
+class RequestGuardSnapshot:
+    """进程内的配置快照，请求路径上不访问 Redis。
+
+    - 参数修改后 ParamsService 递增版本号并在频道广播，各进程订阅任务收到后重新 MGET 编译；
+    - 订阅中断或消息丢失时，快照超过 REQUEST_GUARD_REFRESH_SECONDS 由下一个请求重新加载一次（加锁，不会并发回源）。
+    """
+
+    def __init__(self) -> None:
+        self.config = DEFAULT_GUARD_CONFIG
+        self._lock = asyncio.Lock()
+
+    async def get(self, redis: Redis | None) -> RequestGuardConfig:
+        config = self.config
+        if redis is None or time.monotonic() - config.loaded_at < settings.REQUEST_GUARD_REFRESH_SECONDS:
+            return config
+        async with self._lock:
+            # 等锁期间可能已被其他请求刷新
+            if self.config is config:
+                await self.reload(redis)
+        return self.config
+
+    async def reload(self, redis: Redis) -> RequestGuardConfig:
+        """一次 MGET 取版本号与三个配置并编译；失败时保留旧快照（仅推迟下次重试）。"""
+        keys = [RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key]
+        keys.extend(f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{key.value}" for key in _CONFIG_KEYS)
+        try:
+            raw_version, raw_demo, raw_white, raw_black = await redis.mget(keys)
+            self.config = RequestGuardConfig(
+                version=str(raw_version or 0),
+                demo_enable=self._parse(SysParamKey.DEMO_ENABLE, raw_demo) in (True, "true", "1", "yes", "on"),
+                ip_white_list=IpPrefixTrie(self._as_list(self._parse(SysParamKey.IP_WHITE_LIST, raw_white))),
+                ip_black_list=IpPrefixTrie(self._as_list(self._parse(SysParamKey.IP_BLACK_LIST, raw_black))),
+                loaded_at=time.monotonic(),
+            )
+        except Exception as e:
+            logger.error(f"加载请求拦截配置失败: {e!s}")
+            self.config = replace(self.config, loaded_at=time.monotonic())
+        return self.config
+
+    @staticmethod
+    def _parse(key: SysParamKey, raw: Any) -> Any:
+        """取出启用状态配置的 config_value，未配置/停用/解析失败返回 None。"""
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.error(f"解析系统配置 {key.value} 失败")
+            return None
+        if not isinstance(payload, dict) or payload.get("status", 0) != 0:
+            return None
+        return payload.get("config_value")
+
+    @staticmethod
+    def _as_list(value: Any) -> list[str]:
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                value = [item for item in value.replace("\n", ",").split(",") if item.strip()]
+        return [str(item) for item in value] if isinstance(value, list | tuple) else []
+
+
+request_guard_snapshot = RequestGuardSnapshot()
+
+
+async def publish_config_change(redis: Redis) -> None:
+    """系统参数写入 Redis 后调用：递增版本号并广播，各进程刷新快照。"""
+    curd = RedisCURD(redis)
+    version = await curd.incr(RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key)
+    await curd.publish(RedisInitKeyConfig.SYSTEM_CONFIG_CHANNEL.key, str(version or ""))
+
+
+async def listen_config_changes(redis: Redis) -> None:
+    """订阅配置变更频道直到任务被取消；版本号与当前快照不同才重新加载。连接中断后重连并全量加载一次。"""
+    channel = RedisInitKeyConfig.SYSTEM_CONFIG_CHANNEL.key
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(channel)
+                # 订阅建立后加载，覆盖断连期间的变更
+                await request_guard_snapshot.reload(redis)
+                async for item in pubsub.listen():
+                    if item.get("type") == "message" and item["data"] != request_guard_snapshot.config.version:
+                        await request_guard_snapshot.reload(redis)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ 系统配置变更订阅中断，稍后重连: {e}")
+            await asyncio.sleep(1)
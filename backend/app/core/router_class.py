@@ -5,9 +5,10 @@ from typing import Any
 
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 from app.config.setting import settings
+from app.core.log_capture import ResponseCapture, capture_request, redact, sample_rate, sampled
 from app.core.logger import logger
 from app.utils.ip_local_util import get_client_ip
 
@@ -22,23 +23,66 @@ _PUBLIC_WRITE_PATHS: set[str] = {
 }
 
 
-async def _write_operation_log_async(log_data: dict) -> None:
-    """直接写入操作日志（函数体内导入避免循环依赖）。"""
+async def _write_operation_log_async(log_data: dict, capture: ResponseCapture | None = None) -> None:
+    """提交到批量写入器（函数体内导入避免循环依赖）。流式响应此时已发送完毕，截取的响应体在这里取出。"""
     try:
+        if capture is not None:
+            log_data["response_json"] = capture.text
+        elif log_data.get("response_json") is None:
+            log_data["response_json"] = "{}"
         from app.api.v1.module_system.log.crud import OperationLogCRUD
         from app.api.v1.module_system.log.schema import OperationLogCreateSchema
-        from app.core.base_schema import AuthSchema
-        from app.core.database import async_db_session
+        from app.core.log_writer import log_writer
 
-        async with async_db_session() as _session, _session.begin():
-            auth = AuthSchema()
-            await OperationLogCRUD(auth, _session).create(data=OperationLogCreateSchema(**log_data))
+        await log_writer.write(OperationLogCRUD, OperationLogCreateSchema(**log_data))
     except Exception:
         logger.exception("操作日志写入失败: path={}", log_data.get("request_path"))
 
 
+async def _capture_parsed(request: Request, response: Response) -> tuple[str, str]:
+    """parsed 模式：完整解析请求体后序列化，超过上限记为"请求参数过长"；JSON 响应体整体保存。"""
+    oper_param: dict[str, Any] = {}
+    content_type = request.headers.get("Content-Type", "")
+    if content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        try:
+            form_data = await request.form()
+            # 过滤掉 UploadFile 对象，只保留纯表单字段
+            oper_param["form"] = {k: v for k, v in form_data.items() if not hasattr(v, "read")}
+        except Exception:
+            oper_param["form"] = {}
+    else:
+        payload = await request.body()
+        if payload:
+            try:
+                oper_param["body"] = json.loads(payload.decode())
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                oper_param["body"] = payload.decode("utf-8", errors="ignore")
+
+    if request.path_params:
+        oper_param["path_params"] = dict(request.path_params)
+
+    log_payload = redact(json.dumps(oper_param, ensure_ascii=False).encode()).decode()
+    if len(log_payload) > settings.OPERATION_LOG_CAPTURE_BYTES:
+        log_payload = "请求参数过长"
+
+    is_json = "application/json" in response.headers.get("Content-Type", "")
+    response_data = response.body if is_json else b"{}"
+    return log_payload, redact(bytes(response_data)).decode()
+
+
+def _append_background(response: Response, task: BackgroundTask) -> None:
+    """追加到响应已有的后台任务之后（如接口通过 BackgroundTasks 注入的任务），不覆盖。"""
+    background = response.background
+    if background is None:
+        response.background = task
+    elif isinstance(background, BackgroundTasks):
+        background.tasks.append(task)
+    else:
+        response.background = BackgroundTasks(tasks=[background, task])
+
+
 class OperationLogRoute(APIRoute):
-    """操作日志路由 — 自动记录请求/响应并后台异步写入。
+    """操作日志路由 — 自动记录请求/响应，响应发送后交给批量写入器。
 
     根据 HTTP 方法判断：
     - 写方法 (POST/PUT/DELETE/PATCH)：注入租户写权限检查
@@ -54,6 +98,7 @@ class OperationLogRoute(APIRoute):
 
     def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
         original_route_handler = super().get_route_handler()
+        rate = sample_rate(f"{settings.ROOT_PATH}{self.path_format}")
 
         async def custom_route_handler(request: Request) -> Response:
             start = time.perf_counter()
@@ -61,35 +106,23 @@ class OperationLogRoute(APIRoute):
 
             if request.method not in settings.OPERATION_RECORD_METHOD:
                 return response
+            # 按路由采样，失败的请求始终记录
+            if response.status_code < 400 and not sampled(rate):
+                return response
             route: APIRoute = request.scope.get("route", None)
 
             try:
-                oper_param: dict[str, Any] = {}
-                content_type = request.headers.get("Content-Type", "")
-                if content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
-                    try:
-                        form_data = await request.form()
-                        # 过滤掉 UploadFile 对象，只保留纯表单字段
-                        oper_param["form"] = {k: v for k, v in form_data.items() if not hasattr(v, "read")}
-                    except Exception:
-                        oper_param["form"] = {}
+                if settings.OPERATION_LOG_CAPTURE_MODE == "raw":
+                    log_payload = await capture_request(request)
+                    if request.path_params:
+                        # 原始请求体不含路径参数，与 parsed 模式一样单独记录
+                        path_params = redact(json.dumps(request.path_params, ensure_ascii=False, default=str).encode()).decode()
+                        log_payload = f"{log_payload} path_params={path_params}" if log_payload else f"path_params={path_params}"
+                    capture = ResponseCapture.attach(response)
+                    response_json = None
                 else:
-                    payload = await request.body()
-                    if payload:
-                        try:
-                            oper_param["body"] = json.loads(payload.decode())
-                        except (json.JSONDecodeError, UnicodeDecodeError):
-                            oper_param["body"] = payload.decode("utf-8", errors="ignore")
-
-                if request.path_params:
-                    oper_param["path_params"] = dict(request.path_params)
-
-                log_payload = json.dumps(oper_param, ensure_ascii=False)
-                if len(log_payload) > 2000:
-                    log_payload = "请求参数过长"
-
-                is_json = "application/json" in response.headers.get("Content-Type", "")
-                response_data = response.body if is_json else b"{}"
+                    log_payload, response_json = await _capture_parsed(request, response)
+                    capture = None
 
                 log_data: dict[str, Any] = {
                     "username": getattr(getattr(request.state, "ctx", None), "user_username", "unknown"),
@@ -97,12 +130,12 @@ class OperationLogRoute(APIRoute):
                     "request_method": request.method,
                     "request_payload": log_payload,
                     "response_code": response.status_code,
-                    "response_json": bytes(response_data).decode(),
+                    "response_json": response_json,
                     "process_time": f"{(time.perf_counter() - start):.2f}s",
                     "description": route.summary if route else "",
                     "request_ip": get_client_ip(request),
                 }
-                response.background = BackgroundTask(_write_operation_log_async, log_data)
+                _append_background(response, BackgroundTask(_write_operation_log_async, log_data, capture))
             except Exception:
                 logger.warning("操作日志采集异常: {}", request.url.path, exc_info=True)
             return response
@@ -0,0 +1,155 @@
+import ipaddress
+import json
+import time
+from collections.abc import AsyncIterator
+
+from redis.asyncio.client import Pipeline, Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.core.logger import logger
+from app.core.redis_crud import RedisCURD
+
+# 文本条件过滤时每批从有序集合取出的会话数
+_SCAN_BATCH = 500
+
+
+class SessionIndex:
+    """在线会话索引，替代 SCAN 全部 access_token:* 键。
+
+    - online_sessions：有序集合，成员为 session_id，分值为会话过期时间戳，分页/计数按分值区间取，O(log N + 页大小)；
+    - user_online_sessions:<user_id> / online_sessions_ip:<ip>：按用户、按 IP 的 session_id 集合。
+
+    写入在登录/刷新/退出的同一 pipeline 里完成。过期成员惰性清理：读之前 ZREMRANGEBYSCORE 移除已过期分值，
+    集合里会话键已不存在的成员在读取时 SREM/ZREM。
+    """
+
+    online_key = RedisInitKeyConfig.ONLINE_SESSIONS.key
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    # ----------------------------- 写入（排进调用方的 pipeline） ----------------------------- #
+
+    @classmethod
+    def add(cls, pipe: Pipeline, session_id: str, user_id: int, ipaddr: str | None, expire: int) -> None:
+        """登录或刷新：写入/更新过期时间，索引集合的 TTL 跟随最晚过期的会话。"""
+        pipe.zadd(cls.online_key, {session_id: time.time() + expire})
+        for key in (cls.user_key(user_id), cls.ip_key(ipaddr)):
+            if key:
+                pipe.sadd(key, session_id)
+                pipe.expire(key, expire)
+
+    @classmethod
+    def remove(cls, pipe: Pipeline, *session_ids: str) -> None:
+        """退出/强制下线：只移出有序集合，用户与 IP 集合在读取时惰性清理。"""
+        if session_ids:
+            pipe.zrem(cls.online_key, *session_ids)
+
+    @classmethod
+    def user_key(cls, user_id: int | None) -> str | None:
+        return f"{RedisInitKeyConfig.USER_ONLINE_SESSIONS.key}:{user_id}" if user_id else None
+
+    @classmethod
+    def ip_key(cls, ipaddr: str | None) -> str | None:
+        return f"{RedisInitKeyConfig.ONLINE_SESSIONS_IP.key}:{ipaddr}" if ipaddr else None
+
+    # ----------------------------------------- 读取 ----------------------------------------- #
+
+    async def count(self) -> int:
+        try:
+            await self._purge_expired()
+            return await self.redis.zcard(self.online_key)
+        except Exception as e:
+            logger.error(f"统计在线会话失败: {e!s}")
+            return 0
+
+    async def page(self, offset: int, limit: int) -> tuple[int, list[dict]]:
+        """按过期时间倒序（最近登录/刷新在前）取一页会话：(总数, 会话列表)。"""
+        try:
+            await self._purge_expired()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zcard(self.online_key)
+                pipe.zrevrange(self.online_key, offset, offset + limit - 1)
+                total, session_ids = await pipe.execute()
+            sessions, stale = await self._load(session_ids)
+            await self._drop_stale(stale)
+            return max(total - len(stale), 0), sessions
+        except Exception as e:
+            logger.error(f"分页获取在线会话失败: {e!s}")
+            return 0, []
+
+    async def by_user(self, user_id: int) -> list[dict]:
+        return await self._by_set(self.user_key(user_id))
+
+    async def by_ip(self, ipaddr: str) -> list[dict]:
+        return await self._by_set(self.ip_key(ipaddr))
+
+    async def iter_all(self) -> AsyncIterator[dict]:
+        """按批遍历全部在线会话（文本条件过滤用），每批一次 ZREVRANGE + 一次 MGET。"""
+        await self._purge_expired()
+        start = 0
+        stale_all: list[str] = []
+        while True:
+            session_ids = await self.redis.zrevrange(self.online_key, start, start + _SCAN_BATCH - 1)
+            if not session_ids:
+                break
+            sessions, stale = await self._load(session_ids)
+            stale_all.extend(stale)
+            for session in sessions:
+                yield session
+            start += len(session_ids)
+        # 遍历结束后再清理，避免遍历中删除成员导致下标错位
+        await self._drop_stale(stale_all)
+
+    async def clear(self) -> None:
+        curd = RedisCURD(self.redis)
+        await curd.delete(self.online_key)
+        await curd.delete_by_pattern(f"{RedisInitKeyConfig.USER_ONLINE_SESSIONS.key}:*")
+        await curd.delete_by_pattern(f"{RedisInitKeyConfig.ONLINE_SESSIONS_IP.key}:*")
+
+    async def _by_set(self, key: str | None) -> list[dict]:
+        if not key:
+            return []
+        try:
+            session_ids = list(await self.redis.smembers(key))
+            sessions, stale = await self._load(session_ids)
+            await self._drop_stale(stale, set_key=key)
+            sessions.sort(key=lambda x: x.get("login_time") or "", reverse=True)
+            return sessions
+        except Exception as e:
+            logger.error(f"按索引获取在线会话失败: key={key}, err={e!s}")
+            return []
+
+    async def _load(self, session_ids: list[str]) -> tuple[list[dict], list[str]]:
+        """一次 MGET 取会话：(会话列表, 会话键已不存在的 session_id)。"""
+        if not session_ids:
+            return [], []
+        raws = await self.redis.mget([f"{RedisInitKeyConfig.USER_SESSION.key}:{sid}" for sid in session_ids])
+        sessions: list[dict] = []
+        stale: list[str] = []
+        for session_id, raw in zip(session_ids, raws, strict=True):
+            if raw:
+                sessions.append(json.loads(raw))
+            else:
+                stale.append(session_id)
+        return sessions, stale
+
+    async def _drop_stale(self, stale: list[str], set_key: str | None = None) -> None:
+        if not stale:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(self.online_key, *stale)
+            if set_key:
+                pipe.srem(set_key, *stale)
+            await pipe.execute()
+
+    async def _purge_expired(self) -> None:
+        await self.redis.zremrangebyscore(self.online_key, "-inf", time.time())
+
+
+def is_ip_address(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
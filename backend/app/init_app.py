@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import AsyncGenerator
 from typing import Any
 
@@ -20,19 +21,28 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     from app.api.v1.module_system.dict.service import DictDataService
     from app.api.v1.module_system.params.service import ParamsService
     from app.core.ap_scheduler import SchedulerUtil
-    from app.core.database import async_engine, redis_connect
+    from app.core.auth_cache import listen_auth_invalidation
+    from app.core.database import async_engine, redis_connect, replica_router
+    from app.core.log_writer import log_writer
+    from app.core.redis_crud import RedisCURD
+    from app.core.request_guard import listen_config_changes
     from app.scripts.initialize import InitializeData
+    from app.utils.password_util import pwd_hash_pool
 
     await InitializeData().init_db()
     logger.info("✅ {}数据库初始化完成", settings.DATABASE_TYPE)
     await redis_connect(app, status=True)
     logger.info("✅ Redis 连接初始化完成")
+    await RedisCURD(app.state.redis).load_scripts()
+    auth_listener = asyncio.create_task(listen_auth_invalidation(app.state.redis))
     await ParamsService.init_cache(redis=app.state.redis)
     logger.info("✅ Redis系统参数初始化完成")
+    config_listener = asyncio.create_task(listen_config_changes(app.state.redis))
     await DictDataService.init_cache(redis=app.state.redis)
     logger.info("✅ Redis数据字典初始化完成")
     await SchedulerUtil.init_scheduler(redis=app.state.redis)
     logger.info("✅ 定时任务调度器初始化完成")
+    await log_writer.start()
 
     console_start(
         host=settings.SERVER_HOST,
@@ -48,10 +58,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     try:
         SchedulerUtil.shutdown(wait=True)
         logger.info("✅ 定时任务调度器已关闭")
+        auth_listener.cancel()
+        config_listener.cancel()
+        # 排空日志队列，需在释放数据库连接池之前
+        await log_writer.stop()
         await redis_connect(app, status=False)
         logger.info("✅ Redis 连接已关闭")
         await async_engine.dispose()
+        await replica_router.dispose()
         logger.info("✅ 数据库引擎连接池已释放")
+        pwd_hash_pool.shutdown()
         console_end()
     except Exception as e:
         logger.error("❌ 应用关闭过程中发生错误: {}", e)
@@ -41,6 +41,7 @@ async def get_obj_list_controller(
         page_size=page.page_size,
         search=search,
         order_by=page.order_by,
+        cursor=page.cursor,
     )
     return SuccessResponse(data=result_dict, msg="查询示例列表成功")
 
@@ -45,6 +45,7 @@ class DemoService:
         page_size: int,
         search: DemoQueryParam | None = None,
         order_by: list[dict[str, str]] | None = None,
+        cursor: str | None = None,
     ) -> PageResultSchema[DemoOutSchema]:
         offset = (page_no - 1) * page_size
         return await DemoCRUD(self.auth, self.db).page(
@@ -53,6 +54,7 @@ class DemoService:
             order_by=order_by or [{"id": "asc"}],
             search=search_to_dict(search, {}),
             out_schema=DemoOutSchema,
+            cursor=cursor,
         )
 
     async def create(self, data: DemoCreateSchema) -> DemoOutSchema:
@@ -143,6 +145,7 @@ class DemoService:
 
             error_msgs = []
             success_count = 0
+            valid_rows: list[tuple[int, DemoCreateSchema]] = []
 
             for i, row in enumerate(mapped_rows, start=1):
                 try:
@@ -155,32 +158,47 @@ class DemoService:
                         error_msgs.append(f"第{i}行: 状态必须是'正常'或'停用'")
                         continue
 
-                    create_data = DemoCreateSchema(
+                    valid_rows.append((i, DemoCreateSchema(
                         name=str(row["name"]),
                         status=status,
                         description=str(row["description"] or ""),
-                    )
+                    )))
+                except Exception as e:
+                    error_msgs.append(f"第{i}行: {e!s}")
+                    continue
 
-                    exists_obj = await DemoCRUD(self.auth, self.db).get(name=create_data.name)
-                    if exists_obj:
-                        if update_support:
+            # 已存在对象一次查询预取，新对象攒起来走 create_many
+            names = list({data.name for _, data in valid_rows})
+            exists_objs = await DemoCRUD(self.auth, self.db).get_list(search={"name": ("in", names)}) if names else []
+            exists_map = {obj.name: obj for obj in exists_objs}
+            to_create: dict[str, DemoCreateSchema] = {}
+
+            for i, create_data in valid_rows:
+                try:
+                    exists_obj = exists_map.get(create_data.name)
+                    if exists_obj or create_data.name in to_create:
+                        if not update_support:
+                            error_msgs.append(f"第{i}行: 对象 {create_data.name} 已存在")
+                            continue
+                        if exists_obj:
                             update_data = DemoUpdateSchema(
                                 name=create_data.name,
                                 status=create_data.status,
                                 description=create_data.description,
                             )
-                            await DemoCRUD(self.auth, self.db).update(id=exists_obj.id, data=update_data)
+                            await DemoCRUD(self.auth, self.db).update(id=exists_obj.id, data=update_data, load_audit=False)
                             success_count += 1
-                        else:
-                            error_msgs.append(f"第{i}行: 对象 {create_data.name} 已存在")
-                    else:
-                        await DemoCRUD(self.auth, self.db).create(data=create_data)
-                        success_count += 1
+                            continue
+                    to_create[create_data.name] = create_data
+                    success_count += 1
 
                 except Exception as e:
                     error_msgs.append(f"第{i}行: {e!s}")
                     continue
 
+            if to_create:
+                await DemoCRUD(self.auth, self.db).create_many(list(to_create.values()))
+
             result = f"成功导入 {success_count} 条数据"
             if error_msgs:
                 result += "\n错误信息:\n" + "\n".join(error_msgs)
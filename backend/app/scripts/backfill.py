@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from sqlalchemy import Table, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.base_model import MappedBase
+from app.core.database import async_db_session
+from app.core.logger import logger
+from app.utils.import_util import ImportUtil
+
+
+async def backfill_created_dept_id() -> dict[str, int]:
+    """按创建人当前所在部门回填 created_dept_id（仅处理为空的行，可重复执行）。
+
+    不用 UPDATE ... SET = (SELECT ... FROM sys_user) 的关联写法：MySQL 不允许子查询引用被更新表（sys_user 自身也带该列），
+    改为先取创建人 → 部门映射，再按部门分组各执行一条 UPDATE ... WHERE created_id IN (...)。
+
+    返回:
+    - dict[str, int]: {表名: 回填行数}
+    """
+    from app.api.v1.module_system.user.model import UserModel
+
+    ImportUtil.find_models(MappedBase)
+    tables = [table for table in MappedBase.metadata.tables.values() if {"created_id", "created_dept_id"} <= set(table.c.keys())]
+
+    result: dict[str, int] = {}
+    async with async_db_session() as db, db.begin():
+        existing = await db.run_sync(lambda session: _existing_columns(session, [table.name for table in tables]))
+        user_rows = await db.execute(select(UserModel.id, UserModel.dept_id).where(UserModel.dept_id.is_not(None)))
+        users_by_dept: dict[int, list[int]] = defaultdict(list)
+        for user_id, dept_id in user_rows.all():
+            users_by_dept[dept_id].append(user_id)
+
+        for table in tables:
+            if "created_dept_id" not in existing.get(table.name, set()):
+                logger.warning(f"⚠️ {table.name} 缺少 created_dept_id 列，请先执行迁移（revision/upgrade），已跳过")
+                continue
+            result[table.name] = await _backfill_table(db, table, users_by_dept)
+            logger.info(f"✅ {table.name} 回填 created_dept_id {result[table.name]} 行")
+    return result
+
+
+async def _backfill_table(db: AsyncSession, table: Table, users_by_dept: dict[int, list[int]]) -> int:
+    total = 0
+    columns = table.c
+    for dept_id, user_ids in users_by_dept.items():
+        sql = (
+            update(table)
+            .where(columns.created_dept_id.is_(None), columns.created_id.in_(user_ids))
+            .values(created_dept_id=dept_id)
+        )
+        if "updated_time" in columns:
+            # 回填不算业务更新，保留原 updated_time
+            sql = sql.values(updated_time=columns.updated_time)
+        total += (await db.execute(sql)).rowcount or 0
+    return total
+
+
+def _existing_columns(session: Session, table_names: list[str]) -> dict[str, set[str]]:
+    inspector = sa_inspect(session.connection())
+    return {name: {col["name"] for col in inspector.get_columns(name)} for name in table_names if inspector.has_table(name)}
@@ -12,6 +12,8 @@ from app.api.v1.module_system.role.model import RoleModel
 from app.api.v1.module_system.user.model import UserModel, UserRolesModel
 from app.api.v1.module_system.versions.model import VersionModel
 from app.config.path_conf import SCRIPT_DIR
+from app.core.base_crud import CRUDBase
+from app.core.base_schema import AuthSchema
 from app.core.database import async_db_session, check_db, create_tables
 from app.core.logger import logger
 
@@ -65,27 +67,34 @@ class InitializeData:
             try:
                 if table_name in self._RECURSIVE_TABLES:
                     objs = self.__create_objects_with_children(data, model)
-                elif table_name == "sys_dict_type":
-                    objs = []
-                    for item in data:
-                        obj = model(**item)
-                        objs.append(obj)
-                        dict_type_mapping[item["dict_type"]] = obj
+                    db.add_all(objs)
+                    await db.flush()
+                    # 主键 flush 后才确定，随后统一补齐物化路径
+                    await CRUDBase(model, AuthSchema(), db).sync_tree_paths()
+                    logger.info(f"✅️ 已向 {table_name} 写入初始化数据")
+                    continue
+
+                # 平铺表不经过 ORM 对象，直接按批多行 INSERT
+                crud = CRUDBase(model, AuthSchema(), db)
+                if table_name == "sys_dict_type":
+                    ids = await crud.create_many(data, returning=True)
+                    dict_type_mapping.update(zip((item["dict_type"] for item in data), ids, strict=True))
+                    rows = data
                 elif table_name == "sys_dict_data":
-                    objs = []
+                    rows = []
                     for item in data:
                         dict_type_str = item.get("dict_type")
                         if dict_type_str not in dict_type_mapping:
                             logger.warning(f"⚠️  未找到字典类型 {dict_type_str}，跳过")
                             continue
-                        item["dict_type_id"] = dict_type_mapping[dict_type_str].id
-                        objs.append(model(**item))
+                        item["dict_type_id"] = dict_type_mapping[dict_type_str]
+                        rows.append(item)
+                    await crud.create_many(rows)
                 else:
-                    objs = [model(**item) for item in data]
+                    rows = data
+                    await crud.create_many(rows)
 
-                if objs:
-                    db.add_all(objs)
-                    await db.flush()
+                if rows:
                     logger.info(f"✅️ 已向 {table_name} 写入初始化数据")
                 else:
                     logger.info(f"⏭️  跳过 {table_name} 表数据初始化（无有效数据）")
@@ -1,4 +1,6 @@
 import io
+from collections.abc import AsyncIterable, Mapping, Sequence
+from datetime import date, datetime, time
 from typing import Any
 
 from openpyxl import Workbook, load_workbook
@@ -6,6 +8,8 @@ from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 
+from app.common.constant import DATE_DISPLAY_FMT, DATETIME_DISPLAY_FMT, TIME_DISPLAY_FMT
+
 
 class ExcelUtil:
     """Excel 模板生成与列表导出（openpyxl）。"""
@@ -128,3 +132,52 @@ class ExcelUtil:
         wb.save(buffer)
         buffer.seek(0)
         return buffer.getvalue()
+
+    @staticmethod
+    def __format_cell(value: Any) -> Any:
+        """日期时间按展示格式转字符串（与 Schema 序列化一致；openpyxl 也不接受带时区的 datetime）。"""
+        if isinstance(value, datetime):
+            return value.strftime(DATETIME_DISPLAY_FMT)
+        if isinstance(value, date):
+            return value.strftime(DATE_DISPLAY_FMT)
+        if isinstance(value, time):
+            return value.strftime(TIME_DISPLAY_FMT)
+        return value
+
+    @classmethod
+    async def export_stream2excel(
+        cls,
+        batches: AsyncIterable[Sequence[Mapping[str, Any]]],
+        mapping_dict: dict,
+        max_rows: int = 100000,
+    ) -> tuple[bytes, int]:
+        """按批消费数据并以 write_only 模式写出 Excel，不在内存里攒完整列表。
+
+        参数:
+        - batches: 数据批次的异步迭代器（如 CRUDBase.stream 的产出）。
+        - mapping_dict: 字段名映射字典 {英文key: 中文表头}。
+        - max_rows: 最多导出的记录数，超出部分截断。
+
+        返回:
+        - tuple[bytes, int]: (Excel 文件的二进制数据, 实际写入的记录数)。
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        keys = list(mapping_dict)
+        ws.append(list(mapping_dict.values()))
+
+        count = 0
+        async for batch in batches:
+            for item in batch[: max_rows - count]:
+                ws.append([cls.__format_cell(item.get(key)) for key in keys])
+            count = min(count + len(batch), max_rows)
+            if count >= max_rows:
+                # 提前结束时显式关闭，及时释放服务端游标
+                aclose = getattr(batches, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                break
+
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue(), count
@@ -1,34 +1,116 @@
+import asyncio
 import base64
 import hashlib
+import hmac
+import multiprocessing
 import os
 import secrets
 import string
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from fastapi import status
+
+from app.config.setting import settings
+from app.core.exceptions import CustomException
 
 _PBKDF2_ALGO = "sha256"
-_PBKDF2_ITERATIONS = 600_000
 _PBKDF2_SALT_LEN = 16
 _PBKDF2_PREFIX = "$pbkdf2-sha256$"
 
 _STRONG_PWD_CHARS = string.ascii_letters + string.digits + "!@#$%^&*"
 
 
+def _hash_password(password: str, iterations: int) -> str:
+    salt = os.urandom(_PBKDF2_SALT_LEN)
+    dk = hashlib.pbkdf2_hmac(_PBKDF2_ALGO, password.encode(), salt, iterations)
+    return f"{_PBKDF2_PREFIX}{iterations}${base64.b64encode(salt).decode()}${base64.b64encode(dk).decode()}"
+
+
+def _verify_password(plain_password: str, password_hash: str) -> bool:
+    try:
+        _, _algo, iters_str, salt_b64, hash_b64 = password_hash.split("$")
+        salt = base64.b64decode(salt_b64)
+        expected = base64.b64decode(hash_b64)
+        dk = hashlib.pbkdf2_hmac(_PBKDF2_ALGO, plain_password.encode(), salt, int(iters_str))
+        return hmac.compare_digest(dk, expected)
+    except Exception:
+        return False
+
+
+class PwdHashPool:
+    """PBKDF2 专用进程池：哈希计算移出事件循环，登录高峰不再拖慢同一 worker 上的其他请求。
+
+    - 进程数固定（PASSWORD_HASH_WORKERS），首次使用时以 spawn 方式创建，不继承父进程的事件循环与连接；
+    - 在途任务数（执行中 + 排队）即队列深度，超过 workers + PASSWORD_HASH_MAX_QUEUE 时直接拒绝，
+      避免突发登录把排队时间堆到客户端超时之后才失败。
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise CustomException(msg="登录请求过多，请稍后重试", status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict[str, int]:
+        """队列深度指标：queue_depth 为排队中（未分到进程）的任务数。"""
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pwd_hash_pool = PwdHashPool(workers=settings.PASSWORD_HASH_WORKERS, max_queue=settings.PASSWORD_HASH_MAX_QUEUE)
+
+
 class PwdUtil:
     @staticmethod
     def hash_password(password: str) -> str:
-        salt = os.urandom(_PBKDF2_SALT_LEN)
-        dk = hashlib.pbkdf2_hmac(_PBKDF2_ALGO, password.encode(), salt, _PBKDF2_ITERATIONS)
-        return f"{_PBKDF2_PREFIX}{_PBKDF2_ITERATIONS}${base64.b64encode(salt).decode()}${base64.b64encode(dk).decode()}"
+        """同步哈希（初始化脚本、命令行等非请求路径使用）；请求内用 hash_password_async。"""
+        return _hash_password(password, settings.PASSWORD_HASH_ITERATIONS)
 
     @staticmethod
     def verify_password(plain_password: str, password_hash: str) -> bool:
+        """同步校验；请求内用 verify_password_async。"""
+        return _verify_password(plain_password, password_hash)
+
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        return await pwd_hash_pool.run(_hash_password, password, settings.PASSWORD_HASH_ITERATIONS)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, password_hash: str) -> bool:
+        return await pwd_hash_pool.run(_verify_password, plain_password, password_hash)
+
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """哈希的算法或迭代次数与当前配置不一致（调整 PASSWORD_HASH_ITERATIONS 后的老哈希），需在登录成功时重算。"""
         try:
-            _, _algo, iters_str, salt_b64, hash_b64 = password_hash.split("$")
-            salt = base64.b64decode(salt_b64)
-            expected = base64.b64decode(hash_b64)
-            dk = hashlib.pbkdf2_hmac(_PBKDF2_ALGO, plain_password.encode(), salt, int(iters_str))
-            return dk == expected
-        except Exception:
-            return False
+            _, algo, iters_str, _salt, _hash = password_hash.split("$")
+            return algo != "pbkdf2-sha256" or int(iters_str) != settings.PASSWORD_HASH_ITERATIONS
+        except ValueError:
+            return True
 
     @staticmethod
     def check_password_strength(password: str) -> str | None:
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from typing import Annotated
 
@@ -122,5 +123,30 @@ def upgrade(
     typer.echo("所有迁移已应用。")
 
 
+@fastapiadmin_cli.command(
+    name="backfill-dept",
+    help="按创建人部门补填业务表仍为空的 created_dept_id（迁移已回填一次，可重复执行）, 运行 python main.py backfill-dept --env=dev",
+)
+def backfill_dept(
+    env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行环境 (dev, prod)")] = EnvironmentEnum.DEV,
+) -> None:
+    """回填历史数据的创建人部门，数据权限过滤依赖该列。
+
+    参数:
+    - env (EnvironmentEnum): 运行环境。
+
+    返回:
+    - None
+    """
+    os.environ["ENVIRONMENT"] = env.value
+    from app.config.setting import get_settings
+
+    get_settings.cache_clear()
+    from app.scripts.backfill import backfill_created_dept_id
+
+    result = asyncio.run(backfill_created_dept_id())
+    typer.echo(f"回填完成，共 {sum(result.values())} 行。")
+
+
 if __name__ == "__main__":
     fastapiadmin_cli()
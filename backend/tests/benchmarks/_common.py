@@ -0,0 +1,44 @@
+"""基准脚本公共部分：把 backend 目录加入 sys.path（脚本直接 python 运行时可 import app / main），以及计时模板。
+
+各 bench_*.py 在 import 应用模块之前先 ``import _common``。
+"""
+
+import sys
+import time
+import timeit
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# 每个组合默认累计计时 BUDGET 秒，取平均
+BUDGET = 1.0
+
+
+def measure(func: Callable[..., Any], *args: Any, budget: float = BUDGET, max_rounds: int | None = None, clock: Callable[[], float] = time.perf_counter) -> float:
+    """反复调用 func(*args)，直到累计 budget 秒或达到 max_rounds 次，返回平均每次耗时（秒）。"""
+    rounds = 0
+    start = clock()
+    while (max_rounds is None or rounds < max_rounds) and clock() - start < budget:
+        func(*args)
+        rounds += 1
+    return (clock() - start) / rounds
+
+
+async def measure_async(func: Callable[..., Awaitable[Any]], *args: Any, budget: float = BUDGET, max_rounds: int | None = None, clock: Callable[[], float] = time.perf_counter) -> float:
+    """measure 的协程版本：逐次 await func(*args)。"""
+    rounds = 0
+    start = clock()
+    while (max_rounds is None or rounds < max_rounds) and clock() - start < budget:
+        await func(*args)
+        rounds += 1
+    return (clock() - start) / rounds
+
+
+def best_of(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """timeit 取 repeat 组中最快一组，返回平均每次耗时（秒）；适合微秒级的纯 CPU 函数。"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
@@ -0,0 +1,170 @@
+"""基准：响应压缩的 CPU 开销与节省字节数，按接口类型（路由）分别统计。
+
+直接以 ASGI 调用驱动只挂压缩中间件的应用，对每个路由比较：
+
+- gzip-9      改写前的 CustomGZipMiddleware（starlette GZipMiddleware，固定 9 级）；
+- zstd/br/gzip 当前的 CustomCompressionMiddleware，分别以对应 Accept-Encoding 请求（按内容类型与大小自动选级别）。
+
+路由模拟系统里典型的响应：分页列表（小 JSON）、大列表（不分页的全量数据）、Excel 导出（已压缩的 xlsx）、
+NDJSON 流式响应、以及低于压缩阈值的小响应。输出每请求 CPU 微秒（process_time，包含压缩与框架开销）、
+响应体字节数与相对原始体积的节省比例。未安装 zstandard / brotli 时对应列跳过。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_compression.py
+"""
+
+import asyncio
+import io
+import json
+import time
+from collections.abc import AsyncIterator
+
+from _common import measure_async
+from fastapi import FastAPI
+from openpyxl import Workbook
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from app.config.setting import settings
+from app.core.compression import available_encodings
+from app.core.middlewares import CustomCompressionMiddleware
+
+# 每个组合最多请求 ROUNDS 次或累计 1 秒 CPU，取平均
+ROUNDS = 200
+
+
+def _rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": index,
+            "username": f"user{index:06d}",
+            "name": f"测试用户{index}",
+            "email": f"user{index}@example.com",
+            "mobile": f"138{index:08d}",
+            "status": index % 2,
+            "dept": {"id": index % 17, "name": f"研发{index % 17}部"},
+            "roles": [{"id": 1, "name": "普通用户"}],
+            "created_time": "2026-10-18 12:00:00",
+            "description": "这是一段用于填充的描述信息" * (index % 3),
+        }
+        for index in range(count)
+    ]
+
+
+def _xlsx(rows: list[dict]) -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(list(rows[0].keys()))
+    for row in rows:
+        sheet.append([json.dumps(value, ensure_ascii=False) if isinstance(value, dict | list) else value for value in row.values()])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+PAGE = {"code": 0, "msg": "查询成功", "data": {"items": _rows(20), "total": 5000, "page_no": 1, "page_size": 20}}
+FULL = {"code": 0, "msg": "查询成功", "data": _rows(5000)}
+XLSX = _xlsx(_rows(2000))
+STREAM_LINES = [json.dumps(row, ensure_ascii=False).encode() + b"\n" for row in _rows(2000)]
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page() -> JSONResponse:
+        return JSONResponse(PAGE)
+
+    @app.get("/full")
+    async def full() -> JSONResponse:
+        return JSONResponse(FULL)
+
+    @app.get("/export")
+    async def export() -> Response:
+        return Response(XLSX, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines() -> AsyncIterator[bytes]:
+            # 每 100 行一块，模拟逐批查询输出
+            for start in range(0, len(STREAM_LINES), 100):
+                yield b"".join(STREAM_LINES[start : start + 100])
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/tiny")
+    async def tiny() -> JSONResponse:
+        return JSONResponse({"code": 0, "msg": "操作成功", "data": True})
+
+    return app
+
+
+ROUTES = ["/page", "/full", "/export", "/stream", "/tiny"]
+
+
+async def _request(app, path: str, accept_encoding: str) -> int:
+    size = 0
+    finished = asyncio.Event()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8001),
+    }
+
+    requested = False
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # 流式响应会并发监听断开，响应发完后再返回
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return size
+
+
+async def _measure(app, path: str, accept_encoding: str) -> tuple[float, int]:
+    size = await _request(app, path, accept_encoding)
+    cost = await measure_async(_request, app, path, accept_encoding, max_rounds=ROUNDS, clock=time.process_time)
+    return cost * 1e6, size
+
+
+async def run() -> None:
+    inner = _build_app()
+    legacy = GZipMiddleware(inner, minimum_size=1000, compresslevel=9)
+    current = CustomCompressionMiddleware(inner)
+    variants = [("identity", inner, "identity"), ("gzip-9", legacy, "gzip")]
+    variants += [(encoding, current, encoding) for encoding in available_encodings()]
+    print(f"可用编码: {', '.join(available_encodings())}；大响应阈值 {settings.COMPRESS_LARGE_SIZE} 字节")
+
+    for path in ROUTES:
+        _, raw = await _measure(inner, path, "identity")
+        print(f"\n{path}（原始 {raw} 字节）")
+        print(f"  {'编码':<9}{'CPU µs/请求':>14}{'响应字节':>12}{'节省':>8}")
+        for label, app, accept_encoding in variants:
+            cost, size = await _measure(app, path, accept_encoding)
+            print(f"  {label:<9}{cost:14.1f}{size:12d}{1 - size / raw:8.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,139 @@
+"""基准：完整中间件栈（settings.MIDDLEWARE_LIST，按生产环境启用全部 6 层）的单请求开销。
+
+直接以 ASGI 调用驱动应用（不经过网络与 HTTP 客户端），对同一个空接口比较三种组装：
+
+- bare    不挂任何中间件；
+- legacy  RequestLog / HTTPSRedirect / CorrelationId 为改写前的 BaseHTTPMiddleware 实现；
+- asgi    当前的纯 ASGI 实现。
+
+输出每请求平均耗时与相对 bare 的中间件开销（微秒）。BaseHTTPMiddleware 每层都要起任务组、经内存流转发响应，
+开销随层数叠加；纯 ASGI 版只多几次函数调用。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_middleware.py
+"""
+
+import asyncio
+import uuid
+
+from _common import measure_async
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import RedirectResponse, Response
+
+from app.common.enums import EnvironmentEnum
+from app.common.response import ErrorResponse
+from app.config.setting import settings
+from app.core.logger import reset_correlation_id, set_correlation_id
+from app.core.request_guard import request_guard_snapshot
+from app.utils.common_util import import_module
+from app.utils.ip_local_util import get_client_ip
+
+REQUESTS = 5000
+WARMUP = 500
+
+
+class LegacyRequestLogMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        client_ip = get_client_ip(request)
+        config = await request_guard_snapshot.get(getattr(request.app.state, "redis", None))
+        if config.ip_black_list.match(client_ip):
+            return ErrorResponse(msg="IP已被黑名单")
+        return await call_next(request)
+
+
+class LegacyHTTPSRedirectMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if request.url.scheme != "https" and request.headers.get("X-Forwarded-Proto") != "https":
+            return RedirectResponse(request.url.replace(scheme="https"), status_code=301)
+        return await call_next(request)
+
+
+class LegacyCorrelationIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        cid = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
+        token = set_correlation_id(cid)
+        try:
+            response = await call_next(request)
+            response.headers["X-Correlation-ID"] = cid
+            return response
+        finally:
+            reset_correlation_id(token)
+
+
+LEGACY = {
+    "app.core.middlewares.RequestLogMiddleware": LegacyRequestLogMiddleware,
+    "app.core.middlewares.CustomHTTPSRedirectMiddleware": LegacyHTTPSRedirectMiddleware,
+    "app.core.middlewares.CorrelationIdMiddleware": LegacyCorrelationIdMiddleware,
+}
+
+
+def _build_app(stack: list[str], legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    # 与 init_app.register_middlewares 相同：逆序添加，列表第一项在最外层
+    for path in stack[::-1]:
+        app.add_middleware(LEGACY[path] if legacy and path in LEGACY else import_module(path, desc="中间件"))
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [
+        (b"host", settings.ALLOWED_HOSTS[0].encode()),
+        (b"x-forwarded-proto", b"https"),
+        (b"accept-encoding", b"gzip"),
+    ],
+    "client": ("127.0.0.1", 50000),
+    "server": ("127.0.0.1", 8001),
+}
+
+
+async def _request(app: FastAPI) -> int:
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(dict(SCOPE), receive, send)
+    return status
+
+
+async def _measure(app: FastAPI) -> float:
+    for _ in range(WARMUP):
+        assert await _request(app) == 200
+    return await measure_async(_request, app, budget=float("inf"), max_rounds=REQUESTS) * 1e6
+
+
+async def run() -> None:
+    settings.ENVIRONMENT = EnvironmentEnum.PROD
+    stack = [path for path in settings.MIDDLEWARE_LIST if path]
+    print(f"中间件栈（外 → 内）: {', '.join(path.rsplit('.', 1)[-1] for path in stack)}")
+    bare = await _measure(_build_app([], legacy=False))
+    print(f"{'bare':<7} {bare:8.1f} µs/请求")
+    for label, legacy in (("legacy", True), ("asgi", False)):
+        cost = await _measure(_build_app(stack, legacy=legacy))
+        print(f"{label:<7} {cost:8.1f} µs/请求  中间件开销 {cost - bare:8.1f} µs")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+"""微基准：CRUDBase 元数据注册表 vs 每次调用 sa_inspect 的 CPU 开销。
+
+模拟一次列表接口（page）里 CRUDBase 要做的内省：取主键、判断软删除、解析 preload → loader options。
+legacy_* 是注册表引入之前的实现，原样保留作对照。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_model_meta.py
+"""
+
+from typing import Any
+
+from _common import best_of
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+
+import main  # noqa: F401  注册全部模型
+from app.api.v1.module_system.user.model import UserModel
+from app.core.base_crud import CRUDBase
+from app.core.base_schema import AuthSchema
+
+PRELOAD = ["dept", "roles", "positions", "roles.menus"]
+NUMBER = 20_000
+
+
+def legacy_get_pk_col(model: type) -> Any:
+    pk_cols = list(sa_inspect(model).primary_key)
+    return pk_cols[0]
+
+
+def legacy_supports_soft_delete(model: type) -> bool:
+    return all(hasattr(model, attr) for attr in ("is_deleted", "deleted_time", "deleted_id"))
+
+
+def legacy_loader_options(model: type, preload: list[str]) -> list[Any]:
+    options: list[Any] = []
+    mapper = sa_inspect(model)
+    processed_attrs = set()
+    for opt in preload:
+        parts = opt.split(".")
+        if opt in processed_attrs:
+            continue
+        processed_attrs.add(opt)
+        current_model = model
+        current_mapper = mapper
+        current_option = None
+        for part in parts:
+            if not hasattr(current_model, part):
+                break
+            attr = getattr(current_model, part)
+            prop = current_mapper.relationships.get(part)
+            if prop is None:
+                break
+            loader = selectinload(attr) if prop.uselist else joinedload(attr)
+            current_option = loader if current_option is None else current_option.options(loader)
+            current_model = prop.mapper.class_
+            current_mapper = sa_inspect(current_model)
+        if current_option is not None:
+            options.append(current_option)
+    for audit_attr in ["created_by", "updated_by"]:
+        if audit_attr not in processed_attrs and audit_attr in mapper.relationships:
+            options.append(joinedload(getattr(model, audit_attr)))
+    return options
+
+
+def legacy_request() -> None:
+    # page：COUNT 取主键 + 条件里判断 is_deleted + 数据查询 preload
+    legacy_get_pk_col(UserModel)
+    legacy_supports_soft_delete(UserModel)
+    hasattr(UserModel, "is_deleted")
+    legacy_loader_options(UserModel, PRELOAD)
+
+
+def registry_request() -> None:
+    crud = CRUDBase(UserModel, AuthSchema(), None)  # type: ignore[arg-type]
+    crud._get_pk_col()
+    _ = crud._supports_soft_delete
+    crud._meta.has("is_deleted")
+    crud._loader_options(PRELOAD)
+
+
+def run() -> None:
+    configure_mappers()
+    assert len(legacy_loader_options(UserModel, PRELOAD)) == len(CRUDBase(UserModel, AuthSchema(), None)._loader_options(PRELOAD))  # type: ignore[arg-type]
+
+    for name, fn in (("legacy (sa_inspect 每次内省)", legacy_request), ("registry (ModelMeta 缓存)", registry_request)):
+        print(f"{name:<32} {best_of(fn, NUMBER) * 1e6:8.2f} µs/请求")
+
+
+if __name__ == "__main__":
+    run()
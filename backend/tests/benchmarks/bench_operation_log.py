@@ -0,0 +1,78 @@
+"""基准：操作日志采集请求/响应的开销，parsed（完整解析再序列化）对比 raw（截取前 N 字节 + 脱敏）。
+
+对不同大小的 JSON 请求体（及同等大小的 JSON 响应体）各采集多次，只计采集本身（不含接口处理与日志写库）：
+
+- parsed  改写前的做法：json.loads 请求体、json.dumps 整个参数后判断长度，响应体整体解码；
+- raw     当前默认：请求体与响应体各切前 OPERATION_LOG_CAPTURE_BYTES 字节，一遍正则脱敏。
+
+输出每次采集的平均微秒数与写入日志的字符数。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_operation_log.py
+"""
+
+import asyncio
+import json
+
+from _common import measure_async
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.config.setting import settings
+from app.core.log_capture import ResponseCapture, capture_request
+from app.core.router_class import _capture_parsed
+
+# 请求体行数 → 约 10KB / 100KB / 1MB / 5MB
+SIZES = [100, 1_000, 10_000, 50_000]
+
+
+def _payload(rows: int) -> bytes:
+    items = [{"id": index, "username": f"user{index}", "password": "secret", "name": f"导入用户{index}", "dept_id": index % 10} for index in range(rows)]
+    return json.dumps({"token": "abc", "items": items}, ensure_ascii=False).encode()
+
+
+def _request(body: bytes) -> Request:
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/system/user/import",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "query_string": b"",
+        "path_params": {},
+    }
+    return Request(scope, receive)
+
+
+async def _parsed(body: bytes, response: JSONResponse) -> int:
+    payload, response_json = await _capture_parsed(_request(body), response)
+    return len(payload) + len(response_json)
+
+
+async def _raw(body: bytes, response: JSONResponse) -> int:
+    payload = await capture_request(_request(body))
+    capture = ResponseCapture.attach(response)
+    return len(payload) + len(capture.text if capture else "")
+
+
+async def _measure(func, body: bytes, response: JSONResponse) -> tuple[float, int]:
+    size = await func(body, response)
+    return await measure_async(func, body, response) * 1e6, size
+
+
+async def run() -> None:
+    print(f"截取上限 {settings.OPERATION_LOG_CAPTURE_BYTES} 字节")
+    print(f"{'请求体':>10}{'parsed µs':>14}{'raw µs':>12}{'加速':>9}{'parsed 字符':>14}{'raw 字符':>10}")
+    for rows in SIZES:
+        body = _payload(rows)
+        response = JSONResponse(json.loads(body))
+        parsed_cost, parsed_size = await _measure(_parsed, body, response)
+        raw_cost, raw_size = await _measure(_raw, body, response)
+        print(f"{len(body) / 1024:>8.0f}KB{parsed_cost:14.1f}{raw_cost:12.1f}{parsed_cost / raw_cost:8.0f}x{parsed_size:14d}{raw_size:10d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,73 @@
+"""基准：登录突发时 PBKDF2 在事件循环上同步计算 vs 交给密码哈希进程池。
+
+同一事件循环里跑一个“普通请求”探针（每 5ms 唤醒一次，记录实际唤醒比预定时间晚了多少，即调度延迟），
+同时并发发起一批登录校验，分别统计两种模式下：
+
+- 登录吞吐（次/秒）；
+- 普通请求调度延迟 p50 / p99。
+
+同步模式下每次校验都独占事件循环，探针延迟随登录次数线性上升；进程池模式下探针延迟应与无登录时相当。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_password.py
+"""
+
+import asyncio
+import statistics
+import time
+
+import _common  # noqa: F401  backend 目录加入 sys.path
+
+from app.utils.password_util import PwdUtil, pwd_hash_pool
+
+LOGINS = 32
+PROBE_INTERVAL = 0.005
+
+
+async def _probe(latencies: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        due = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append(time.perf_counter() - due)
+
+
+async def _login_sync(password_hash: str) -> None:
+    # 旧实现：协程内直接同步计算
+    assert PwdUtil.verify_password("admin123", password_hash)
+
+
+async def _login_pool(password_hash: str) -> None:
+    assert await PwdUtil.verify_password_async("admin123", password_hash)
+
+
+async def _run(label: str, login, password_hash: str) -> None:
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(latencies, stop))
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    await asyncio.gather(*(login(password_hash) for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:<6} 登录 {LOGINS / elapsed:7.1f} 次/秒  "
+        f"探针 p50 {statistics.median(latencies) * 1000:8.2f} ms  p99 {p99 * 1000:8.2f} ms  样本 {len(latencies)}"
+    )
+
+
+async def run() -> None:
+    password_hash = PwdUtil.hash_password("admin123")
+    # 预热进程池，避免把 spawn 时间计入
+    await asyncio.gather(*(PwdUtil.verify_password_async("admin123", password_hash) for _ in range(pwd_hash_pool.workers)))
+    await _run("sync", _login_sync, password_hash)
+    await _run("pool", _login_pool, password_hash)
+    print(f"进程池: {pwd_hash_pool.stats()}")
+    pwd_hash_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""基准：列表分页 ORM 实体路径 vs 只读投影路径（projection="schema"/"dict"）。
+
+临时 sqlite 库里各造 1000 个用户和 1000 条操作日志（带创建人），取 page_size=1000 的一页，
+对比 page() 在三种模式下的耗时；数值含 SQL 执行，sqlite 下 I/O 可忽略，差异主要来自 ORM 实例化与 from_attributes 校验。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_projection.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import _common  # noqa: F401  backend 目录加入 sys.path
+
+_DB_PATH = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+os.environ["DATABASE_TYPE"] = "sqlite"
+os.environ["DATABASE_NAME"] = _DB_PATH
+
+from app.config.setting import settings
+
+settings.DATABASE_TYPE = "sqlite"
+settings.DATABASE_NAME = _DB_PATH
+settings.DATABASE_ECHO = False
+
+import main  # noqa: F401  注册全部模型
+from app.api.v1.module_system.log.crud import OperationLogCRUD
+from app.api.v1.module_system.log.schema import OperationLogOutSchema
+from app.api.v1.module_system.user.crud import UserCRUD
+from app.api.v1.module_system.user.schema import UserOutSchema
+from app.core.base_schema import AuthSchema, CoreUserSchema
+from app.core.database import async_db_session
+from app.scripts.initialize import InitializeData
+
+ROWS = 1000
+ROUNDS = 20
+
+
+async def _seed() -> None:
+    await InitializeData().init_db()
+    async with async_db_session() as db, db.begin():
+        auth = AuthSchema(user=CoreUserSchema(id=1, is_superuser=True))
+        await UserCRUD(auth, db).create_many(
+            [{"username": f"bench{i}", "name": f"压测用户{i}", "password": "x", "dept_id": 1, "email": f"b{i}@example.com"} for i in range(ROWS)]
+        )
+        await OperationLogCRUD(auth, db).create_many(
+            [
+                {
+                    "username": "admin",
+                    "request_path": f"/api/v1/system/user/list?page={i}",
+                    "request_method": "GET",
+                    "request_payload": "x" * 2000,
+                    "response_code": 200,
+                    "response_json": "y" * 4000,
+                    "process_time": "12ms",
+                    "request_ip": "127.0.0.1",
+                }
+                for i in range(ROWS)
+            ]
+        )
+
+
+async def _bench(crud_cls: type, out_schema: type) -> None:
+    auth = AuthSchema(user=CoreUserSchema(id=1, is_superuser=True))
+    for projection in (None, "schema", "dict"):
+        best = float("inf")
+        for _ in range(ROUNDS):
+            async with async_db_session() as db, db.begin():
+                crud = crud_cls(auth, db)
+                start = time.perf_counter()
+                result = await crud.page(offset=0, limit=ROWS, order_by=[{"id": "asc"}], out_schema=out_schema, count_mode="none", projection=projection)
+                best = min(best, time.perf_counter() - start)
+        label = projection or "orm"
+        print(f"{crud_cls.__name__:<18} {label:<7} {len(result.items):>5} 行  {best * 1000:8.2f} ms")
+
+
+async def run() -> None:
+    await _seed()
+    await _bench(UserCRUD, UserOutSchema)
+    await _bench(OperationLogCRUD, OperationLogOutSchema)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,89 @@
+"""基准：SuccessResponse 的序列化开销，改写前后对比。
+
+- legacy  改写前：ResponseSchema(...).model_dump() → jsonable_encoder（自定义日期时间格式）→ json.dumps；
+- fast    当前：信封 dict 直接交给 json.dumps，日期时间与 Pydantic 模型在 default 回调中处理。
+
+两组数据均先校验输出字节完全一致，再计时：
+
+- 1000 行用户分页：服务层 UserOutSchema.model_dump() 后的 dict（含部门、角色、岗位与审计时间）；
+- 完整菜单树：sql/data/sys_menu.json 的全部菜单，经 MenuTreeOutSchema 校验后 model_dump()；
+- 另测直接传入 Pydantic 模型列表（不预先 model_dump）的情况。
+
+运行（backend 目录下）::
+
+    python tests/benchmarks/bench_response.py
+"""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+from _common import BACKEND_DIR, measure
+from fastapi.responses import JSONResponse
+
+from app.api.v1.module_system.menu.schema import MenuTreeOutSchema
+from app.api.v1.module_system.user.schema import CurrentUserOutSchema
+from app.common.response import ResponseSchema, SuccessResponse, jsonable_response_content
+
+NOW = datetime(2026, 10, 18, 12, 0, 0, tzinfo=UTC)
+
+
+def _users(count: int) -> list[CurrentUserOutSchema]:
+    return [
+        CurrentUserOutSchema(
+            id=index,
+            username=f"user{index:05d}",
+            name=f"用户{index}",
+            mobile=f"138{index:08d}",
+            email=f"user{index}@example.com",
+            gender=str(index % 3),
+            status=index % 2,
+            description="批量导入",
+            dept_id=index % 20,
+            dept_name=f"研发{index % 20}部",
+            dept={"id": index % 20, "name": f"研发{index % 20}部", "status": 0},
+            positions=[{"id": 1, "name": "工程师", "status": 0}],
+            roles=[{"id": 2, "name": "普通用户", "code": "common", "status": 0, "created_time": NOW}],
+            last_login=NOW - timedelta(minutes=index),
+            created_time=NOW - timedelta(days=index),
+            updated_time=NOW,
+        )
+        for index in range(count)
+    ]
+
+
+def _menu_tree() -> list[MenuTreeOutSchema]:
+    def stamp(nodes: list[dict]) -> list[dict]:
+        return [{**node, "created_time": NOW, "updated_time": NOW, "children": stamp(node.get("children") or [])} for node in nodes]
+
+    menus = json.loads((BACKEND_DIR / "sql" / "data" / "sys_menu.json").read_text(encoding="utf-8"))
+    return [MenuTreeOutSchema.model_validate(node) for node in stamp(menus)]
+
+
+def _legacy(data: object) -> bytes:
+    content = ResponseSchema(data=data).model_dump()
+    return JSONResponse(content=jsonable_response_content(content)).body
+
+
+def _fast(data: object) -> bytes:
+    return SuccessResponse(data=data).body
+
+
+def run() -> None:
+    users = _users(1000)
+    menus = _menu_tree()
+    cases = {
+        "用户分页 1000 行（dict）": {"items": [user.model_dump() for user in users], "total": 1000, "page_no": 1, "page_size": 1000, "has_next": False},
+        "用户分页 1000 行（模型）": {"items": users, "total": 1000, "page_no": 1, "page_size": 1000, "has_next": False},
+        "完整菜单树（dict）": [menu.model_dump() for menu in menus],
+        "完整菜单树（模型）": menus,
+    }
+    print(f"{'数据':<22}{'字节':>10}{'legacy ms':>12}{'fast ms':>10}{'加速':>8}")
+    for label, data in cases.items():
+        body = _fast(data)
+        assert body == _legacy(data), f"{label}: 输出不一致"
+        legacy, fast = measure(_legacy, data) * 1e3, measure(_fast, data) * 1e3
+        print(f"{label:<22}{len(body):>10}{legacy:12.2f}{fast:10.2f}{legacy / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
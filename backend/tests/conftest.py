@@ -2,6 +2,7 @@
 
 提供:
 - test_client: FastAPI TestClient 实例 (session 级复用)
+- redis: 把核心层的 database.redis_client 指向 Mock Redis
 - assert_route: 验证接口路由存在 (status_code != 404)
 """
 
@@ -39,11 +40,14 @@ settings.MAX_OVERFLOW = 1
 settings.CAPTCHA_ENABLE = False  # 测试环境关闭验证码
 
 # ============================================================
-# Mock Redis — dict 存储，支持 get/set/delete/exists/keys/ttl/expire
+# Mock Redis — dict 存储，支持 get/set/incr/delete/exists/keys/ttl/expire/pipeline/evalsha/pfadd/pfcount
 # 登录成功后写入的 session 数据可在后续请求中正确读取
 # ============================================================
 
 _mock_redis_store: dict[bytes, bytes] = {}
+_mock_redis_hashes: dict[bytes, dict[bytes, bytes]] = {}
+# HyperLogLog 用集合模拟（精确计数）
+_mock_redis_hll: dict[bytes, set] = {}
 
 
 def _redis_get(name: bytes) -> bytes | None:
@@ -57,22 +61,27 @@ async def _redis_set(name: bytes, value: bytes, ex: int | None = None, nx: bool
     return True
 
 
+async def _redis_incr(name: bytes, amount: int = 1) -> int:
+    _mock_redis_store[name] = int(_mock_redis_store.get(name) or 0) + amount
+    return _mock_redis_store[name]
+
+
 async def _redis_delete(*names: bytes) -> int:
     count = 0
     for n in names:
-        if _mock_redis_store.pop(n, None) is not None:
+        if any(store.pop(n, None) is not None for store in (_mock_redis_store, _mock_redis_hashes, _mock_redis_hll)):
             count += 1
     return count
 
 
 def _redis_keys(pattern: bytes | None = None) -> list[bytes]:
     if pattern == b"*" or pattern is None:
-        return list(_mock_redis_store.keys())
-    return [k for k in _mock_redis_store if pattern == b"*" or k.startswith(pattern.replace(b"*", b""))]
+        return [*_mock_redis_store, *_mock_redis_hashes]
+    return [k for k in (*_mock_redis_store, *_mock_redis_hashes) if k.startswith(pattern.replace(b"*", b""))]
 
 
 def _redis_exists(*names: bytes) -> int:
-    return sum(1 for n in names if n in _mock_redis_store)
+    return sum(1 for n in names if n in _mock_redis_store or n in _mock_redis_hashes)
 
 
 def _redis_ttl(name: bytes) -> int:
@@ -80,16 +89,20 @@ def _redis_ttl(name: bytes) -> int:
 
 
 async def _redis_expire(name: bytes, time: int) -> bool:
-    return name in _mock_redis_store
+    return name in _mock_redis_store or name in _mock_redis_hashes
 
 
 async def _redis_flushall(asynchronous: bool = False) -> bool:
     _mock_redis_store.clear()
+    _mock_redis_hashes.clear()
+    _mock_redis_hll.clear()
     return True
 
 
 async def _redis_flushdb(asynchronous: bool = False) -> bool:
     _mock_redis_store.clear()
+    _mock_redis_hashes.clear()
+    _mock_redis_hll.clear()
     return True
 
 
@@ -102,25 +115,39 @@ async def _redis_aclose() -> None:
 
 
 async def _redis_hmget(name: bytes, keys: list[bytes]) -> list[bytes | None]:
-    return [_mock_redis_store.get(name + b":" + k) for k in keys]
+    fields = _mock_redis_hashes.get(name, {})
+    return [fields.get(k) for k in keys]
 
 
 async def _redis_hset(name: bytes, key: bytes, value: bytes) -> int:
-    _mock_redis_store[name + b":" + key] = value
+    _mock_redis_hashes.setdefault(name, {})[key] = value
     return 1
 
 
 async def _redis_hgetall(name: bytes) -> dict[bytes, bytes]:
-    prefix = name + b":"
-    return {k[len(prefix) :]: v for k, v in _mock_redis_store.items() if k.startswith(prefix)}
+    return dict(_mock_redis_hashes.get(name, {}))
+
+
+async def _redis_hincrby(name: bytes, key: bytes, amount: int = 1) -> int:
+    fields = _mock_redis_hashes.setdefault(name, {})
+    fields[key] = int(fields.get(key) or 0) + amount
+    return fields[key]
 
 
 async def _redis_hdel(name: bytes, *keys: bytes) -> int:
-    count = 0
-    for k in keys:
-        if _mock_redis_store.pop(name + b":" + k, None) is not None:
-            count += 1
-    return count
+    fields = _mock_redis_hashes.get(name, {})
+    return sum(1 for k in keys if fields.pop(k, None) is not None)
+
+
+async def _redis_pfadd(name: bytes, *values: Any) -> int:
+    members = _mock_redis_hll.setdefault(name, set())
+    before = len(members)
+    members.update(values)
+    return int(len(members) > before)
+
+
+async def _redis_pfcount(*names: bytes) -> int:
+    return len(set().union(*(_mock_redis_hll.get(n, set()) for n in names)))
 
 
 def _redis_info(section: str | None = None) -> dict:
@@ -128,7 +155,69 @@ def _redis_info(section: str | None = None) -> dict:
 
 
 def _redis_dbsize() -> int:
-    return len(_mock_redis_store)
+    return len(_mock_redis_store) + len(_mock_redis_hashes)
+
+
+class _MockPipeline:
+    """命令排队，execute 时依次调用 _mock_redis 上的同名方法。"""
+
+    def __init__(self, transaction: bool = True) -> None:
+        self._commands: list[tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "_MockPipeline":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str) -> Any:
+        def queue(*args: Any, **kwargs: Any) -> "_MockPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(_mock_redis, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+def _script_session_touch(keys: list, args: list) -> Any:
+    # 测试环境 TTL 恒为 3600，只需返回会话
+    return _mock_redis_store.get(keys[0])
+
+
+def _script_unlock(keys: list, args: list) -> int:
+    if _mock_redis_store.get(keys[0]) == args[0]:
+        del _mock_redis_store[keys[0]]
+        return 1
+    return 0
+
+
+def _script_renew_lock(keys: list, args: list) -> int:
+    return int(_mock_redis_store.get(keys[0]) == args[0])
+
+
+def _script_incr_if_exists(keys: list, args: list) -> int | None:
+    if keys[0] not in _mock_redis_store:
+        return None
+    _mock_redis_store[keys[0]] = int(_mock_redis_store[keys[0]]) + int(args[0])
+    return _mock_redis_store[keys[0]]
+
+
+from app.core.redis_crud import INCR_IF_EXISTS_SCRIPT, RENEW_LOCK_SCRIPT, SESSION_TOUCH_SCRIPT, UNLOCK_SCRIPT
+
+# Lua 脚本按 SHA 分派到等价的 Python 实现
+_mock_scripts = {
+    SESSION_TOUCH_SCRIPT.sha: _script_session_touch,
+    UNLOCK_SCRIPT.sha: _script_unlock,
+    RENEW_LOCK_SCRIPT.sha: _script_renew_lock,
+    INCR_IF_EXISTS_SCRIPT.sha: _script_incr_if_exists,
+}
+
+
+async def _redis_evalsha(sha: str, numkeys: int, *keys_and_args: Any) -> Any:
+    return _mock_scripts[sha](list(keys_and_args[:numkeys]), list(keys_and_args[numkeys:]))
 
 
 _mock_redis = AsyncMock()
@@ -136,6 +225,7 @@ _mock_redis.ping = AsyncMock(return_value=True)
 _mock_redis.get = AsyncMock(side_effect=_redis_get)
 _mock_redis.set = AsyncMock(side_effect=_redis_set)
 _mock_redis.delete = AsyncMock(side_effect=_redis_delete)
+_mock_redis.incr = AsyncMock(side_effect=_redis_incr)
 _mock_redis.keys = AsyncMock(side_effect=_redis_keys)
 _mock_redis.exists = AsyncMock(side_effect=_redis_exists)
 _mock_redis.ttl = AsyncMock(side_effect=_redis_ttl)
@@ -148,8 +238,15 @@ _mock_redis.hmget = AsyncMock(side_effect=_redis_hmget)
 _mock_redis.hset = AsyncMock(side_effect=_redis_hset)
 _mock_redis.hgetall = AsyncMock(side_effect=_redis_hgetall)
 _mock_redis.hdel = AsyncMock(side_effect=_redis_hdel)
+_mock_redis.hincrby = AsyncMock(side_effect=_redis_hincrby)
+_mock_redis.pfadd = AsyncMock(side_effect=_redis_pfadd)
+_mock_redis.pfcount = AsyncMock(side_effect=_redis_pfcount)
 _mock_redis.info = AsyncMock(side_effect=_redis_info)
 _mock_redis.dbsize = AsyncMock(side_effect=_redis_dbsize)
+_mock_redis.unlink = AsyncMock(side_effect=_redis_delete)
+_mock_redis.pipeline = _MockPipeline
+_mock_redis.evalsha = AsyncMock(side_effect=_redis_evalsha)
+_mock_redis.script_load = AsyncMock(return_value=None)
 
 patch("redis.asyncio.Redis.from_url", return_value=_mock_redis).start()
 # slowapi 限流器由中间件处理，测试中无需 mock
@@ -207,6 +304,15 @@ def test_client(_api_client: TestClient) -> TestClient:
     return _api_client
 
 
+@pytest.fixture
+def redis(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """测试 lifespan 不调用 redis_connect，需要核心层 Redis 时显式挂上 mock。"""
+    from app.core import database
+
+    monkeypatch.setattr(database, "redis_client", _mock_redis)
+    return _mock_redis
+
+
 @pytest.fixture(scope="session")
 def auth_headers(_api_client: TestClient) -> dict[str, str]:
     """Session 级 admin 认证头，登录一次，所有测试复用。"""
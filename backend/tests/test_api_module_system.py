@@ -2,8 +2,17 @@
 认证数据测试：admin 登录后验证 CRUD 真实数据。
 """
 
+from datetime import datetime
+
 from conftest import assert_route
 from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.api.v1.module_system.log.model import OperationLogModel
+from app.api.v1.module_system.user.model import UserModel
+from app.common.constant import DATETIME_DISPLAY_FMT
+from app.core.database import async_db_session
+from app.utils.excel_util import ExcelUtil
 
 
 class TestAuth:
@@ -110,6 +119,47 @@ class TestUser:
     def test_user_export(self, test_client: TestClient, auth_headers: dict) -> None:
         assert_route(test_client, "GET", "/system/user/export", auth=auth_headers)
 
+    def test_user_export_stream(self, test_client: TestClient, auth_headers: dict) -> None:
+        """流式导出：CRUDBase.stream 分批读取后写出的 Excel 可被正常解析。"""
+        resp = test_client.post("/system/user/export", headers=auth_headers, json={})
+        assert resp.status_code == 200
+        rows = ExcelUtil.read_excel_to_dicts(resp.content)
+        assert {"admin"} <= {row["用户名称"] for row in rows}
+        # 时间列按展示格式输出为字符串，与原 Schema 序列化路径一致
+        created = next(row["创建时间"] for row in rows if row["用户名称"] == "admin")
+        assert isinstance(created, str)
+        datetime.strptime(created, DATETIME_DISPLAY_FMT)
+
+    def test_auth_cache_logout_and_disable(self, test_client: TestClient, auth_headers: dict) -> None:
+        """认证缓存命中后，注销与停用仍即时生效。"""
+
+        def login(username: str, password: str) -> tuple[str, dict]:
+            resp = test_client.post("/system/auth/login", data={"username": username, "password": password})
+            assert resp.status_code == 200, resp.text
+            token = resp.json()["data"]["access_token"]
+            return token, {"Authorization": f"Bearer {token}"}
+
+        # 注销：第二次请求命中缓存，注销后同一令牌立即失效
+        token, headers = login("admin", "admin123")
+        for _ in range(2):
+            assert test_client.get("/system/user/current/info", headers=headers).status_code == 200
+        assert test_client.post("/system/auth/logout", headers=headers, json=token).status_code == 200
+        assert test_client.get("/system/user/current/info", headers=headers).status_code == 401
+
+        # 停用：会话里的状态是登录时快照，停用提交后缓存失效并按库拒绝
+        created = test_client.post(
+            "/system/user/create",
+            headers=auth_headers,
+            json={"username": "auth_cache_user", "password": "test123", "name": "缓存", "dept_id": 1},
+        ).json()["data"]
+        _, headers = login("auth_cache_user", "test123")
+        # 新用户未分配角色：认证通过、鉴权 403
+        for _ in range(2):
+            assert test_client.get("/system/user/list", headers=headers).status_code == 403
+        resp = test_client.patch("/system/user/status/batch", headers=auth_headers, json={"ids": [created["id"]], "status": 1})
+        assert resp.status_code == 200
+        assert test_client.get("/system/user/list", headers=headers).status_code == 401
+
     def test_user_import_data(self, test_client: TestClient, auth_headers: dict) -> None:
         assert_route(
             test_client,
@@ -119,6 +169,44 @@ class TestUser:
             json={"list": []},
         )
 
+    def test_user_import_soft_deleted(self, test_client: TestClient, auth_headers: dict) -> None:
+        """导入：已软删除的账号逐行报错，不影响同批其他行写入。"""
+        created = test_client.post(
+            "/system/user/create",
+            headers=auth_headers,
+            json={"username": "import_deleted", "password": "test123", "name": "已删除", "dept_id": 1},
+        ).json()["data"]
+        test_client.request("DELETE", "/system/user/delete", headers=auth_headers, json=[created["id"]])
+
+        headers = {"dept_id": "部门编号", "username": "账号", "name": "昵称", "email": "邮箱", "mobile": "手机号", "gender": "性别", "status": "状态"}
+        rows = [
+            {"dept_id": 1, "username": "import_deleted", "name": "重复", "gender": "1", "status": "正常"},
+            {"dept_id": 1, "username": "import_fresh", "name": "新用户", "gender": "1", "status": "正常"},
+        ]
+        content = ExcelUtil.export_list2excel(rows, headers)
+        resp = test_client.post("/system/user/import/data", headers=auth_headers, files={"file": ("user.xlsx", content)})
+        result = resp.json()["data"]
+        assert result.startswith("成功导入 1 条数据"), result
+        assert "import_deleted 已被删除" in result
+
+    def test_user_import_password_salted(self, test_client: TestClient, auth_headers: dict) -> None:
+        """导入：每个用户的初始密码单独加盐哈希，互不相同且都能登录。"""
+        headers = {"dept_id": "部门编号", "username": "账号", "name": "昵称", "email": "邮箱", "mobile": "手机号", "gender": "性别", "status": "状态"}
+        usernames = ["import_salt_a", "import_salt_b"]
+        rows = [{"dept_id": 1, "username": name, "name": name, "gender": "1", "status": "正常"} for name in usernames]
+        content = ExcelUtil.export_list2excel(rows, headers)
+        resp = test_client.post("/system/user/import/data", headers=auth_headers, files={"file": ("user.xlsx", content)})
+        assert resp.json()["data"].startswith("成功导入 2 条数据")
+
+        async def load_hashes() -> set[str]:
+            async with async_db_session() as db:
+                result = await db.execute(select(UserModel.password).where(UserModel.username.in_(usernames)))
+                return set(result.scalars().all())
+
+        assert len(test_client.portal.call(load_hashes)) == 2
+        resp = test_client.post("/system/auth/login", data={"username": usernames[0], "password": "123456"})
+        assert resp.status_code == 200, resp.text
+
     def test_user_current_info_update(self, test_client: TestClient, auth_headers: dict) -> None:
         assert_route(
             test_client,
@@ -343,6 +431,65 @@ class TestDict:
     def test_dict_data_list(self, test_client: TestClient, auth_headers: dict) -> None:
         assert_route(test_client, "GET", "/system/dict/data/list", auth=auth_headers)
 
+    def test_dict_data_cursor_page(self, test_client: TestClient, auth_headers: dict) -> None:
+        """游标分页：next_cursor 翻到下一页，prev_cursor 翻回原页。"""
+        params = {"page_size": 5, "cursor": "", "order_by": '[{"dict_type": "asc"}, {"id": "desc"}]'}
+        first = test_client.get("/system/dict/data/list", headers=auth_headers, params=params).json()["data"]
+        assert first["prev_cursor"] is None
+        assert first["next_cursor"], "游标模式首页应返回 next_cursor"
+
+        second = test_client.get("/system/dict/data/list", headers=auth_headers, params={**params, "cursor": first["next_cursor"]}).json()["data"]
+        first_ids = {item["id"] for item in first["items"]}
+        assert second["items"] and not first_ids & {item["id"] for item in second["items"]}
+        assert second["prev_cursor"]
+
+        back = test_client.get("/system/dict/data/list", headers=auth_headers, params={**params, "cursor": second["prev_cursor"]}).json()["data"]
+        assert [item["id"] for item in back["items"]] == [item["id"] for item in first["items"]]
+
+        resp = test_client.get("/system/dict/data/list", headers=auth_headers, params={**params, "cursor": "bogus"})
+        assert resp.json()["success"] is False
+
+    def test_dict_data_cursor_page_nulls(self, test_client: TestClient, auth_headers: dict) -> None:
+        """游标分页：可为 NULL 的排序键翻页不重不漏（NULL 视为最大值），反向翻页逐页还原。"""
+        resp = test_client.post(
+            "/system/dict/type/create",
+            headers=auth_headers,
+            json={"dict_name": "游标空值", "dict_type": "test_cursor_nulls", "status": 0},
+        )
+        type_id = resp.json()["data"]["id"]
+        css = ["b", None, "a", None, "c", "a", None]
+        created: list[tuple[str | None, int]] = []
+        for i, css_class in enumerate(css, start=1):
+            payload = {"dict_sort": i, "dict_label": f"n{i}", "dict_value": str(i), "dict_type": "test_cursor_nulls", "dict_type_id": type_id}
+            if css_class is not None:
+                payload["css_class"] = css_class
+            data = test_client.post("/system/dict/data/create", headers=auth_headers, json=payload).json()["data"]
+            created.append((css_class, data["id"]))
+
+        for direction in ("asc", "desc"):
+            non_null = sorted((c, i) for c, i in created if c is not None)
+            nulls = sorted(i for c, i in created if c is None)
+            if direction == "asc":
+                expected = [i for _, i in non_null] + nulls
+            else:
+                expected = nulls[::-1] + [i for _, i in non_null[::-1]]
+
+            params = {"page_size": 2, "dict_type": "test_cursor_nulls", "order_by": f'[{{"css_class": "{direction}"}}]'}
+            pages: list[dict] = []
+            cursor = ""
+            while cursor is not None:
+                page = test_client.get("/system/dict/data/list", headers=auth_headers, params={**params, "cursor": cursor}).json()["data"]
+                pages.append(page)
+                cursor = page["next_cursor"]
+            assert [item["id"] for page in pages for item in page["items"]] == expected, direction
+
+            cursor = pages[-1]["prev_cursor"]
+            for page in reversed(pages[:-1]):
+                back = test_client.get("/system/dict/data/list", headers=auth_headers, params={**params, "cursor": cursor}).json()["data"]
+                assert [item["id"] for item in back["items"]] == [item["id"] for item in page["items"]], direction
+                cursor = back["prev_cursor"]
+            assert cursor is None
+
     def test_dict_data_create(self, test_client: TestClient, auth_headers: dict) -> None:
         assert_route(
             test_client,
@@ -517,6 +664,21 @@ class TestLog:
     def test_operation_log_detail(self, test_client: TestClient, auth_headers: dict) -> None:
         assert_route(test_client, "GET", "/system/log/operation/detail/1", auth=auth_headers)
 
+    def test_operation_log_export_columns(self, test_client: TestClient, auth_headers: dict) -> None:
+        """流式导出的列与原先按 OperationLogOutSchema 导出时一致：请求参数列保留表头但不导出内容。"""
+
+        async def seed() -> None:
+            async with async_db_session() as db, db.begin():
+                db.add(OperationLogModel(username="admin", request_path="/export/columns", request_method="POST", request_payload='{"k": "v"}', response_code=200))
+
+        test_client.portal.call(seed)
+        resp = test_client.post("/system/log/operation/export", headers=auth_headers, json={"request_path": "/export/columns"})
+        assert resp.status_code == 200
+        rows = ExcelUtil.read_excel_to_dicts(resp.content)
+        assert [row["请求路径"] for row in rows] == ["/export/columns"]
+        assert "请求参数" in rows[0]
+        assert not rows[0]["请求参数"]
+
 
 class TestTicket:
     """工单管理接口 — 数据验证。"""
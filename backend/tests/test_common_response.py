@@ -0,0 +1,132 @@
+"""公共层测试 —— 响应序列化：dumps_response_content 的输出与改写前
+ResponseSchema(...).model_dump() → jsonable_encoder → JSONResponse 的结果逐字节一致。
+"""
+
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from enum import Enum, IntEnum
+from typing import Any
+
+import pytest
+from fastapi import status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.common.enums import RET
+from app.common.response import ErrorResponse, ResponseSchema, SuccessResponse, dumps_response_content, jsonable_response_content
+
+NOW = datetime(2026, 10, 18, 12, 30, 45, 123456)
+
+
+class Color(Enum):
+    RED = "red"
+    GREEN = 2
+
+
+class Level(IntEnum):
+    LOW = 1
+    HIGH = 2
+
+
+class Kind(str, Enum):
+    MENU = "menu"
+    BUTTON = "button"
+
+
+class Tag(BaseModel):
+    name: str
+    created_time: datetime
+    kind: Kind = Kind.MENU
+
+
+class Node(BaseModel):
+    id: int
+    name: str
+    color: Color
+    level: Level
+    price: Decimal
+    birthday: date | None = None
+    alarm: time | None = None
+    tags: list[Tag] = []
+    extra: dict[str, Any] = {}
+    children: list["Node"] = []
+
+
+@dataclass
+class Point:
+    x: int
+    at: datetime
+
+
+def _node(index: int, depth: int = 0) -> Node:
+    return Node(
+        id=index,
+        name=f"节点{index}",
+        color=Color.RED if index % 2 else Color.GREEN,
+        level=Level.HIGH,
+        price=Decimal("12.50") if index % 2 else Decimal("3"),
+        birthday=date(2000, 1, index % 28 + 1),
+        alarm=time(7, 30, index % 60),
+        tags=[Tag(name="a", created_time=NOW), Tag(name="b", created_time=NOW + timedelta(days=index), kind=Kind.BUTTON)],
+        extra={"at": NOW, "ids": {3, 1, 2}},
+        children=[_node(index * 10 + i, depth + 1) for i in range(2)] if depth < 2 else [],
+    )
+
+
+def _legacy(**kwargs: Any) -> bytes:
+    """改写前 SuccessResponse / ErrorResponse 的序列化路径。"""
+    content = ResponseSchema(**kwargs).model_dump()
+    return JSONResponse(content=jsonable_response_content(content)).body
+
+
+CASES: dict[str, Any] = {
+    "none": None,
+    "scalars": {"s": "中文", "i": 1, "f": 1.5, "b": True, "n": None, "big": 2**64},
+    # 日期时间：无时区、带时区（UTC 与非整点偏移）、微秒、date、time、datetime 作为 date 子类
+    "datetime": {
+        "naive": NOW,
+        "utc": NOW.replace(tzinfo=UTC),
+        "offset": NOW.replace(tzinfo=timezone(timedelta(hours=5, minutes=30))),
+        "midnight": datetime(2026, 1, 1),
+        "date": date(2026, 2, 28),
+        "time": time(23, 59, 59, 999999),
+        "list": [NOW, date(2026, 1, 1), time(0, 0)],
+    },
+    # Enum：普通、IntEnum、str 混入
+    "enum": {"color": Color.RED, "green": Color.GREEN, "level": Level.LOW, "kind": Kind.BUTTON, "list": [Color.RED, Level.HIGH, Kind.MENU]},
+    # Decimal：整数值、小数、科学计数、负数
+    "decimal": {"int": Decimal("10"), "frac": Decimal("10.25"), "exp": Decimal("1E+2"), "neg": Decimal("-0.5")},
+    # 集合与元组
+    "collections": {"set": {3, 1, 2}, "frozenset": frozenset({"a"}), "tuple": (1, NOW), "empty_set": set()},
+    # 非 str 的 dict 键：int、float、bool、None、str 混入 Enum，以及 json 不支持的日期、普通 Enum 键
+    "int_keys": {1: "a", 2.5: "b", False: "c", None: "d", Kind.MENU: "e"},
+    "date_keys": {date(2026, 1, 1): 1, "x": NOW},
+    "enum_keys": {Color.RED: 1, Level.LOW: 2},
+    # 其他少见类型
+    "misc": {"uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"), "dataclass": Point(x=1, at=NOW)},
+    # 嵌套模型：直接传模型、模型列表、dict 里的模型、以及预先 model_dump 的 dict
+    "model": _node(1),
+    "models": [_node(1), _node(2)],
+    "page": {"items": [_node(i) for i in range(3)], "total": 3, "page_no": 1, "page_size": 10, "has_next": False},
+    "dumped": [_node(i).model_dump() for i in range(3)],
+}
+
+
+@pytest.mark.parametrize("data", list(CASES.values()), ids=list(CASES))
+def test_success_response_matches_legacy(data: Any) -> None:
+    assert SuccessResponse(data=data).body == _legacy(data=data)
+
+
+@pytest.mark.parametrize("data", list(CASES.values()), ids=list(CASES))
+def test_error_response_matches_legacy(data: Any) -> None:
+    response = ErrorResponse(data=data, msg="失败", code=RET.ERROR.code, status_code=status.HTTP_400_BAD_REQUEST)
+    expected = _legacy(data=data, msg="失败", code=RET.ERROR.code, status_code=status.HTTP_400_BAD_REQUEST, success=False)
+    assert response.body == expected
+
+
+def test_nan_rejected() -> None:
+    """与 JSONResponse 一样不允许 NaN / Infinity。"""
+    with pytest.raises(ValueError):
+        dumps_response_content({"v": float("nan")})
@@ -0,0 +1,42 @@
+"""核心层测试 —— 认证缓存：用户写入提交后失效，登录时间回写不触发失效。"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.api.v1.module_system.user.crud import UserCRUD
+from app.api.v1.module_system.user.model import UserModel
+from app.core.auth_cache import auth_session_cache
+from app.core.base_schema import AuthSchema, CoreUserSchema
+from app.core.database import async_db_session, wait_after_commit
+
+
+class TestAuthCacheInvalidation:
+    """失效在事务提交后执行，提交前并发请求按旧数据重建的缓存不会被当作最新。"""
+
+    def test_invalidated_after_commit(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            auth_session_cache.put("after-commit-session", AuthSchema(user=CoreUserSchema(id=1, username="super")))
+            async with async_db_session() as db:
+                async with db.begin():
+                    await UserCRUD(AuthSchema(), db).set([1], status=0)
+                    assert auth_session_cache.get("after-commit-session") is not None
+                await wait_after_commit(db)
+            assert auth_session_cache.get("after-commit-session") is None
+
+        test_client.portal.call(scenario)
+
+    def test_last_login_keeps_cache(self, test_client: TestClient) -> None:
+        """登录只回写登录时间（及重算的哈希），不失效认证缓存。"""
+
+        async def scenario() -> None:
+            auth_session_cache.put("last-login-session", AuthSchema(user=CoreUserSchema(id=1, username="super")))
+            async with async_db_session() as db:
+                async with db.begin():
+                    before = (await db.execute(select(UserModel.last_login, UserModel.password).where(UserModel.id == 1))).one()
+                    await UserCRUD(AuthSchema(), db).update_last_login(1, password_hash=before.password)
+                await wait_after_commit(db)
+                after = (await db.execute(select(UserModel.last_login).where(UserModel.id == 1))).scalar_one()
+            assert after is not None and (before.last_login is None or after >= before.last_login)
+            assert auth_session_cache.get("last-login-session") is not None
+
+        test_client.portal.call(scenario)
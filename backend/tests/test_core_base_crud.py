@@ -0,0 +1,249 @@
+"""核心层测试 —— CRUDBase 分页统计、批量写入、流式查询与 RETURNING/回退写入路径。
+直接在应用事件循环上（TestClient.portal）用测试库的真实会话调用 CRUDBase，不经过 HTTP 层。
+"""
+
+from collections.abc import Awaitable, Callable
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.api.v1.module_system.dict.model import DictTypeModel
+from app.api.v1.module_system.position.model import PositionModel
+from app.core.base_crud import CRUDBase
+from app.core.base_schema import AuthSchema, CoreUserSchema
+from app.core.database import async_db_session, wait_after_commit
+from app.core.exceptions import CustomException
+from app.core.permission import Permission
+
+
+def run(test_client: TestClient, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """在应用事件循环上执行协程函数（数据库连接池绑定在该循环上）。"""
+    return test_client.portal.call(fn)
+
+
+async def _seed_dict_types(prefix: str, count: int) -> None:
+    async with async_db_session() as db, db.begin():
+        crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+        await crud.create_many([{"dict_name": f"{prefix}{i}", "dict_type": f"{prefix}{i}"} for i in range(count)])
+
+
+class TestPageCountMode:
+    """page() 的 COUNT 策略。"""
+
+    def test_exact_estimated_none(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            await _seed_dict_types("count_mode_a_", 5)
+            async with async_db_session() as db, db.begin():
+                crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+                search = {"dict_type": ("like", "count_mode_a_")}
+                order = [{"id": "asc"}]
+
+                exact = await crud.page(0, 2, order, search=search, count_mode="exact")
+                assert (exact.total, exact.has_next, len(exact.items)) == (5, True, 2)
+
+                # sqlite 无统计信息，估算退化为精确 COUNT（有筛选条件时本就不估算）
+                assert (await crud.page(0, 2, order, search=search, count_mode="estimated")).total == 5
+                table_total = await crud.count()
+                assert (await crud.page(0, 2, order, count_mode="estimated")).total == table_total
+
+                # 不统计：total 是已知下界，末页时恰为精确值
+                first = await crud.page(0, 2, order, search=search, count_mode="none")
+                assert (first.total, first.has_next) == (3, True)
+                last = await crud.page(4, 2, order, search=search, count_mode="none")
+                assert (last.total, last.has_next, len(last.items)) == (5, False, 1)
+
+                # 游标模式默认不 COUNT
+                keyset = await crud.page(0, 2, order, search=search, cursor="")
+                assert keyset.total == len(keyset.items) + int(keyset.has_next)
+
+        run(test_client, scenario)
+
+    def test_cached_invalidated_after_commit(self, test_client: TestClient, redis: Any) -> None:
+        cache_name = f"count_cache:{DictTypeModel.__table__.name}"
+
+        async def scenario() -> None:
+            await _seed_dict_types("count_mode_b_", 3)
+            search = {"dict_type": ("like", "count_mode_b_")}
+            async with async_db_session() as db, db.begin():
+                crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+                assert (await crud.page(0, 10, [{"id": "asc"}], search=search, count_mode="cached")).total == 3
+            assert await redis.exists(cache_name)
+
+            async with async_db_session() as db:
+                async with db.begin():
+                    await CRUDBase(DictTypeModel, AuthSchema(), db).create({"dict_name": "count_mode_b_x", "dict_type": "count_mode_b_x"})
+                    # 提交前缓存仍在：提交前失效会让并发请求把旧总数重新写回
+                    assert await redis.exists(cache_name)
+                await wait_after_commit(db)
+            assert not await redis.exists(cache_name)
+
+            async with async_db_session() as db, db.begin():
+                crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+                assert (await crud.page(0, 10, [{"id": "asc"}], search=search, count_mode="cached")).total == 4
+
+        run(test_client, scenario)
+
+    def test_rollback_keeps_cache(self, test_client: TestClient, redis: Any) -> None:
+        cache_name = f"count_cache:{DictTypeModel.__table__.name}"
+
+        async def scenario() -> None:
+            async with async_db_session() as db, db.begin():
+                await CRUDBase(DictTypeModel, AuthSchema(), db).page(0, 10, [{"id": "asc"}], count_mode="cached")
+            assert await redis.exists(cache_name)
+
+            async with async_db_session() as db:
+                async with db.begin():
+                    await CRUDBase(DictTypeModel, AuthSchema(), db).create({"dict_name": "count_mode_c", "dict_type": "count_mode_c"})
+                    await db.rollback()
+                await wait_after_commit(db)
+            assert await redis.exists(cache_name)
+
+        run(test_client, scenario)
+
+
+class TestBulkWrite:
+    """create_many / upsert_many：返回主键与入参顺序对齐，冲突更新与冲突跳过。"""
+
+    def test_create_many_returning_order(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            # 键集合不同的行会被分到不同的 INSERT 批次，返回顺序仍须与入参一致
+            rows = [
+                {"dict_name": "bulk_a_0", "dict_type": "bulk_a_0"},
+                {"dict_name": "bulk_a_1", "dict_type": "bulk_a_1", "description": "x"},
+                {"dict_name": "bulk_a_2", "dict_type": "bulk_a_2"},
+                {"dict_name": "bulk_a_3", "dict_type": "bulk_a_3", "description": "y"},
+            ]
+            async with async_db_session() as db, db.begin():
+                crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+                ids = await crud.create_many(rows, returning=True, batch_size=1)
+                assert len(ids) == 4
+                by_id = {obj.id: obj.dict_type for obj in await crud.get_list(search={"id": ("in", ids)})}
+                assert [by_id[pk] for pk in ids] == [row["dict_type"] for row in rows]
+
+                # 无唯一键可用时走 sort_by_parameter_order，按分组下标还原顺序
+                more = [
+                    {"dict_name": "bulk_a_4", "dict_type": "bulk_a_4", "uuid": "bulk-a-4", "description": "z"},
+                    {"dict_name": "bulk_a_5", "dict_type": "bulk_a_5", "uuid": "bulk-a-5"},
+                    {"dict_name": "bulk_a_6", "dict_type": "bulk_a_6", "uuid": "bulk-a-6", "description": "z"},
+                ]
+                ids = await crud._execute_bulk(insert(DictTypeModel), more, 500, True, [])
+                by_id = {obj.id: obj.dict_type for obj in await crud.get_list(search={"id": ("in", ids)})}
+                assert [by_id[pk] for pk in ids] == [row["dict_type"] for row in more]
+
+        run(test_client, scenario)
+
+    def test_upsert_many(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            async with async_db_session() as db, db.begin():
+                crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+                existing = await crud.create_many([{"dict_name": "old", "dict_type": "bulk_b_0"}], returning=True)
+                rows = [
+                    {"dict_name": "new_1", "dict_type": "bulk_b_1"},
+                    {"dict_name": "updated", "dict_type": "bulk_b_0", "description": "d"},
+                    {"dict_name": "new_2", "dict_type": "bulk_b_2", "description": "d"},
+                ]
+                ids = await crud.upsert_many(rows, conflict_cols=["dict_type"], update_cols=["dict_name"], returning=True)
+                assert ids[1] == existing[0]
+                objs = {obj.id: obj for obj in await crud.get_list(search={"id": ("in", ids)}, include_deleted=True)}
+                assert [objs[pk].dict_type for pk in ids] == ["bulk_b_1", "bulk_b_0", "bulk_b_2"]
+                assert objs[existing[0]].dict_name == "updated"
+                # update_cols 之外的列不被覆盖
+                assert objs[existing[0]].description is None
+
+                # update_cols=[]：冲突跳过，已有行不变，也不报错
+                await crud.upsert_many([{"dict_name": "skipped", "dict_type": "bulk_b_0"}], conflict_cols=["dict_type"], update_cols=[])
+                await db.refresh(objs[existing[0]])
+                assert objs[existing[0]].dict_name == "updated"
+
+        run(test_client, scenario)
+
+
+class TestStream:
+    """stream()：按批产出，调用方提前停止时关闭服务端游标。"""
+
+    def test_early_stop_closes_result(self, test_client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+        async def scenario() -> None:
+            await _seed_dict_types("stream_a_", 5)
+            async with async_db_session() as db:
+                results: list[Any] = []
+                original = db.stream
+
+                async def spy(*args: Any, **kwargs: Any) -> Any:
+                    results.append(await original(*args, **kwargs))
+                    return results[-1]
+
+                monkeypatch.setattr(db, "stream", spy)
+                crud = CRUDBase(DictTypeModel, AuthSchema(), db)
+                batches = crud.stream(search={"dict_type": ("like", "stream_a_")}, batch_size=2, columns=["id", "dict_type"])
+                async for rows in batches:
+                    assert [row["dict_type"] for row in rows] == ["stream_a_0", "stream_a_1"]
+                    break
+                await batches.aclose()
+                assert results[0].closed
+
+        run(test_client, scenario)
+
+
+class _NoReturningCRUD(CRUDBase):
+    """模拟 MySQL：方言不支持 RETURNING，写入走 ORM flush / SELECT ... FOR UPDATE 回退路径。"""
+
+    @property
+    def _dialect(self) -> Any:
+        return SimpleNamespace(insert_returning=False, update_returning=False, delete_returning=False)
+
+
+class TestWritePath:
+    """create/update/set/delete/restore 在 RETURNING 路径与回退路径上行为一致；批量写入只在 scoped=True 时套用数据权限。"""
+
+    @pytest.mark.parametrize("crud_class", [CRUDBase, _NoReturningCRUD], ids=["returning", "fallback"])
+    def test_write_cycle(self, test_client: TestClient, crud_class: type[CRUDBase]) -> None:
+        async def scenario() -> None:
+            code = f"write_{crud_class.__name__}"
+            async with async_db_session() as db, db.begin():
+                crud = crud_class(PositionModel, AuthSchema(), db)
+                obj = await crud.create({"name": "write_a", "code": code}, load_audit=False)
+                assert obj.id and obj.uuid
+
+                updated = await crud.update(obj.id, {"name": "write_b"}, load_audit=False)
+                # onupdate 列已就位，访问不触发懒加载
+                assert updated.name == "write_b" and updated.updated_time is not None
+                assert (await crud.update(obj.id, {"name": "write_c"})).name == "write_c"
+                with pytest.raises(CustomException, match="更新对象不存在"):
+                    await crud.update(999999, {"name": "x"})
+
+                assert await crud.set([obj.id, 999999], status=1) == [obj.id]
+                assert await crud.delete([obj.id]) == [obj.id]
+                assert await crud.delete([obj.id]) == []  # 重复删除幂等
+                assert await crud.set([obj.id], status=0) == []  # 默认跳过已删除
+                assert await crud.restore([obj.id]) == [obj.id]
+                restored = await crud.get(id=obj.id)
+                assert restored is not None and restored.status == 1
+
+        run(test_client, scenario)
+
+    @pytest.mark.parametrize("crud_class", [CRUDBase, _NoReturningCRUD], ids=["returning", "fallback"])
+    def test_data_scope_opt_in(self, test_client: TestClient, crud_class: type[CRUDBase]) -> None:
+        async def scenario() -> None:
+            async with async_db_session() as db:
+                async with db.begin():
+                    other = await crud_class(PositionModel, AuthSchema(), db).create({"name": "scope", "code": f"scope_{crud_class.__name__}"})
+                    other_id = other.id
+
+                # 仅本人数据权限：他人创建的行对当前用户不可见
+                auth = AuthSchema(user=CoreUserSchema(id=1, is_superuser=False))
+                auth._data_scope = (frozenset({Permission.DATA_SCOPE_SELF}), frozenset())
+                crud = crud_class(PositionModel, auth, db)
+                async with db.begin():
+                    # scoped=True：权限外的行不受影响，也不在返回值中
+                    assert await crud.set([other_id], scoped=True, status=1) == []
+                    assert await crud.delete([other_id], scoped=True) == []
+                    # 默认只按主键与软删除过滤
+                    assert await crud.set([other_id], status=1) == [other_id]
+                    assert await crud.delete([other_id]) == [other_id]
+                    assert await crud.restore([other_id], scoped=True) == []
+                    assert await crud.restore([other_id]) == [other_id]
+
+        run(test_client, scenario)
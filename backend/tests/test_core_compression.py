@@ -0,0 +1,90 @@
+"""核心层测试 —— 响应压缩的 Accept-Encoding 协商与压缩级别档位。"""
+
+import gzip
+import zlib
+
+import pytest
+
+from app.config.setting import Settings, settings
+from app.core.compression import StreamCompressor, level_for, negotiate_encoding
+
+ALL_ENCODINGS = ("zstd", "br", "gzip")
+
+
+class TestNegotiateEncoding:
+    """按服务端优先顺序选编码；客户端 q 值只用于排除，* 为未列出编码的默认值。"""
+
+    @pytest.mark.parametrize(
+        ("accept_encoding", "encodings", "expected"),
+        [
+            # 客户端列出的顺序不影响结果，按服务端顺序取第一个
+            ("gzip, br", ALL_ENCODINGS, "br"),
+            ("gzip, br, zstd", ALL_ENCODINGS, "zstd"),
+            ("gzip", ALL_ENCODINGS, "gzip"),
+            # q 值大小不参与排序，只有 q=0 才排除
+            ("br;q=0.1, gzip;q=1", ALL_ENCODINGS, "br"),
+            ("br;q=0, gzip", ALL_ENCODINGS, "gzip"),
+            ("br;q=0.0, gzip;q=0", ALL_ENCODINGS, None),
+            # * 匹配未单独列出的编码，显式条目优先于 *
+            ("*", ALL_ENCODINGS, "zstd"),
+            ("*;q=0", ALL_ENCODINGS, None),
+            ("gzip;q=0, *", ("gzip",), None),
+            ("zstd;q=0, *", ALL_ENCODINGS, "br"),
+            ("gzip, *;q=0", ALL_ENCODINGS, "gzip"),
+            # 服务端只启用部分编码
+            ("zstd, br", ("gzip",), None),
+            ("zstd, gzip", ("br", "gzip"), "gzip"),
+            # 空头、identity、未知编码都不压缩
+            ("", ALL_ENCODINGS, None),
+            ("identity", ALL_ENCODINGS, None),
+            ("deflate, compress", ALL_ENCODINGS, None),
+            # 大小写与空白不敏感
+            ("GZip ;  Q=1 , BR", ALL_ENCODINGS, "br"),
+            # 无法解析的 q 视为 0
+            ("br;q=abc, gzip", ALL_ENCODINGS, "gzip"),
+            # 其他参数忽略
+            ("br;level=1", ALL_ENCODINGS, "br"),
+        ],
+    )
+    def test_negotiate(self, accept_encoding: str, encodings: tuple[str, ...], expected: str | None) -> None:
+        assert negotiate_encoding(accept_encoding, encodings) == expected
+
+
+class TestLevelFor:
+    """文本类普通响应、文本类大响应或流式、其他可压缩类型分别取三个档位。"""
+
+    @pytest.mark.parametrize("encoding", ALL_ENCODINGS)
+    def test_profiles(self, encoding: str) -> None:
+        large = settings.COMPRESS_LARGE_SIZE
+        assert level_for(encoding, "application/json", 1024, False) == level_for(encoding, "text/html", 1024, False)
+        assert level_for(encoding, "application/problem+json", 1024, False) == level_for(encoding, "application/json", 1024, False)
+        text = level_for(encoding, "application/json", 1024, False)
+        assert level_for(encoding, "application/json", large, False) < text
+        assert level_for(encoding, "application/json", 1024, True) < text
+        assert level_for(encoding, "application/octet-stream", 1024, False) <= level_for(encoding, "application/json", large, False)
+
+
+class TestDeprecatedGzipSettings:
+    """旧配置名仍然生效：GZIP_MIN_SIZE 即 COMPRESS_MIN_SIZE，GZIP_COMPRESS_LEVEL 设置后 gzip 统一使用该级别。"""
+
+    def test_min_size_alias(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("GZIP_MIN_SIZE", "2048")
+        config = Settings()
+        assert (config.COMPRESS_MIN_SIZE, config.GZIP_MIN_SIZE) == (2048, 2048)
+        monkeypatch.setenv("COMPRESS_MIN_SIZE", "512")
+        assert Settings().COMPRESS_MIN_SIZE == 512
+
+    def test_gzip_level(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "GZIP_COMPRESS_LEVEL", 9)
+        assert level_for("gzip", "application/json", settings.COMPRESS_LARGE_SIZE, True) == 9
+        assert level_for("gzip", "image/bmp", 1024, False) == 9
+        assert level_for("zstd", "application/json", 1024, False) != 9
+
+
+def test_gzip_stream_compressor_flushes_each_chunk() -> None:
+    """非最后一块做同步刷新：中途拼出的字节已能解出此前全部内容。"""
+    compressor = StreamCompressor("gzip", 6)
+    first = compressor.compress(b"hello " * 100, final=False)
+    assert zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(first) == b"hello " * 100
+    rest = compressor.compress(b"world", final=True)
+    assert gzip.decompress(first + rest) == b"hello " * 100 + b"world"
@@ -0,0 +1,100 @@
+"""核心层测试 —— 操作日志截取的脱敏（redact）与截断（clip）。"""
+
+import pytest
+
+from app.config.setting import settings
+from app.core.log_capture import clip, redact
+
+
+class TestRedact:
+    """JSON 与表单里敏感字段的值替换为 ******，其他字段原样保留。"""
+
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [
+            # JSON 字符串、数字、布尔值
+            (b'{"username": "admin", "password": "123456"}', b'{"username": "admin", "password": "******"}'),
+            (b'{"password":123456,"name":"a"}', b'{"password":"******","name":"a"}'),
+            (b'{"token": true}', b'{"token": "******"}'),
+            # 值里带转义引号
+            (b'{"password": "a\\"b,c", "name": "x"}', b'{"password": "******", "name": "x"}'),
+            # 嵌套对象、数组内的多个字段
+            (
+                b'{"user": {"old_password": "a", "new_password": "b"}, "items": [{"secret": "s"}]}',
+                b'{"user": {"old_password": "******", "new_password": "******"}, "items": [{"secret": "******"}]}',
+            ),
+            # 字段名不区分大小写，但必须完全匹配
+            (b'{"PassWord": "x"}', b'{"PassWord": "******"}'),
+            (b'{"password_hint": "x"}', b'{"password_hint": "x"}'),
+            # 值恰好是敏感字段名时不误伤
+            (b'{"name": "password"}', b'{"name": "password"}'),
+        ],
+    )
+    def test_json(self, data: bytes, expected: bytes) -> None:
+        assert redact(data) == expected
+
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [
+            (b"username=admin&password=123456", b"username=admin&password=******"),
+            (b"password=123456&username=admin", b"password=******&username=admin"),
+            (b"password=&token=abc", b"password=******&token=******"),
+            (b"PASSWORD=x", b"PASSWORD=******"),
+            (b"my_password=x&password_hint=y", b"my_password=x&password_hint=y"),
+        ],
+    )
+    def test_form(self, data: bytes, expected: bytes) -> None:
+        assert redact(data) == expected
+
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [
+            # 截断在字符串值中间：一直脱敏到末尾
+            (b'{"username": "admin", "password": "1234', b'{"username": "admin", "password": "******"'),
+            # 截断在转义符之后
+            (b'{"password": "ab\\', b'{"password": "******"'),
+            # 截断在数字中间
+            (b'{"password": 12', b'{"password": "******"'),
+            # 表单截断
+            (b"username=admin&password=12", b"username=admin&password=******"),
+        ],
+    )
+    def test_truncated_prefix(self, data: bytes, expected: bytes) -> None:
+        assert redact(data) == expected
+
+    def test_no_sensitive_fields(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "OPERATION_LOG_SENSITIVE_FIELDS", [])
+        assert redact(b'{"password": "123456"}') == b'{"password": "123456"}'
+
+    def test_empty(self) -> None:
+        assert redact(b"") == b""
+
+
+class TestClip:
+    """截取前 OPERATION_LOG_CAPTURE_BYTES 字节后脱敏，被截断时注明原始大小。"""
+
+    def test_within_limit(self) -> None:
+        assert clip(b'{"password": "123456"}') == '{"password": "******"}'
+
+    def test_truncated_json(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        data = b'{"username": "admin", "password": "' + b"x" * 100 + b'"}'
+        monkeypatch.setattr(settings, "OPERATION_LOG_CAPTURE_BYTES", 40)
+        text = clip(data)
+        assert text == f'{{"username": "admin", "password": "******"…(共 {len(data)} 字节)'
+        assert "x" not in text
+
+    def test_truncated_form(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        data = b"username=admin&password=" + b"x" * 100
+        monkeypatch.setattr(settings, "OPERATION_LOG_CAPTURE_BYTES", 30)
+        assert clip(memoryview(data)) == f"username=admin&password=******…(共 {len(data)} 字节)"
+
+    def test_total_from_stream(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """流式响应只保留了前 N 字节，原始大小由调用方传入。"""
+        monkeypatch.setattr(settings, "OPERATION_LOG_CAPTURE_BYTES", 10)
+        assert clip(b"0123456789", total=10_000) == "0123456789…(共 10000 字节)"
+
+    def test_truncated_multibyte(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """截断落在多字节字符中间时丢弃残缺字节。"""
+        data = "中文".encode()
+        monkeypatch.setattr(settings, "OPERATION_LOG_CAPTURE_BYTES", 4)
+        assert clip(data) == f"中…(共 {len(data)} 字节)"
@@ -0,0 +1,126 @@
+"""核心层测试 —— 登录统计：当日 Redis 计数、按天汇总与仪表盘的"今天"口径。
+
+统计日期按 UTC 划分（与 created_time 的存储一致）；今日独立用户含失败登录，趋势里的独立用户只计成功登录。
+"""
+
+from datetime import UTC, date, datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.module_monitor.online.service import OnlineService
+from app.api.v1.module_system.log.crud import LoginLogCRUD
+from app.api.v1.module_system.log.model import LoginLogModel
+from app.api.v1.module_system.user.crud import UserCRUD
+from app.api.v1.module_system.user.model import UserModel
+from app.common.enums import RedisInitKeyConfig
+from app.core import login_stats
+from app.core.base_schema import AuthSchema
+from app.core.database import async_db_session, wait_after_commit
+from app.core.login_stats import _aggregate, get_today_counters, record_logins, stat_today
+
+# 2001-01-01 23:30 UTC，东八区本地已是 1 月 2 日
+_INSTANT = datetime(2001, 1, 1, 23, 30, tzinfo=UTC)
+
+
+class _Clock(datetime):
+    """固定时刻的 datetime：不带 tz 的 now() 按东八区本地时间返回，模拟非 UTC 时区的服务器。"""
+
+    @classmethod
+    def now(cls, tz: Any = None) -> datetime:  # type: ignore[override]
+        return _INSTANT.astimezone(tz) if tz else _INSTANT.astimezone(timezone(timedelta(hours=8))).replace(tzinfo=None)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(login_stats, "datetime", _Clock)
+
+
+async def _reset_day(redis: Any) -> None:
+    """清空固定日期的当日计数，各用例互不影响。"""
+    keys = (RedisInitKeyConfig.LOGIN_DAILY_COUNTER, RedisInitKeyConfig.LOGIN_DAILY_USERS, RedisInitKeyConfig.LOGIN_DAILY_LOGIN_USERS)
+    await redis.delete(*(f"{key.key}:{stat_today().isoformat()}" for key in keys), RedisInitKeyConfig.DASHBOARD_SNAPSHOT.key)
+
+
+class TestStatDay:
+    """统计日期取 UTC 日期，不随服务器本地时区变化。"""
+
+    def test_stat_today_utc(self, clock: None) -> None:
+        assert stat_today() == date(2001, 1, 1)
+
+    def test_rollup_groups_by_utc_day(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            logs = [
+                ("pin_a", 1, datetime(2001, 1, 1, 0, 10, tzinfo=UTC)),
+                ("pin_a", 0, datetime(2001, 1, 1, 23, 50, tzinfo=UTC)),
+                ("pin_b", 0, datetime(2001, 1, 1, 12, 0, tzinfo=UTC)),
+                ("pin_b", 1, datetime(2001, 1, 2, 0, 5, tzinfo=UTC)),
+            ]
+            async with async_db_session() as db, db.begin():
+                db.add_all(LoginLogModel(username=username, status=status, created_time=at) for username, status, at in logs)
+                await db.flush()
+                stats = await _aggregate(db, date(2001, 1, 1))
+            assert stats[date(2001, 1, 1)] == {"login_count": 3, "success_count": 1, "fail_count": 2, "unique_users": 1, "login_users": 2, "new_users": 0}
+            assert stats[date(2001, 1, 2)]["login_users"] == 1
+
+        test_client.portal.call(scenario)
+
+
+class TestTodayCounters:
+    """当日 Redis 计数：unique_users 只计成功登录，login_users 含失败登录。"""
+
+    def test_unique_users_and_login_users(self, test_client: TestClient, redis: Any, clock: None) -> None:
+        async def scenario() -> dict[str, int]:
+            await _reset_day(redis)
+            await record_logins([("pin_ok", True), ("pin_ok", False), ("pin_fail", False)])
+            return await get_today_counters(redis)
+
+        counters = test_client.portal.call(scenario)
+        assert counters == {"login_count": 3, "success_count": 1, "fail_count": 2, "unique_users": 1, "login_users": 2, "new_users": 0}
+
+    def test_dashboard_today_unique_users(self, test_client: TestClient, redis: Any, clock: None) -> None:
+        """仪表盘"今日独立用户"与改写前一样计入失败登录，趋势中的独立用户只计成功登录。"""
+
+        async def scenario() -> Any:
+            await _reset_day(redis)
+            await record_logins([("pin_dash", False)])
+            async with async_db_session() as db:
+                return await OnlineService.get_dashboard_stats(AuthSchema(), db, redis)
+
+        stats = test_client.portal.call(scenario)
+        assert stats.today_login_count == 1
+        assert stats.today_unique_users == 1
+        assert (stats.login_trend[-1].day, stats.login_trend[-1].unique_users) == ("2001-01-01", 0)
+
+    def test_counters_after_commit(self, test_client: TestClient, redis: Any) -> None:
+        counter_key = f"{RedisInitKeyConfig.LOGIN_DAILY_COUNTER.key}:{stat_today().isoformat()}"
+        total_key = f"{RedisInitKeyConfig.ENTITY_TOTAL.key}:{UserModel.__table__.name}"
+
+        async def counters() -> tuple[int, int, int]:
+            fields = await redis.hgetall(counter_key)
+            return int(fields.get("login_count") or 0), int(fields.get("new_users") or 0), int(await redis.get(total_key))
+
+        async def scenario() -> None:
+            async with async_db_session() as db, db.begin():
+                await UserCRUD(AuthSchema(), db).total()  # 初始化总数计数器
+            before = await counters()
+
+            async with async_db_session() as db:
+                async with db.begin():
+                    await LoginLogCRUD(AuthSchema(), db).create_many([{"username": "stat_a", "status": 1}, {"username": "stat_b", "status": 0}])
+                    await UserCRUD(AuthSchema(), db).create({"username": "stat_user", "name": "stat", "password": "x"})
+                    assert await counters() == before
+                await wait_after_commit(db)
+            assert await counters() == (before[0] + 2, before[1] + 1, before[2] + 1)
+
+            # 回滚的写入不计入
+            async with async_db_session() as db:
+                async with db.begin():
+                    await LoginLogCRUD(AuthSchema(), db).create_many([{"username": "stat_c", "status": 1}])
+                    await UserCRUD(AuthSchema(), db).create({"username": "stat_user_2", "name": "stat", "password": "x"})
+                    await db.rollback()
+                await wait_after_commit(db)
+            assert await counters() == (before[0] + 2, before[1] + 1, before[2] + 1)
+
+        test_client.portal.call(scenario)
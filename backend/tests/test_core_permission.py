@@ -0,0 +1,102 @@
+"""核心层测试 —— 数据权限：本部门及以下的部门解析、创建人部门为空的历史行、权限缓存版本号。"""
+
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.api.v1.module_system.dept.crud import DeptCRUD
+from app.api.v1.module_system.position.model import PositionModel
+from app.common.enums import RedisInitKeyConfig
+from app.core.base_crud import CRUDBase
+from app.core.base_schema import AuthSchema, CoreUserSchema
+from app.core.database import async_db_session, wait_after_commit
+from app.core.permission import Permission
+
+
+class TestDeptScope:
+    """本部门及以下：按物化路径前缀匹配子孙部门。"""
+
+    def test_accessible_dept_ids(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            async with async_db_session() as db:
+                async with db.begin():
+                    crud = DeptCRUD(AuthSchema(), db)
+                    parent = await crud.create({"name": "scope_p", "code": "scope_p"})
+                    child = await crud.create({"name": "scope_c", "code": "scope_c", "parent_id": parent.id})
+                    grandchild = await crud.create({"name": "scope_g", "code": "scope_g", "parent_id": child.id})
+                    sibling = await crud.create({"name": "scope_s", "code": "scope_s"})
+                    ids = (parent.id, child.id, grandchild.id, sibling.id)
+
+                statements: list[Any] = []
+                execute = db.execute
+
+                async def spy(statement: Any, *args: Any, **kwargs: Any) -> Any:
+                    statements.append(statement)
+                    return await execute(statement, *args, **kwargs)
+
+                db.execute = spy  # type: ignore[method-assign]
+                auth = AuthSchema(user=CoreUserSchema(id=2, dept_id=ids[1], is_superuser=False))
+                async with db.begin():
+                    accessible = await Permission(PositionModel, auth, db)._get_accessible_dept_ids({Permission.DATA_SCOPE_DEPT_AND_CHILD})
+                assert accessible == {ids[1], ids[2]}
+                # 前缀作为常量模式绑定（LIKE '/1/5/%'），不与子查询或参数拼接，可走 tree_path 索引
+                compiled = statements[-1].compile()
+                assert "||" not in str(compiled) and "concat" not in str(compiled).lower()
+                assert any(str(value).endswith("/%") for value in compiled.params.values())
+
+        test_client.portal.call(scenario)
+
+    def test_dept_without_path(self, test_client: TestClient) -> None:
+        """部门不存在（或路径未生成）时只含本部门。"""
+
+        async def scenario() -> set[int]:
+            auth = AuthSchema(user=CoreUserSchema(id=2, dept_id=999999, is_superuser=False))
+            async with async_db_session() as db, db.begin():
+                return await Permission(PositionModel, auth, db)._get_accessible_dept_ids({Permission.DATA_SCOPE_DEPT_AND_CHILD})
+
+        assert test_client.portal.call(scenario) == {999999}
+
+
+class TestCreatedDept:
+    """部门权限按冗余的 created_dept_id 过滤，未回填的历史行退回按创建人当前部门判断。"""
+
+    def test_dept_scope_null_created_dept(self, test_client: TestClient) -> None:
+        async def scenario() -> None:
+            async with async_db_session() as db:
+                async with db.begin():
+                    # 创建人 1 属于部门 1：created_dept_id 未回填的行按创建人当前部门可见，已填其他部门的行不可见
+                    result = await db.execute(
+                        insert(PositionModel).returning(PositionModel.id),
+                        [
+                            {"name": "legacy", "code": "scope_null_dept", "created_id": 1, "created_dept_id": None},
+                            {"name": "moved", "code": "scope_other_dept", "created_id": 1, "created_dept_id": 999999},
+                        ],
+                    )
+                    legacy_id, moved_id = result.scalars().all()
+
+                auth = AuthSchema(user=CoreUserSchema(id=2, dept_id=1, is_superuser=False))
+                auth._data_scope = (frozenset({Permission.DATA_SCOPE_DEPT_AND_CHILD}), frozenset({1}))
+                async with db.begin():
+                    visible = {obj.id for obj in await CRUDBase(PositionModel, auth, db).get_list(search={"id": ("in", [legacy_id, moved_id])})}
+                assert visible == {legacy_id}
+
+        test_client.portal.call(scenario)
+
+
+class TestDataScopeVersion:
+    """角色、部门变更后递增版本号，在事务提交后执行。"""
+
+    def test_data_scope_version_after_commit(self, test_client: TestClient, redis: Any) -> None:
+        key = RedisInitKeyConfig.DATA_SCOPE_VERSION.key
+
+        async def scenario() -> None:
+            before = int(await redis.get(key) or 0)
+            async with async_db_session() as db:
+                async with db.begin():
+                    await DeptCRUD(AuthSchema(), db).set([1], status=0)
+                    assert int(await redis.get(key) or 0) == before
+                await wait_after_commit(db)
+            assert int(await redis.get(key) or 0) == before + 1
+
+        test_client.portal.call(scenario)
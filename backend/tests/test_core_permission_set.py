@@ -0,0 +1,87 @@
+"""核心层测试 —— 权限前缀树与角色组合权限集合的匹配规则（纯内存，不依赖数据库），以及角色变更后的权限版本号。"""
+
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.module_system.role.crud import RoleCRUD
+from app.common.enums import RedisInitKeyConfig
+from app.core.base_schema import AuthSchema
+from app.core.database import async_db_session, wait_after_commit
+from app.core.permission_set import EMPTY_PERMISSION_SET, PermissionSet, PermissionTrie
+
+
+class TestPermissionTrie:
+    """按 ":" 分段匹配，"*" 匹配任意一段，位于末尾时覆盖其后全部段。"""
+
+    @pytest.mark.parametrize(
+        ("grant", "code", "expected"),
+        [
+            ("module_system:user:query", "module_system:user:query", True),
+            ("module_system:user:query", "module_system:user:create", False),
+            # 中间段通配
+            ("module_system:*:query", "module_system:role:query", True),
+            ("module_system:*:query", "module_system:role:create", False),
+            # 末尾通配覆盖其后任意段数
+            ("module_system:user:*", "module_system:user:query", True),
+            ("module_system:*", "module_system:user:query", True),
+            ("module_system:*", "module_monitor:online:query", False),
+            # 段数不一致
+            ("module_system:user", "module_system:user:query", False),
+            ("module_system:user:query", "module_system:user", False),
+            ("module_system:user:query:all", "module_system:user:query", False),
+            # 全通配
+            ("*:*:*", "module_system:user:query", True),
+            ("*:*:*", "module_system:user", False),
+            ("*", "module_system", True),
+            ("*", "module_system:user:query", True),
+        ],
+    )
+    def test_match(self, grant: str, code: str, expected: bool) -> None:
+        assert PermissionTrie([grant]).match(code) is expected
+
+    def test_overlapping_grants(self) -> None:
+        # 精确分支不匹配时仍尝试通配分支
+        trie = PermissionTrie(["module_system:user:query", "module_system:*:delete"])
+        assert trie.match("module_system:user:delete")
+        assert trie.match("module_system:user:query")
+        assert not trie.match("module_system:user:create")
+
+    def test_empty(self) -> None:
+        assert not PermissionTrie().match("module_system:user:query")
+        assert not PermissionTrie().match("")
+
+
+class TestPermissionSet:
+    """PermissionSet.allows：满足任意一个所需权限即通过。"""
+
+    def test_allows(self) -> None:
+        permission_set = PermissionSet.build(["module_system:user:*", "module_system:role:query"], [3, 1, 3])
+        assert permission_set.menu_ids == [1, 3]
+        assert permission_set.allows(["module_system:user:create"])
+        assert permission_set.allows(["module_system:menu:query", "module_system:role:query"])
+        assert not permission_set.allows(["module_system:role:delete"])
+        assert not permission_set.allows([])
+
+    def test_empty_set(self) -> None:
+        assert not EMPTY_PERMISSION_SET.allows(["module_system:user:query"])
+        assert PermissionSet.build(["*:*:*"], []).allows(["module_system:user:query"])
+
+
+class TestPermissionVersion:
+    """角色变更后递增权限集合版本号，在事务提交后执行。"""
+
+    def test_permission_version_after_commit(self, test_client: TestClient, redis: Any) -> None:
+        key = RedisInitKeyConfig.PERMISSION_SET_VERSION.key
+
+        async def scenario() -> None:
+            before = int(await redis.get(key) or 0)
+            async with async_db_session() as db:
+                async with db.begin():
+                    await RoleCRUD(AuthSchema(), db).set([1], status=0)
+                    assert int(await redis.get(key) or 0) == before
+                await wait_after_commit(db)
+            assert int(await redis.get(key) or 0) == before + 1
+
+        test_client.portal.call(scenario)
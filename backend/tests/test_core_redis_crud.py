@@ -0,0 +1,111 @@
+"""核心层测试 —— RedisCURD 的 pipeline 上下文与基于它的批量写入/删除（不依赖真实 Redis）。"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.core.redis_crud import RedisCURD
+
+
+class _RecordingPipeline:
+    """记录排队的命令，execute 时按 fail 决定成功或抛出连接错误。"""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.commands: list[tuple[str, tuple, dict]] = []
+        self.executed = 0
+
+    async def __aenter__(self) -> "_RecordingPipeline":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def __getattr__(self, name: str) -> Any:
+        def queue(*args: Any, **kwargs: Any) -> "_RecordingPipeline":
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        self.executed += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [True] * len(self.commands)
+
+
+def _redis(pipe: _RecordingPipeline) -> RedisCURD:
+    return RedisCURD(SimpleNamespace(pipeline=lambda transaction=False: pipe))
+
+
+class TestRedisPipeline:
+    """RedisCURD.pipeline 执行失败：默认只记日志，raise_on_error=True 时抛出。"""
+
+    def test_execute_error(self) -> None:
+        redis = _redis(_RecordingPipeline(fail=True))
+
+        async def scenario() -> None:
+            async with redis.pipeline() as pipe:
+                pipe.set("k", "v")
+            with pytest.raises(ConnectionError):
+                async with redis.pipeline(raise_on_error=True) as pipe:
+                    pipe.set("k", "v")
+
+        asyncio.run(scenario())
+
+
+class TestBatchHelpers:
+    """mset_with_ttl / multi_delete：单独调用时一次往返，传入 pipe 时只排队不发送。"""
+
+    def test_mset_with_ttl(self) -> None:
+        pipe = _RecordingPipeline()
+        asyncio.run(_redis(pipe).mset_with_ttl({"a": ("1", 60), "b": ("2", None)}))
+        assert pipe.executed == 1
+        assert pipe.commands == [("set", (), {"name": "a", "value": "1", "ex": 60}), ("set", (), {"name": "b", "value": "2", "ex": None})]
+
+    def test_multi_delete_chunks(self) -> None:
+        pipe = _RecordingPipeline()
+        asyncio.run(_redis(pipe).multi_delete((f"k{i}" for i in range(5)), chunk_size=2))
+        assert pipe.executed == 1
+        assert pipe.commands == [("unlink", ("k0", "k1"), {}), ("unlink", ("k2", "k3"), {}), ("unlink", ("k4",), {})]
+
+    def test_empty_skips_round_trip(self) -> None:
+        pipe = _RecordingPipeline()
+
+        async def scenario() -> None:
+            await _redis(pipe).mset_with_ttl({})
+            await _redis(pipe).multi_delete([])
+
+        asyncio.run(scenario())
+        assert (pipe.executed, pipe.commands) == (0, [])
+
+    def test_queue_into_caller_pipeline(self) -> None:
+        """与调用方的其他命令合并为一次往返（登录写会话与在线索引）。"""
+        pipe = _RecordingPipeline()
+        redis = _redis(pipe)
+
+        async def scenario() -> None:
+            async with redis.pipeline() as outer:
+                await redis.mset_with_ttl({"a": ("1", 60)}, pipe=outer)
+                await redis.multi_delete(["b"], pipe=outer)
+                outer.sadd("index", "a")
+
+        asyncio.run(scenario())
+        assert pipe.executed == 1
+        assert [name for name, _, _ in pipe.commands] == ["set", "unlink", "sadd"]
+
+    @pytest.mark.parametrize("raise_on_error", [False, True])
+    def test_execute_error(self, raise_on_error: bool) -> None:
+        redis = _redis(_RecordingPipeline(fail=True))
+
+        async def scenario() -> None:
+            await redis.mset_with_ttl({"a": ("1", 60)}, raise_on_error=raise_on_error)
+
+        if raise_on_error:
+            with pytest.raises(ConnectionError):
+                asyncio.run(scenario())
+        else:
+            asyncio.run(scenario())
@@ -0,0 +1,73 @@
+"""核心层测试 —— 请求拦截的 IP 前缀树（白名单/黑名单匹配）与配置变更广播。"""
+
+import pytest
+from conftest import _mock_redis
+from fastapi.testclient import TestClient
+
+from app.api.v1.module_system.params.service import ParamsService
+from app.common.enums import RedisInitKeyConfig
+from app.core.request_guard import IpPrefixTrie
+
+
+class TestIpPrefixTrie:
+    """单个地址、CIDR 网段、IPv6 与 IPv4 映射地址的匹配；无法解析的条目与地址不匹配。"""
+
+    @pytest.mark.parametrize(
+        ("entries", "ip", "expected"),
+        [
+            # 单个地址等价于 /32、/128
+            (["10.0.0.1"], "10.0.0.1", True),
+            (["10.0.0.1"], "10.0.0.2", False),
+            (["10.0.0.1/32"], "10.0.0.1", True),
+            # 网段（非严格写法按网络地址处理）
+            (["192.168.1.0/24"], "192.168.1.255", True),
+            (["192.168.1.0/24"], "192.168.2.1", False),
+            (["192.168.1.7/24"], "192.168.1.1", True),
+            # /0 覆盖同一协议族的全部地址，但不跨协议族
+            (["0.0.0.0/0"], "8.8.8.8", True),
+            (["0.0.0.0/0"], "2001:db8::1", False),
+            (["::/0"], "2001:db8::1", True),
+            (["::/0"], "8.8.8.8", False),
+            # IPv6
+            (["2001:db8::/32"], "2001:db8:abcd::1", True),
+            (["2001:db8::/32"], "2001:db9::1", False),
+            (["2001:db8::1"], "2001:db8::1", True),
+            (["2001:db8::1"], "2001:db8::2", False),
+            # IPv4 映射的 IPv6 地址按 IPv4 匹配
+            (["10.0.0.0/8"], "::ffff:10.1.2.3", True),
+            (["10.0.0.0/8"], "::ffff:11.1.2.3", False),
+            # 多个条目任一命中
+            (["10.0.0.1", "172.16.0.0/12"], "172.20.1.1", True),
+        ],
+    )
+    def test_match(self, entries: list[str], ip: str, expected: bool) -> None:
+        assert IpPrefixTrie(entries).match(ip) is expected
+
+    def test_invalid_input(self) -> None:
+        trie = IpPrefixTrie(["not-an-ip", "10.0.0.0/33", " 10.0.0.1 "])
+        # 无法解析的条目跳过，首尾空白的条目正常加入
+        assert trie.size == 1
+        assert trie.add("300.1.1.1") is False
+        assert trie.match("10.0.0.1")
+        for ip in ("", None, "not-an-ip", "10.0.0.256"):
+            assert not trie.match(ip)
+
+    def test_empty(self) -> None:
+        trie = IpPrefixTrie()
+        assert trie.size == 0
+        assert not trie.match("10.0.0.1")
+        assert not trie.match("::1")
+
+
+class TestConfigChange:
+    """系统参数初始化到 Redis 后递增配置版本号，各进程据此刷新拦截配置快照。"""
+
+    def test_init_cache_publishes(self, test_client: TestClient) -> None:
+        key = RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key
+
+        async def scenario() -> None:
+            before = int(await _mock_redis.get(key) or 0)
+            await ParamsService.init_cache(_mock_redis)
+            assert int(await _mock_redis.get(key) or 0) == before + 1
+
+        test_client.portal.call(scenario)